@@ -1,6 +1,7 @@
 # Step 0: Import necessary types and LangGraph library
 from typing import TypedDict
 from langgraph.graph import StateGraph
+from graphOptimizer import compile_graph  # GRAPH_OPTIMIZE=1 folds/fuses no-op steps
 
 # Step 1: Define the shape of your state (like a TypeScript interface or prop object)
 class Agent(TypedDict):
@@ -49,7 +50,7 @@ graph.add_edge('second', 'third')     # After 'second', go to 'third'
 graph.set_finish_point('third')       # End the flow at 'third'
 
 # Step 10: Compile the graph into a runnable application
-app = graph.compile()
+app = compile_graph(graph)
 
 # Step 11: Invoke the graph with initial input data (like passing props)
 result = app.invoke({'name': "hamza", "age": "12"})
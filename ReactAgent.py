@@ -1,76 +1,342 @@
 # main.py
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from dotenv import load_dotenv
+import operator
 import os
-from langchain.agents import initialize_agent
-from langchain_community.tools import TavilySearchResults
+from typing import Any, Dict, Iterator, List, Optional
+
+# ---------------------------------------------------
+# Importing this file is cheap: the Gemini client, the Tavily tool and the
+# agent are only created (and .env only read) when get_app() is first called.
+# The heavy provider packages are imported inside the factories below.
+# ---------------------------------------------------
+_app = None
+
+# Model turns a run may take; the last one has to answer without tools
+MAX_STEPS = 6
+# Tool calls from one model turn that may run at the same time
+MAX_TOOL_CONCURRENCY = 8
+
+SYSTEM_PROMPT = (
+    "You are a helpful assistant with a web search tool. "
+    "When a question needs several independent searches, request them all in the same turn. "
+    "Answer once you have enough information."
+)
+OUT_OF_STEPS_PROMPT = "You have used up your tool budget. Answer now with the information you already have."
+
 
 # ---------------------------------------------------
 # 1. Load environment variables from .env
 # ---------------------------------------------------
-load_dotenv()
+def _require_env(name: str, label: str) -> str:
+    from dotenv import load_dotenv
 
-# Get Google API key from environment
-google_api_key = os.getenv("GOOGLE_API_KEY")
-if not google_api_key:
-    raise ValueError("Google API Key not found. Please set it in .env as GOOGLE_API_KEY")
+    load_dotenv()
+    value = os.getenv(name)
+    if not value:
+        raise ValueError(f"{label} not found. Please set it in .env as {name}")
+    return value
 
-# Get Tavily API key from environment
-tavily_api_key = os.getenv("TAVILY_API_KEY")
-if not tavily_api_key:
-    raise ValueError("Tavily API Key not found. Please set it in .env as TAVILY_API_KEY")
 
 # ---------------------------------------------------
 # 2. Create the LLM (Gemini model)
 # ---------------------------------------------------
 # LangChain wraps Google Generative AI into an LLM interface.
 # Here we use the free-tier gemini-1.5-flash model.
-llm = ChatGoogleGenerativeAI(
-    model='gemini-1.5-flash',
-    google_api_key=google_api_key
-)
+# The client is shared through modelRegistry.py (pooled, concurrency-limited).
+def build_llm():
+    from modelRegistry import get_chat_model
+
+    return get_chat_model(
+        "google",
+        'gemini-1.5-flash',
+        google_api_key=_require_env("GOOGLE_API_KEY", "Google API Key"),
+        max_retries=0,  # 429s are retried by the "google" rate limiter (rateLimiter.py)
+    )
+
 
 # ---------------------------------------------------
 # 3. Create the Tavily Search Tool
 # ---------------------------------------------------
 # TavilySearchResults is a LangChain "Tool" that lets the agent
 # fetch real-time information from the internet.
-search_tool = TavilySearchResults(
-    search_depth='basic',        # 'basic' = fewer results, 'advanced' = more results
-    tavily_api_key=tavily_api_key
-)
+# With LOCAL_SEARCH_INDEX set, a local BM25 index (localSearch.py) answers
+# instead: same result shape, no API key, no network.
+def build_search_tool():
+    if os.getenv("LOCAL_SEARCH_INDEX"):
+        # Only imported when asked for: localSearch needs numpy
+        from localSearch import get_local_search_tool
+
+        return get_local_search_tool()
+
+    # Raises on HTTP errors (instead of returning them as text), so the
+    # "tavily" limiter in build_graph sees 429s and retries them
+    from rateLimiter import tavily_search_tool
+
+    return tavily_search_tool(
+        search_depth='basic',        # 'basic' = fewer results, 'advanced' = more results
+        tavily_api_key=_require_env("TAVILY_API_KEY", "Tavily API Key")
+    )
+
+
+# ---------------------------------------------------
+# 4. Build the agent graph
+# ---------------------------------------------------
+# agent -> (tool calls?) -> tools -> agent -> ... -> END
+# The model uses native tool calling, so one turn can ask for several
+# searches; the tools node runs them all at once and the model sees every
+# result in its next turn. `steps` counts model turns: the turn that reaches
+# max_steps gets no tools and has to answer.
+def agent_state():
+    # Built on first use: langgraph is only imported when an agent is built
+    from typing import Annotated, TypedDict
+
+    from langgraph.graph.message import add_messages
+
+    class AgentState(TypedDict):
+        messages: Annotated[list, add_messages]
+        steps: Annotated[int, operator.add]
+
+    return AgentState
+
+
+def run_tool_calls(tool_calls: List[dict], tools_by_name: Dict[str, Any], config=None,
+                   max_concurrency: int = MAX_TOOL_CONCURRENCY) -> list:
+    """Run one model turn's tool calls concurrently; ToolMessages come back in call order."""
+    from langchain_core.messages import ToolMessage
+    from langchain_core.runnables.config import get_executor_for_config
+
+    def run(tool_call: dict) -> ToolMessage:
+        tool = tools_by_name.get(tool_call["name"])
+        if tool is None:
+            return ToolMessage(
+                content=f"Error: unknown tool {tool_call['name']!r}, use one of {sorted(tools_by_name)}",
+                tool_call_id=tool_call["id"], name=tool_call["name"], status="error",
+            )
+        try:
+            # Invoked with the whole ToolCall, a tool answers with a ToolMessage
+            result = tool.invoke({**tool_call, "type": "tool_call"}, config)
+        except Exception as e:
+            # Shown to the model, which can retry or answer without it
+            return ToolMessage(content=f"Error: {e!r}", tool_call_id=tool_call["id"], name=tool_call["name"], status="error")
+        if isinstance(result, ToolMessage):
+            return result
+        return ToolMessage(content=str(result), tool_call_id=tool_call["id"], name=tool_call["name"])
+
+    if len(tool_calls) == 1:
+        return [run(tool_calls[0])]
+    config = {**(config or {}), "max_concurrency": min(max_concurrency, len(tool_calls))}
+    with get_executor_for_config(config) as executor:
+        return list(executor.map(run, tool_calls))
+
+
+def build_graph(llm=None, tools=None, max_steps: int = MAX_STEPS, max_concurrency: int = MAX_TOOL_CONCURRENCY,
+                system_prompt: str = SYSTEM_PROMPT, coalesce: bool = True):
+    """The ReAct agent as a StateGraph. Defaults to Gemini + Tavily (both through
+    their rateLimiter.py quotas); pass your own llm/tools to run it offline."""
+    from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+    from langgraph.graph import END, StateGraph
+
+    from rateLimiter import rate_limited
+    from singleFlight import single_flight
+
+    provider = None
+    if llm is None:
+        llm, provider = build_llm(), "google"
+    if tools is None:
+        search = build_search_tool()
+        # Only Tavily has a quota to respect
+        runner = search if os.getenv("LOCAL_SEARCH_INDEX") else rate_limited(search, "tavily")
+        tools, runners = [search], {search.name: runner}
+    else:
+        runners = {tool.name: tool for tool in tools}
+
+    # Shared quota with the other Gemini callers; 429s are retried
+    model = llm.bind_tools(tools)
+    final_model = llm
+    if provider is not None:
+        model, final_model = rate_limited(model, provider), rate_limited(llm, provider)
+
+    # Many users asking about the same trending topic at once: identical
+    # in-flight model turns and searches share one upstream call
+    if coalesce:
+        model, final_model = single_flight(model), single_flight(final_model)
+        runners = {name: single_flight(tool) for name, tool in runners.items()}
+
+    def agent_node(state, config):
+        messages = [SystemMessage(content=system_prompt)] + state["messages"]
+        if state.get("steps", 0) + 1 >= max_steps:
+            # Last turn of the budget: no tools, answer from what is there
+            response = final_model.invoke(messages + [HumanMessage(content=OUT_OF_STEPS_PROMPT)], config)
+            if getattr(response, "tool_calls", None):
+                response = AIMessage(content=response.content or "", id=response.id)
+        else:
+            response = model.invoke(messages, config)
+        return {"messages": [response], "steps": 1}
+
+    def tools_node(state, config):
+        return {"messages": run_tool_calls(state["messages"][-1].tool_calls, runners, config, max_concurrency)}
+
+    def should_continue(state) -> str:
+        return "tools" if getattr(state["messages"][-1], "tool_calls", None) else END
+
+    graph = StateGraph(agent_state())
+    graph.add_node("agent", agent_node)
+    graph.add_node("tools", tools_node)
+    graph.set_entry_point("agent")
+    graph.add_conditional_edges("agent", should_continue, {"tools": "tools", END: END})
+    graph.add_edge("tools", "agent")
+    return graph
+
+
+# Compiled agent. recursion_limit is a hard stop above the max_steps budget
+# (agent + tools per step), in case a run never settles.
+# verbose=True prints LangGraph's trace of every step (node inputs, writes and
+# state) while the agent runs; print_steps() below is the compact version.
+def build_app(llm=None, tools=None, verbose: bool = False, max_steps: int = MAX_STEPS,
+              max_concurrency: int = MAX_TOOL_CONCURRENCY, checkpointer=None):
+    graph = build_graph(llm, tools, max_steps=max_steps, max_concurrency=max_concurrency)
+    app = graph.compile(checkpointer=checkpointer, debug=verbose)
+    return app.with_config(recursion_limit=2 * max_steps + 1)
+
+
+# The default agent, built once and reused
+def get_app():
+    global _app
+    if _app is None:
+        _app = build_app()
+    return _app
+
+
+def initial_state(question: str) -> dict:
+    from langchain_core.messages import HumanMessage
+
+    return {"messages": [HumanMessage(content=question)], "steps": 0}
+
 
 # ---------------------------------------------------
-# 4. Put tools into a list
+# 5. Stream the intermediate steps
 # ---------------------------------------------------
-tools = [search_tool]
+# stream_steps() turns app.stream(...) into:
+#   {"type": "tool_call",   "name": "tavily_search_results_json", "args": {...}, "id": "..."}
+#   {"type": "tool_result", "name": "...", "content": "...", "id": "...", "status": "success" | "error"}
+#   {"type": "answer",      "content": "..."}
+def stream_steps(app, question: str, config: Optional[dict] = None) -> Iterator[dict]:
+    for update in app.stream(initial_state(question), config, stream_mode="updates"):
+        for node, values in update.items():
+            for message in (values or {}).get("messages", []):
+                if node == "agent" and message.tool_calls:
+                    for call in message.tool_calls:
+                        yield {"type": "tool_call", "name": call["name"], "args": call["args"], "id": call["id"]}
+                elif node == "agent":
+                    yield {"type": "answer", "content": message.content}
+                else:
+                    yield {
+                        "type": "tool_result", "name": message.name, "content": message.content,
+                        "id": message.tool_call_id, "status": message.status,
+                    }
+
+
+def print_steps(app, question: str, config: Optional[dict] = None) -> Optional[str]:
+    """CLI printer for stream_steps (what verbose=True used to show); returns the answer."""
+    answer = None
+    for step in stream_steps(app, question, config):
+        if step["type"] == "tool_call":
+            print(f"-> {step['name']}({step['args']})", flush=True)
+        elif step["type"] == "tool_result":
+            status = " (error)" if step["status"] == "error" else ""
+            print(f"<- {step['name']}{status}: {str(step['content'])[:120]}", flush=True)
+        else:
+            answer = step["content"]
+    return answer
+
 
 # ---------------------------------------------------
-# 5. Initialize the Agent
+# Benchmark: python ReactAgent.py --bench
+# Scripted questions that need 1-4 searches, fake model (0.3 s per turn) and
+# fake search (0.5 s per query). The old initialize_agent ReAct agent gets one
+# search per turn; this graph gets all of them in one turn, run at once.
 # ---------------------------------------------------
-# 'zero-shot-react-description' = The LLM decides which tools to use
-# based only on the tool descriptions and your query (no examples given).
-# verbose=True shows each step the agent takes.
-agent = initialize_agent(
-    tools=tools,
-    llm=llm,
-    agent='zero-shot-react-description',
-    verbose=True
-)
+def _bench(search_latency: float = 0.5, llm_latency: float = 0.3) -> None:
+    import sys
+    import time
+
+    from langchain_core.language_models.fake import FakeListLLM
+    from langchain_core.messages import AIMessage
+    from langchain_core.tools import tool
+
+    from fakeModels import FakeToolCallingChatModel
+
+    @tool
+    def search(query: str) -> str:
+        """Search the web."""
+        time.sleep(search_latency)
+        return f"results for {query}"
+
+    people = ["hania amir", "alia bhatt", "mahira khan", "deepika padukone"]
+
+    def parallel_model(queries: List[str]):
+        turns = {"count": 0}
+
+        def respond(messages):
+            turns["count"] += 1
+            if turns["count"] == 1:
+                return AIMessage(content="", tool_calls=[
+                    {"name": "search", "args": {"query": q}, "id": f"call_{i}"} for i, q in enumerate(queries)
+                ])
+            return AIMessage(content="Final answer from " + ", ".join(queries))
+
+        return FakeToolCallingChatModel(responses=[respond], latency=llm_latency)
+
+    class SlowFakeListLLM(FakeListLLM):
+        def _call(self, *args, **kwargs):
+            time.sleep(llm_latency)
+            return super()._call(*args, **kwargs)
+
+    def legacy_agent(queries: List[str]):
+        from langchain.agents import initialize_agent
+
+        script = [f"Thought: I need to search.\nAction: search\nAction Input: {q}" for q in queries]
+        script.append("Thought: I now know the final answer.\nFinal Answer: " + ", ".join(queries))
+        llm = SlowFakeListLLM(responses=script)
+        return initialize_agent(tools=[search], llm=llm, agent="zero-shot-react-description", verbose=False), llm
+
+    print(f"{'searches':>8}  {'legacy turns':>12} {'legacy s':>9}  {'graph turns':>11} {'graph s':>8}")
+    for count in range(1, len(people) + 1):
+        queries = [f"{person} instagram followers" for person in people[:count]]
+        question = "who is more popular: " + " or ".join(people[:count])
+
+        agent, llm = legacy_agent(queries)
+        start = time.perf_counter()
+        agent.invoke(question)
+        legacy_seconds, legacy_turns = time.perf_counter() - start, len(queries) + 1
+
+        model = parallel_model(queries)
+        app = build_app(model, [search])
+        start = time.perf_counter()
+        answer = app.invoke(initial_state(question))["messages"][-1].content
+        graph_seconds = time.perf_counter() - start
+        assert answer.startswith("Final answer"), answer
+
+        print(f"{count:8d}  {legacy_turns:12d} {legacy_seconds:9.2f}  {model.calls:11d} {graph_seconds:8.2f}")
+
 
 # ---------------------------------------------------
 # 6. Run the Agent
 # ---------------------------------------------------
-# When you call agent.invoke(), LangChain will:
-#   1. Pass your question to the LLM.
-#   2. The LLM thinks about the problem ("thought" step).
-#   3. If it decides it needs fresh info, it calls the Tavily tool.
-#   4. Tavily returns search results.
-#   5. LLM uses those results to craft the final answer.
-#   6. LangChain prints the intermediate steps because verbose=True.
-print("\n=== Asking the agent ===\n")
-response = agent.invoke("who is more popular hania amir or alia bhatt")
-
-print("\n=== Final Answer ===\n")
-print(response)
+# When you run this file, the agent will:
+#   1. Pass your question to the LLM, together with the search tool's schema.
+#   2. The LLM asks for one or more searches (native tool calls).
+#   3. All of them run against Tavily at the same time.
+#   4. The results go back to the LLM, which searches again or answers.
+#   5. Each step is printed as it happens.
+if __name__ == "__main__":
+    import sys
+
+    if "--bench" in sys.argv:
+        _bench()
+    else:
+        print("\n=== Asking the agent ===\n")
+        response = print_steps(get_app(), "who is more popular hania amir or alia bhatt")
+
+        print("\n=== Final Answer ===\n")
+        print(response)
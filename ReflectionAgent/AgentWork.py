@@ -1,10 +1,16 @@
+import os
+import sys
 from typing import List, Sequence
-from dotenv import load_dotenv
-from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from langgraph.graph import END, MessageGraph
-from Chain import generation_chain, reflection_chain  # 👈 importing from Code 1
 
-load_dotenv()
+# Run as a script: put the repo root (shared helpers: checkpointing.py, deadlines.py, ...) on the path;
+# importers (tests/, batchRunner.py, ...) have already done that
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bestOfN import build_best_of_n_graph
+from deadlines import get_deadline, mark_stopped_early, stopped_early, timed_node
+from stopping import CONVERGENCE_THRESHOLD, critique_is_empty, has_converged
 
 # ---------------------------------------------------
 # Define constants for node names
@@ -12,78 +18,188 @@ load_dotenv()
 REFLECT = "reflect"
 GENERATE = "generate"
 
-# ---------------------------------------------------
-# Create a MessageGraph (works directly with messages instead of dict state)
-# ---------------------------------------------------
-graph = MessageGraph()
+# Hard cap on tweet generations (2 == the original "more than 3 messages" rule).
+# Runs end sooner once a revised tweet is at least CONVERGENCE_THRESHOLD
+# similar to the previous one, or the critique has nothing left to change (stopping.py)
+MAX_GENERATIONS = 2
 
-# ---------------------------------------------------
-# Node 1: "Generate" node
-# This calls the generation_chain and produces a tweet
-# ---------------------------------------------------
-def generateNode(state):
-    # state here is the conversation history (list of messages)
-    return generation_chain.invoke({
-        'messages': state   # 👈 pass the full chat history into the chain
-    })
+# Best-of-N mode: draft this many tweets per round in parallel and keep the best one
+# (1 = the plain generate -> reflect loop below)
+BEST_OF_N = 1
+MAX_CONCURRENCY = 4
 
-# ---------------------------------------------------
-# Node 2: "Reflection" node
-# This critiques the previous tweet and returns feedback
-# ---------------------------------------------------
-def ReFlectionNode(state):
-    # Call reflection chain with the entire conversation history
-    response = reflection_chain.invoke({
-        'messages': state
-    })    
-    # Return critique as a HumanMessage (so it's treated like user feedback in history)
-    return [HumanMessage(content=response.content)]
+# Durable checkpoints: set CHECKPOINT_PATH (and THREAD_ID) in .env to make runs resumable
+# (read when the app is built, see get_app())
+DEFAULT_THREAD_ID = "reflection-demo"
+
+# Importing this module only defines things; the Gemini client and the
+# compiled graph are built on first use by get_app()
+_app = None
 
 # ---------------------------------------------------
 # Conditional function: should we continue or stop?
 # ---------------------------------------------------
 def ShouldContinue(state):
-    # If there are more than 3 messages in history, stop looping
-    if(len(state) > 3):
+    # The generate node already decided another round won't fit the deadline
+    if stopped_early(state[-1]):
+        return END
+    # History is: question, tweet, critique, tweet, critique, tweet, ...
+    generations = (len(state) + 1) // 2
+    # The revised tweet barely changed from the previous one, so stop early
+    if generations >= 2 and has_converged(state[-3].content, state[-1].content, CONVERGENCE_THRESHOLD):
+        return END
+    # Hard cap reached, stop looping
+    if generations >= MAX_GENERATIONS:
         return END
     # Otherwise, go to reflection node
     return REFLECT
 
 # ---------------------------------------------------
-# Add nodes to the graph
-# ---------------------------------------------------
-graph.add_node(GENERATE, generateNode)
-graph.add_node(REFLECT, ReFlectionNode)
+# Build the MessageGraph (works directly with messages instead of dict state).
+# The chains default to the Gemini ones in Chain.py; pass your own (e.g. built
+# on a fake chat model) to run it offline.
+# With a deadline in the run config (app.invoke(question, with_deadline(20)))
+# the loop returns its latest tweet instead of starting a reflect + generate
+# round it is not expected to finish; that tweet's response_metadata then has
+# stopped_early="deadline".
+# ---------------------------------------------------
+def build_graph(generation_chain=None, reflection_chain=None) -> MessageGraph:
+    if generation_chain is None or reflection_chain is None:
+        from Chain import get_chains
+        default_generation, default_reflection, _ = get_chains()
+        generation_chain = generation_chain or default_generation
+        reflection_chain = reflection_chain or default_reflection
 
-# ---------------------------------------------------
-# Add conditional edge:
-# After "generate" → check ShouldContinue()
-#   - If END → finish
-#   - Else → go to REFLECT
-# ---------------------------------------------------
-graph.add_conditional_edges(GENERATE, ShouldContinue)
+    # Node 1: "Generate" node
+    # This calls the generation_chain and produces a tweet
+    def generateNode(state, config):
+        # state here is the conversation history (list of messages)
+        tweet = generation_chain.invoke({
+            'messages': state   # 👈 pass the full chat history into the chain
+        })
+        # Would loop again, but the next round isn't expected to fit the deadline
+        deadline = get_deadline(config)
+        if deadline is not None and ShouldContinue(state + [tweet]) == REFLECT and not deadline.fits([REFLECT, GENERATE]):
+            deadline.stop_early()
+            return mark_stopped_early(tweet)
+        return tweet
 
-# ---------------------------------------------------
-# Entry point = GENERATE node
-# After reflection → go back to generate
-# ---------------------------------------------------
-graph.set_entry_point(GENERATE)
-graph.add_edge(REFLECT, GENERATE)
+    # Node 2: "Reflection" node
+    # This critiques the previous tweet and returns feedback
+    def ReFlectionNode(state):
+        # Call reflection chain with the entire conversation history
+        response = reflection_chain.invoke({
+            'messages': state
+        })
+        # Nothing left to change: add nothing, so the tweet stays the last message and the run ends
+        if critique_is_empty(response.content):
+            return []
+        # Return critique as a HumanMessage (so it's treated like user feedback in history)
+        return [HumanMessage(content=response.content)]
+
+    # After reflection: revise, unless the critique came back empty
+    def AfterReflection(state):
+        return END if isinstance(state[-1], AIMessage) else GENERATE
+
+    graph = MessageGraph()
+
+    # Add nodes to the graph (timed, for the deadline predictions)
+    graph.add_node(GENERATE, timed_node(GENERATE, generateNode))
+    graph.add_node(REFLECT, timed_node(REFLECT, ReFlectionNode))
+
+    # After "generate" → check ShouldContinue()
+    #   - If END → finish
+    #   - Else → go to REFLECT
+    graph.add_conditional_edges(GENERATE, ShouldContinue)
+
+    # Entry point = GENERATE node
+    # After reflection → go back to generate
+    graph.set_entry_point(GENERATE)
+    graph.add_conditional_edges(REFLECT, AfterReflection)
+    return graph
 
 # ---------------------------------------------------
-# Compile the graph into an app
+# Compile the graph into an app. Best-of-N mode swaps in a graph whose single
+# node drafts + scores `best_of_n` tweets per round (see bestOfN.py).
 # ---------------------------------------------------
-app = graph.compile()
+def build_app(checkpointer=None, best_of_n: int = BEST_OF_N, generation_chain=None, reflection_chain=None, scoring_chain=None):
+    if best_of_n <= 1:
+        return build_graph(generation_chain, reflection_chain).compile(checkpointer=checkpointer)
+
+    if generation_chain is None or scoring_chain is None:
+        from Chain import get_candidate_chain, get_chains
+        _, _, default_scoring = get_chains()
+        # Candidates come from the uncached client: cached drafts would all be the same tweet
+        generation_chain = generation_chain or get_candidate_chain()
+        scoring_chain = scoring_chain or default_scoring
+    return build_best_of_n_graph(
+        generation_chain,
+        scoring_chain,
+        n=best_of_n,
+        max_concurrency=MAX_CONCURRENCY,
+        max_generations=MAX_GENERATIONS,
+        convergence_threshold=CONVERGENCE_THRESHOLD,
+    ).compile(checkpointer=checkpointer)
 
 # ---------------------------------------------------
-# Debugging visualization of graph
+# The app configured from .env (SQLite checkpointer when CHECKPOINT_PATH is
+# set), built once and shared by every caller in the process
 # ---------------------------------------------------
-print(app.get_graph().draw_mermaid())  # Mermaid syntax diagram
-app.get_graph().print_ascii()          # ASCII diagram
+def get_app():
+    global _app
+    if _app is None:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        checkpointer = None
+        if os.getenv("CHECKPOINT_PATH"):
+            from checkpointing import sqlite_checkpointer
+            checkpointer = sqlite_checkpointer(os.getenv("CHECKPOINT_PATH"))
+        _app = build_app(checkpointer=checkpointer)
+    return _app
+
+
+# `from AgentWork import app` still works, it just builds the app on first access
+def __getattr__(name):
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ---------------------------------------------------
-# Run the app with initial human input
+# Only run the demo when executed directly
 # ---------------------------------------------------
-response = app.invoke(HumanMessage(content="How Has Hania Amir Gotten Famous?"))
+def main():
+    app = get_app()
+    checkpointer = app.checkpointer
+
+    # Debugging visualization of graph
+    print(app.get_graph().draw_mermaid())  # Mermaid syntax diagram
+    app.get_graph().print_ascii()          # ASCII diagram
+
+    # Optional time budget for the whole run (DEADLINE_SECONDS in .env)
+    config = None
+    if os.getenv("DEADLINE_SECONDS"):
+        from deadlines import with_deadline
+        config = with_deadline(float(os.getenv("DEADLINE_SECONDS")))
+
+    # Run the app with initial human input
+    question = HumanMessage(content="How Has Hania Amir Gotten Famous?")
+    if checkpointer is not None:
+        # Same THREAD_ID again resumes an interrupted run from its last completed step
+        from checkpointing import run_or_resume
+        response = run_or_resume(app, question, os.getenv("THREAD_ID", DEFAULT_THREAD_ID), config)
+        print("Checkpoint writes:", checkpointer.stats())
+    else:
+        response = app.invoke(question, config)
+
+    print(response)   # 👈 Final output after looping
+    if config is not None:
+        print("Deadline:", get_deadline(config).report())
+
+    from Chain import get_llm_cache
+    if get_llm_cache() is not None:
+        print("LLM cache:", get_llm_cache().stats())
+
 
-print(response)   # 👈 Final output after looping
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,19 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_google_genai import ChatGoogleGenerativeAI
 import os
-from dotenv import load_dotenv
+
+from stopping import NO_CHANGES
 
 # ---------------------------------------------------
-# 1. Load environment variables from .env
+# 1. Nothing below talks to Gemini or reads .env at import time: the client
+#    and chains are built on first use (get_llm() / get_chains()), so importing
+#    this module stays fast and works without an API key.
 # ---------------------------------------------------
-load_dotenv()
+_env_loaded = False
+_llm = None
+_uncached_llm = None
+_llm_cache = None
+_chains = None
+_candidate_chain = None
 
 # ---------------------------------------------------
 # 2. Create the "generation" prompt template
@@ -32,7 +39,8 @@ reflection_prompt = ChatPromptTemplate.from_messages(
         (
             "system",   # 👈 Instructions for reflection phase
             "You are a viral twitter influencer grading a tweet. Generate critique and recommendations for the user's tweet."
-            "Always provide detailed recommendations, including requests for length, virality, style, etc.",
+            "Always provide detailed recommendations, including requests for length, virality, style, etc."
+            f" If the tweet can't be meaningfully improved any more, reply only with '{NO_CHANGES}'",
         ),
         # 👇 Again, insert the entire conversation history here
         MessagesPlaceholder(variable_name="messages"),
@@ -40,16 +48,126 @@ reflection_prompt = ChatPromptTemplate.from_messages(
 )
 
 # ---------------------------------------------------
-# 4. Setup Google Gemini as the LLM
+# 3b. "Scoring" prompt: same critique, plus a score so candidates can be ranked
+#     (used by the best-of-N mode in bestOfN.py)
 # ---------------------------------------------------
-google_api_key = os.getenv("googleapi")  # read API key from .env
-llm = ChatGoogleGenerativeAI(
-    model='gemini-1.5-flash',            # Fast + cheap model for testing
-    google_api_key=google_api_key
+scoring_prompt = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            "You are a viral twitter influencer grading a tweet. Generate critique and recommendations for the user's tweet."
+            "Always provide detailed recommendations, including requests for length, virality, style, etc."
+            f" If the tweet can't be meaningfully improved any more, write only '{NO_CHANGES}' before the score."
+            " Finish with a final line of the form 'Score: N/10' rating the tweet as it is now.",
+        ),
+        MessagesPlaceholder(variable_name="messages"),
+    ]
 )
 
 # ---------------------------------------------------
-# 5. Combine prompts with LLM into runnable "chains"
+# 4. Optional response cache (off unless LLM_CACHE_MODE is set in .env)
+#    LLM_CACHE_MODE=exact       -> reuse answers for identical conversations
+#    LLM_CACHE_MODE=normalized  -> ... also ignoring case/whitespace differences
+#    Best-of-N drafts skip the cache (see get_candidate_chain()): N drafts of
+#    the same prompt are supposed to differ.
+# ---------------------------------------------------
+def _load_env():
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _env_loaded = True
+
+
+def get_llm_cache():
+    global _llm_cache
+    _load_env()
+    if _llm_cache is None and os.getenv("LLM_CACHE_MODE"):
+        from llmCache import SQLiteLLMCache
+        _llm_cache = SQLiteLLMCache(
+            os.getenv("LLM_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".llm_cache.sqlite")),
+            mode=os.getenv("LLM_CACHE_MODE"),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000")),
+        )
+    return _llm_cache
+
+# ---------------------------------------------------
+# 5. Setup Google Gemini as the LLM (created once, on first use)
+#    The client comes from the shared registry, so it is the same one (same
+#    connections, same concurrency limit) the StructuredOutput scripts use.
 # ---------------------------------------------------
-generation_chain = generation_prompt | llm   # "pipe" means: fill prompt -> send to LLM
-reflection_chain = reflection_prompt | llm
+def get_llm(cached: bool = True):
+    """The Gemini client; cached=False gives one that never reads or writes the response cache."""
+    global _llm, _uncached_llm
+    if cached and _llm is not None:
+        return _llm
+    if not cached and _uncached_llm is not None:
+        return _uncached_llm
+
+    from modelRegistry import get_chat_model
+
+    cache = get_llm_cache()                # also loads .env
+    google_api_key = os.getenv("googleapi")  # read API key from .env
+    if not cached:
+        # cache=False rather than leaving it out: LangChain falls back to a global cache otherwise
+        params = {"cache": False}
+    else:
+        params = {"cache": cache} if cache is not None else {}
+    llm = get_chat_model(
+        "google",
+        'gemini-1.5-flash',                  # Fast + cheap model for testing
+        google_api_key=google_api_key,
+        max_retries=0,                       # 429s are retried by the "google" rate limiter (rateLimiter.py)
+        **params,
+    )
+    if cached:
+        _llm = llm
+    else:
+        _uncached_llm = llm
+    return llm
+
+# ---------------------------------------------------
+# 6. Combine prompts with LLM into runnable "chains"
+#    Returns (generation_chain, reflection_chain, scoring_chain)
+# ---------------------------------------------------
+#    Each chain goes through the shared "google" rate limiter (rateLimiter.py):
+#    requests wait for quota and 429s are retried with backoff.
+def get_chains():
+    global _chains
+    if _chains is None:
+        from rateLimiter import rate_limited
+
+        llm = get_llm()
+        _chains = (
+            rate_limited(generation_prompt | llm, "google"),   # "pipe" means: fill prompt -> send to LLM
+            rate_limited(reflection_prompt | llm, "google"),
+            rate_limited(scoring_prompt | llm, "google"),
+        )
+    return _chains
+
+
+# Best-of-N drafts (bestOfN.py): the generation chain on the uncached client,
+# so the N candidates for one prompt are N real samples, not one cached answer
+def get_candidate_chain():
+    global _candidate_chain
+    if _candidate_chain is None:
+        from rateLimiter import rate_limited
+
+        _candidate_chain = rate_limited(generation_prompt | get_llm(cached=False), "google")
+    return _candidate_chain
+
+
+CHAIN_NAMES = ("generation_chain", "reflection_chain", "scoring_chain")
+
+
+# `from Chain import generation_chain` (and llm, llm_cache) still works:
+# the names are resolved lazily through the getters above
+def __getattr__(name):
+    if name == "llm":
+        return get_llm()
+    if name == "llm_cache":
+        return get_llm_cache()
+    if name in CHAIN_NAMES:
+        return get_chains()[CHAIN_NAMES.index(name)]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,81 @@
+import re
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, MessageGraph
+
+from deadlines import get_deadline, mark_stopped_early, timed_node
+from stopping import CONVERGENCE_THRESHOLD, critique_is_empty, has_converged
+
+# ---------------------------------------------------
+# Best-of-N mode for the Reflection agent
+#
+# Each round drafts N tweets at once, has the reflection model critique and
+# score all of them at once, and keeps only the best tweet + its critique.
+# Same quality in fewer serial rounds, for N times the (parallel) LLM calls.
+# ---------------------------------------------------
+
+GENERATE = "generate"
+N_CANDIDATES = 3
+MAX_CONCURRENCY = 4
+
+# Matches "Score: 7", "score = 7.5/10", ...
+SCORE_PATTERN = re.compile(r"score\s*[:=]?\s*(\d+(?:\.\d+)?)\s*(?:/\s*10)?", re.IGNORECASE)
+
+
+def parse_score(critique: str) -> float:
+    # The last "Score: N" in the critique wins; no score at all ranks lowest
+    matches = SCORE_PATTERN.findall(critique or "")
+    return float(matches[-1]) if matches else -1.0
+
+
+def make_best_of_n_node(
+    generation_chain,
+    scoring_chain,
+    n: int = N_CANDIDATES,
+    max_concurrency: int = MAX_CONCURRENCY,
+    max_generations: int = 4,
+    convergence_threshold: float = CONVERGENCE_THRESHOLD,
+):
+    def best_of_n_node(state, config):
+        # The run's config (callbacks, deadline, ...) plus our cap on parallel LLM calls
+        batch_config = {**(config or {}), "max_concurrency": max_concurrency}
+
+        # 1. N candidate tweets for the same history, generated in parallel
+        candidates = generation_chain.batch([{"messages": state}] * n, batch_config)
+
+        # 2. Critique + score every candidate in parallel
+        critiques = scoring_chain.batch([{"messages": state + [c]} for c in candidates], batch_config)
+        scores = [parse_score(critique.content) for critique in critiques]
+        best = max(range(n), key=lambda i: scores[i])
+        tweet = candidates[best]
+
+        # 3. Keep only the winner; its critique drives the next round unless we're done
+        # (converged or nothing left to critique first: those are the early stops)
+        round_number = (len(state) - 1) // 2 + 1
+        if round_number >= 2 and has_converged(state[-2].content, tweet.content, convergence_threshold):
+            return [tweet]
+        if critique_is_empty(critiques[best].content) or round_number >= max_generations:
+            return [tweet]
+        # Another round won't fit the caller's deadline: return the best tweet so far
+        deadline = get_deadline(config)
+        if deadline is not None and not deadline.fits([GENERATE]):
+            deadline.stop_early()
+            return [mark_stopped_early(tweet)]
+        return [tweet, HumanMessage(content=critiques[best].content)]
+
+    return best_of_n_node
+
+
+def should_continue(state):
+    # The node only leaves a critique at the end of the history when another round is wanted
+    if isinstance(state[-1], AIMessage):
+        return END
+    return GENERATE
+
+
+def build_best_of_n_graph(generation_chain, scoring_chain, **kwargs) -> MessageGraph:
+    graph = MessageGraph()
+    graph.add_node(GENERATE, timed_node(GENERATE, make_best_of_n_node(generation_chain, scoring_chain, **kwargs)))
+    graph.add_conditional_edges(GENERATE, should_continue)
+    graph.set_entry_point(GENERATE)
+    return graph
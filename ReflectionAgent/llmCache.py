@@ -0,0 +1,118 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+# ---------------------------------------------------
+# Persistent response cache for the chat models (LangChain `cache=` hook)
+#
+#   llm = ChatGoogleGenerativeAI(..., cache=SQLiteLLMCache("llm_cache.sqlite"))
+#
+# Entries are keyed on the model config string LangChain builds (model name +
+# parameters) and a canonical hash of the rendered message list. Message ids
+# and other bookkeeping are ignored, so the same conversation always hits.
+#   mode="exact"      -> message type + content + tool calls must match exactly
+#   mode="normalized" -> also ignores case and whitespace differences in content
+# ---------------------------------------------------
+
+CACHE_MODES = ("exact", "normalized")
+DEFAULT_MAX_ENTRIES = 5_000
+
+
+def _canonical_messages(prompt: str, normalized: bool) -> list:
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return [prompt]
+    canonical = []
+    for message in messages if isinstance(messages, list) else [messages]:
+        kwargs = message.get("kwargs", {}) if isinstance(message, dict) else {}
+        content = kwargs.get("content", "")
+        if normalized and isinstance(content, str):
+            content = " ".join(content.lower().split())
+        canonical.append([
+            (message.get("id") or ["?"])[-1] if isinstance(message, dict) else "?",
+            content,
+            [[call.get("name"), call.get("args")] for call in kwargs.get("tool_calls") or []],
+        ])
+    return canonical
+
+
+def cache_key(prompt: str, llm_string: str, mode: str = "exact") -> str:
+    payload = json.dumps(
+        [llm_string, _canonical_messages(prompt, mode == "normalized")],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteLLMCache(BaseCache):
+    """SQLite-backed LLM cache, capped at `max_entries` with least-recently-used eviction."""
+
+    def __init__(self, path: str, mode: str = "exact", max_entries: int = DEFAULT_MAX_ENTRIES):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"mode must be one of {CACHE_MODES}, got {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used)")
+        return self._conn
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        key = cache_key(prompt, llm_string, self.mode)
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            self.hits += 1
+        return loads(row[0])
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        key = cache_key(prompt, llm_string, self.mode)
+        value = dumps(list(return_val))
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, last_used) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM llm_cache")
+            conn.commit()
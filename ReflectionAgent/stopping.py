@@ -0,0 +1,27 @@
+import re
+
+# Same similarity check the Reflexion loop uses; re-exported for AgentWork.py and bestOfN.py
+from textSimilarity import CONVERGENCE_THRESHOLD, texts_converged as has_converged
+
+# ---------------------------------------------------
+# Early-stop checks for the Reflection loop (AgentWork.py and bestOfN.py)
+#
+# Stop once a revised tweet has barely changed from the previous one, or once
+# the critique has nothing left to ask for (the reflection prompt tells the
+# model to answer NO_CHANGES then). MAX_GENERATIONS is still the hard cap.
+# ---------------------------------------------------
+
+NO_CHANGES = "No further changes."
+
+_SCORE_LINE = re.compile(r"^\s*score\s*[:=].*$", re.IGNORECASE | re.MULTILINE)
+_NOTHING_TO_DO = re.compile(
+    r"^\W*(no (further |more )?(changes|improvements|recommendations|edits)( (are )?(needed|required))?"
+    r"|nothing (left )?to (change|improve)|lgtm)\W*$",
+    re.IGNORECASE,
+)
+
+
+def critique_is_empty(critique: str) -> bool:
+    # A "Score: N/10" line (best-of-N scoring prompt) doesn't count as critique
+    text = _SCORE_LINE.sub("", critique or "").strip()
+    return not text or bool(_NOTHING_TO_DO.match(text))
@@ -1,7 +1,6 @@
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 import datetime
-from langchain_openai import ChatOpenAI
-from schema import AnswerQuestion, ReviseAnswer
+from Schema import AnswerQuestion, ReviseAnswer
 from langchain_core.output_parsers.openai_tools import PydanticToolsParser, JsonOutputToolsParser
 from langchain_core.messages import HumanMessage
 
@@ -33,9 +32,23 @@ first_responder_prompt_template = actor_prompt_template.partial(
     first_instruction="Provide a detailed ~250 word answer"
 )
 
-llm = ChatOpenAI(model="gpt-4o")
+# The OpenAI client (and the chains using it) are created on first use, not at
+# import time, so importing this module is fast and needs no OPENAI_API_KEY
+_llm = None
+_chains = None
 
-first_responder_chain = first_responder_prompt_template | llm.bind_tools(tools=[AnswerQuestion], tool_choice='AnswerQuestion') 
+
+def get_llm():
+    global _llm
+    if _llm is None:
+        from dotenv import load_dotenv
+        from modelRegistry import get_chat_model
+
+        load_dotenv()
+        # Shared, pooled client from the registry (see modelRegistry.py)
+        # max_retries=0: 429s are retried by the "openai" rate limiter (rateLimiter.py)
+        _llm = get_chat_model("openai", "gpt-4o", max_retries=0)
+    return _llm
 
 validator = PydanticToolsParser(tools=[AnswerQuestion])
 
@@ -50,9 +63,35 @@ revise_instructions = """Revise your previous answer using the new information.
     - You should use the previous critique to remove superfluous information from your answer and make SURE it is not more than 250 words.
 """
 
-revisor_chain = actor_prompt_template.partial(
+revisor_prompt_template = actor_prompt_template.partial(
     first_instruction=revise_instructions
-) | llm.bind_tools(tools=[ReviseAnswer], tool_choice="ReviseAnswer")
+)
+
+
+# Returns (first_responder_chain, revisor_chain), both behind the shared
+# "openai" rate limiter (quota-aware, retries 429s; see rateLimiter.py)
+def get_chains():
+    global _chains
+    if _chains is None:
+        from rateLimiter import rate_limited
+
+        llm = get_llm()
+        _chains = (
+            rate_limited(first_responder_prompt_template | llm.bind_tools(tools=[AnswerQuestion], tool_choice='AnswerQuestion'), "openai"),
+            rate_limited(revisor_prompt_template | llm.bind_tools(tools=[ReviseAnswer], tool_choice="ReviseAnswer"), "openai"),
+        )
+    return _chains
+
+
+# `from Chains import first_responder_chain, revisor_chain` still works (built lazily)
+def __getattr__(name):
+    if name == "llm":
+        return get_llm()
+    if name == "first_responder_chain":
+        return get_chains()[0]
+    if name == "revisor_chain":
+        return get_chains()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # response = first_responder_chain.invoke({
 #     "messages": [HumanMessage("AI Agents taking over content creation")]
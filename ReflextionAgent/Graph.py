@@ -1,39 +1,268 @@
-from typing import List
+import operator
+import os
+import sys
+import threading
+import uuid
+from contextlib import nullcontext
+from typing import Annotated, Dict, List, TypedDict
 
-from langchain_core.messages import BaseMessage, ToolMessage
-from langgraph.graph import END, MessageGraph
+from langchain_core.messages import BaseMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.config import get_stream_writer
+from langgraph.graph import END, StateGraph
+from langgraph.graph.message import add_messages
 
-from chains import revisor_chain, first_responder_chain
-from execute_tools import execute_tools
+# Run as a script: put the repo root (shared helpers: deadlines.py, checkpointing.py, ...) on the path;
+# importers (tests/, batchRunner.py, ...) have already done that
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contextCompaction import compact_messages
+from convergence import has_converged
+from executeTools import aexecute_tools, collect_search_queries, execute_tools
+from queryDedup import count_skipped_queries
+from speculativeSearch import SpeculativeSearcher
+
+from deadlines import get_deadline, timed_node
 
-graph = MessageGraph()
 MAX_ITERATIONS = 2
+# Nodes one more search + revise round runs (what a deadline has to fit)
+ROUND_NODES = ("execute_tools", "revisor")
 
-graph.add_node("draft", first_responder_chain)
-graph.add_node("execute_tools", execute_tools)
-graph.add_node("revisor", revisor_chain)
 
+# Graph state: the message history (appended to by every node) plus a running
+# count of execute_tools passes, so routing never has to rescan the history,
+# the number of prompt tokens the revisor compaction saved, whether the
+# latest revision has converged (see convergence.py), the search time
+# (seconds) speculative search saved, and whether the run returned its latest
+# answer early because another round would not fit the deadline.
+class ReflexionState(TypedDict):
+    messages: Annotated[List[BaseMessage], add_messages]
+    iterations: Annotated[int, operator.add]
+    tokens_saved: Annotated[int, operator.add]
+    converged: bool
+    search_time_saved: Annotated[float, operator.add]
+    stopped_early: bool
 
-graph.add_edge("draft", "execute_tools")
-graph.add_edge("execute_tools", "revisor")
 
-def event_loop(state: List[BaseMessage]) -> str:
-    count_tool_visits = sum(isinstance(item, ToolMessage) for item in state)
-    num_iterations = count_tool_visits
+def event_loop(state: ReflexionState) -> str:
+    num_iterations = state["iterations"]
     if num_iterations > MAX_ITERATIONS:
         return END
+    # Answer stopped changing (or the critique is empty): another round won't help
+    if state.get("converged"):
+        return END
+    # Another round would not finish before the deadline: keep the latest answer
+    if state.get("stopped_early"):
+        return END
     return "execute_tools"
 
-graph.add_conditional_edges("revisor", event_loop)
-graph.set_entry_point("draft")
 
-app = graph.compile()
+def after_draft(state: ReflexionState) -> str:
+    return END if state.get("stopped_early") else "execute_tools"
+
+
+# True when the caller's deadline (config, see deadlines.py) can't fit another round
+def out_of_time(config) -> bool:
+    deadline = get_deadline(config)
+    if deadline is None or deadline.fits(ROUND_NODES):
+        return False
+    deadline.stop_early()
+    return True
+
+
+# Build the Reflexion graph. The chains default to the OpenAI ones in Chains.py;
+# pass your own (e.g. built on a fake chat model) to run it offline.
+# With speculative=True the draft is streamed and its search queries start
+# running as soon as each one is complete, before the answer has finished.
+# Every run gets its own SpeculativeSearcher, handed from the draft node to
+# execute_tools under the draft message's id, so concurrent runs of one
+# compiled graph never see each other's searches.
+# Pass a deadline in the run config (app.invoke(inputs, with_deadline(30)))
+# and the graph returns its latest answer instead of starting a round it is
+# not expected to finish in time.
+def build_graph(first_responder=None, revisor=None, search_tool=None, speculative: bool = False) -> StateGraph:
+    if first_responder is None or revisor is None:
+        from Chains import get_chains
+        first_responder_chain, revisor_chain = get_chains()
+        first_responder = first_responder or first_responder_chain
+        revisor = revisor or revisor_chain
+
+    # draft message id -> the searcher its run's execute_tools picks up
+    searchers: Dict[str, SpeculativeSearcher] = {}
+    searchers_lock = threading.Lock()
+
+    def draft_node(state: ReflexionState, config):
+        if not speculative:
+            draft = first_responder.invoke({"messages": state["messages"]})
+            return {"messages": [draft], "stopped_early": out_of_time(config)}
+
+        searcher = SpeculativeSearcher(search_tool)
+        try:
+            draft = searcher.stream_draft(first_responder, {"messages": state["messages"]})
+        except BaseException:
+            searcher.close()
+            raise
+        if draft.id is None:
+            draft.id = str(uuid.uuid4())
+        stopped = out_of_time(config)
+        if stopped:
+            searcher.close()
+        else:
+            with searchers_lock:
+                searchers[draft.id] = searcher
+        return {"messages": [draft], "stopped_early": stopped}
+
+    # The searcher the draft node left for this run (None after the first round,
+    # or when the run was resumed in another process)
+    def take_searcher(state: ReflexionState):
+        with searchers_lock:
+            return searchers.pop(state["messages"][-1].id, None)
+
+    # Search progress goes out on the "custom" stream (no-op when not streaming)
+    def search_progress():
+        writer = get_stream_writer()
+        return lambda query, status: writer({"search": query, "status": status})
+
+    def search_update(state: ReflexionState, messages: list, searcher) -> dict:
+        if searcher is None:
+            return {"messages": messages, "iterations": 1}
+        queries = [query for _, search_queries in collect_search_queries(state["messages"]) for query in search_queries]
+        return {"messages": messages, "iterations": 1, "search_time_saved": searcher.finish(queries)}
+
+    def execute_tools_node(state: ReflexionState):
+        searcher = take_searcher(state)
+        with searcher or nullcontext():
+            messages = execute_tools(state["messages"], tool=searcher or search_tool, progress=search_progress())
+            return search_update(state, messages, searcher)
+
+    # Same node for app.ainvoke / app.astream: searches run on the event loop
+    async def aexecute_tools_node(state: ReflexionState):
+        searcher = take_searcher(state)
+        with searcher or nullcontext():
+            messages = await aexecute_tools(state["messages"], tool=searcher or search_tool, progress=search_progress())
+            return search_update(state, messages, searcher)
+
+    # The revisor sees a compacted copy of the history (older drafts and search
+    # payloads trimmed); the full history stays in the graph state.
+    def revisor_node(state: ReflexionState, config):
+        messages, report = compact_messages(state["messages"])
+        revision = revisor.invoke({"messages": messages})
+        converged = has_converged(state["messages"] + [revision])
+        another_round = state["iterations"] <= MAX_ITERATIONS and not converged
+        return {
+            "messages": [revision],
+            "tokens_saved": report["saved"],
+            "converged": converged,
+            "stopped_early": another_round and out_of_time(config),
+        }
+
+    graph = StateGraph(ReflexionState)
+
+    # timed_node records each node's duration for the deadline predictions
+    graph.add_node("draft", timed_node("draft", draft_node))
+    graph.add_node("execute_tools", RunnableLambda(
+        timed_node("execute_tools", execute_tools_node),
+        timed_node("execute_tools", aexecute_tools_node),
+        name="execute_tools",
+    ))
+    graph.add_node("revisor", timed_node("revisor", revisor_node))
+
+    graph.add_conditional_edges("draft", after_draft, ["execute_tools", END])
+    graph.add_edge("execute_tools", "revisor")
+
+    graph.add_conditional_edges("revisor", event_loop)
+    graph.set_entry_point("draft")
+    return graph
+
+
+def build_app(checkpointer=None, **kwargs):
+    """Compiled Reflexion graph; kwargs go to build_graph()."""
+    return build_graph(**kwargs).compile(checkpointer=checkpointer)
+
+
+# The app configured from .env (OpenAI chains, Tavily search, SQLite
+# checkpointer when CHECKPOINT_PATH is set), built once on first use so that
+# importing this module stays cheap
+_app = None
+
+
+def get_app():
+    global _app
+    if _app is None:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        checkpointer = None
+        if os.getenv("CHECKPOINT_PATH"):
+            from checkpointing import sqlite_checkpointer
+            checkpointer = sqlite_checkpointer(os.getenv("CHECKPOINT_PATH"))
+        _app = build_app(checkpointer=checkpointer)
+    return _app
+
+
+def initial_state(question: str) -> ReflexionState:
+    return {
+        "messages": [HumanMessage(content=question)],
+        "iterations": 0,
+        "tokens_saved": 0,
+        "converged": False,
+        "search_time_saved": 0.0,
+        "stopped_early": False,
+    }
+
+
+# python Graph.py [--stream] [--speculative] [--thread=ID] [--deadline=SECONDS] ["question"]
+# With --thread the run is checkpointed to CHECKPOINT_PATH; running the same
+# thread id again resumes it from the last completed step. With --deadline the
+# run returns its best answer so far rather than overrun.
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    question = args[0] if args else "Write about how small business can leverage AI to grow"
+    thread_id = next((arg.split("=", 1)[1] for arg in sys.argv if arg.startswith("--thread=")), None)
+    deadline_seconds = next((float(arg.split("=", 1)[1]) for arg in sys.argv if arg.startswith("--deadline=")), None)
+
+    checkpointer, config = None, None
+    if thread_id:
+        from checkpointing import sqlite_checkpointer, thread_config
+        checkpoint_path = os.getenv(
+            "CHECKPOINT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".checkpoints.sqlite")
+        )
+        checkpointer = sqlite_checkpointer(checkpoint_path)
+        config = thread_config(thread_id)
+
+    if deadline_seconds is not None:
+        from deadlines import with_deadline
+        config = with_deadline(deadline_seconds, config)
+
+    app = build_app(checkpointer, speculative="--speculative" in sys.argv)
 
-print(app.get_graph().draw_mermaid())
+    inputs, response = initial_state(question), None
+    if config is not None:
+        snapshot = app.get_state(config)
+        if snapshot.next:
+            print(f"Resuming thread {thread_id} at {snapshot.next}")
+            inputs = None
+        elif snapshot.values:
+            print(f"Thread {thread_id} already finished; use a new --thread id to start over")
+            response = snapshot.values
 
-response = app.invoke(
-    "Write about how small business can leverage AI to grow"
-)
+    if response is None and "--stream" in sys.argv:
+        from streaming import print_stream
+        response = print_stream(app, inputs, config)
+    elif response is None:
+        print(app.get_graph().draw_mermaid())
+        response = app.invoke(inputs, config)
+        print(response["messages"][-1].tool_calls[0]["args"]["answer"])
+        print(response, "response")
 
-print(response[-1].tool_calls[0]["args"]["answer"])
-print(response, "response")
\ No newline at end of file
+    print("Search queries skipped (already answered):", count_skipped_queries(response["messages"]))
+    print("Revisor prompt tokens saved by compaction:", response["tokens_saved"])
+    print(f"Search time saved by speculative search: {response['search_time_saved']:.2f}s")
+    if checkpointer is not None:
+        print("Checkpoint writes:", checkpointer.stats())
+    if deadline_seconds is not None:
+        print("Deadline:", get_deadline(config).report())
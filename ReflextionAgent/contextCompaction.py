@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Callable, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+from toolPayload import decode_tool_payload, dumps
+
+# ---------------------------------------------------
+# Context compaction for the revisor prompt
+#
+# The revisor only needs the latest answer + the latest search results in full.
+# Everything older is squeezed by a list of pluggable strategies, and a token
+# budget can force more aggressive trimming. The graph state itself is never
+# touched: only the copy of the history that goes into the prompt is compacted.
+# ---------------------------------------------------
+
+SNIPPET_CHARS = 200
+REVISOR_TOKEN_BUDGET: Optional[int] = None   # e.g. 6000; None = strategies only
+SUPERSEDED = "[superseded by a later revision]"
+
+_FALLBACK_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_ENCODING_URL = "https://openaipublic.blob.core.windows.net/encodings/o200k_base.tiktoken"
+_encoding = None
+
+
+def _encoding_is_cached() -> bool:
+    # Where tiktoken keeps downloaded encodings (tiktoken.load.read_file_cached);
+    # get_encoding() would fetch the file over the network if it isn't there
+    cache_dir = os.environ.get("TIKTOKEN_CACHE_DIR", os.environ.get("DATA_GYM_CACHE_DIR"))
+    if cache_dir is None:
+        cache_dir = os.path.join(tempfile.gettempdir(), "data-gym-cache")
+    if not cache_dir:
+        return False
+    return os.path.exists(os.path.join(cache_dir, hashlib.sha1(_ENCODING_URL.encode()).hexdigest()))
+
+
+def count_tokens(text: str) -> int:
+    # tiktoken when the o200k_base file is already in its local cache (fetch it
+    # once with `python -c "import tiktoken; tiktoken.get_encoding('o200k_base')"`),
+    # otherwise a words-and-punctuation count (close enough to compare
+    # before/after sizes). Never downloads anything.
+    global _encoding
+    if _encoding is None:
+        _encoding = False
+        if _encoding_is_cached():
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding("o200k_base")
+            except Exception:
+                pass
+    if _encoding:
+        return len(_encoding.encode(text))
+    return len(_FALLBACK_TOKEN_RE.findall(text))
+
+
+def message_tokens(message: BaseMessage) -> int:
+    text = message.content if isinstance(message.content, str) else json.dumps(message.content)
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        text += json.dumps(tool_call["args"])
+    return count_tokens(text)
+
+
+def history_tokens(messages: Sequence[BaseMessage]) -> int:
+    return sum(message_tokens(message) for message in messages)
+
+
+def _latest_index(messages: Sequence[BaseMessage], kind) -> int:
+    for i in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[i], kind):
+            return i
+    return -1
+
+
+def _trim_hit(hit, snippet_chars: int, text_key: str = "content"):
+    if not isinstance(hit, dict):
+        return hit
+    trimmed = {key: hit[key] for key in ("title", "url") if key in hit}
+    if snippet_chars and hit.get(text_key):
+        trimmed[text_key] = hit[text_key][:snippet_chars]
+    return trimmed
+
+
+def _referenced_ids(message: Optional[BaseMessage]) -> set:
+    if message is None:
+        return set()
+    ids = set()
+    for hits in decode_tool_payload(message.content)["queries"].values():
+        if isinstance(hits, list):
+            ids.update(hit for hit in hits if isinstance(hit, int))
+    return ids
+
+
+def _trim_payload(content: str, snippet_chars: int, keep_ids: set) -> str:
+    payload = decode_tool_payload(content)
+    if not payload["queries"]:
+        return content
+    if payload["sources"]:
+        # Compact format: sources still referenced by the latest search stay whole
+        sources = {
+            source_id: source if int(source_id) in keep_ids else _trim_hit(source, snippet_chars, "snippet")
+            for source_id, source in payload["sources"].items()
+        }
+        return dumps({"sources": sources, "queries": payload["queries"]})
+    return dumps({
+        query: [_trim_hit(hit, snippet_chars) for hit in hits] if isinstance(hits, list) else hits
+        for query, hits in payload["queries"].items()
+    })
+
+
+# ---------------------------------------------------
+# Strategies: each takes the message list and returns a new (compacted) list
+# ---------------------------------------------------
+def trim_tool_payloads(snippet_chars: int = SNIPPET_CHARS, keep_latest: bool = True) -> Callable:
+    """Older search results keep only title/url and a `snippet_chars` snippet."""
+
+    def strategy(messages: List[BaseMessage]) -> List[BaseMessage]:
+        latest = _latest_index(messages, ToolMessage) if keep_latest else -1
+        keep_ids = _referenced_ids(messages[latest] if latest >= 0 else None)
+        return [
+            message.model_copy(update={"content": _trim_payload(message.content, snippet_chars, keep_ids)})
+            if isinstance(message, ToolMessage) and i != latest
+            else message
+            for i, message in enumerate(messages)
+        ]
+
+    return strategy
+
+
+def _superseded_args(tool_call: dict) -> dict:
+    args = {**tool_call["args"], "answer": SUPERSEDED}
+    if tool_call["name"] == "ReviseAnswer":
+        # Only revisions cite references (AnswerQuestion has no such field)
+        args["references"] = []
+    return args
+
+
+def drop_superseded_answers(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """Only the latest draft keeps its answer text; older ones keep their critique and queries.
+
+    The AIMessages themselves stay so every ToolMessage still follows its tool call.
+    """
+    latest = _latest_index(messages, AIMessage)
+    compacted = []
+    for i, message in enumerate(messages):
+        if isinstance(message, AIMessage) and i != latest and message.tool_calls:
+            tool_calls = [
+                {**tool_call, "args": _superseded_args(tool_call)}
+                if "answer" in tool_call["args"]
+                else tool_call
+                for tool_call in message.tool_calls
+            ]
+            message = message.model_copy(update={"tool_calls": tool_calls, "content": ""})
+        compacted.append(message)
+    return compacted
+
+
+DEFAULT_STRATEGIES: List[Callable] = [drop_superseded_answers, trim_tool_payloads()]
+
+# Tried in order, after the regular strategies, while the history is over budget
+BUDGET_STRATEGIES: List[Callable] = [
+    trim_tool_payloads(keep_latest=False),
+    trim_tool_payloads(snippet_chars=0, keep_latest=False),
+]
+
+
+def compact_messages(
+    messages: Sequence[BaseMessage],
+    strategies: Optional[List[Callable]] = None,
+    token_budget: Optional[int] = REVISOR_TOKEN_BUDGET,
+):
+    """Return (compacted messages, report) where report = {before, after, saved} in tokens."""
+    before = history_tokens(messages)
+    compacted = list(messages)
+    for strategy in DEFAULT_STRATEGIES if strategies is None else strategies:
+        compacted = strategy(compacted)
+
+    after = history_tokens(compacted)
+    if token_budget is not None:
+        for strategy in BUDGET_STRATEGIES:
+            if after <= token_budget:
+                break
+            compacted = strategy(compacted)
+            after = history_tokens(compacted)
+
+    return compacted, {"before": before, "after": after, "saved": before - after}
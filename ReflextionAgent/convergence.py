@@ -0,0 +1,50 @@
+import re
+from typing import List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+from textSimilarity import CONVERGENCE_THRESHOLD, texts_converged
+
+# ---------------------------------------------------
+# Convergence check for the Reflexion loop
+#
+# Stop revising once the answer has stopped changing (textSimilarity.py), or once
+# the model's own critique has nothing left to say. MAX_ITERATIONS in Graph.py is
+# still the hard cap.
+# ---------------------------------------------------
+
+_EMPTY_CRITIQUE = {"", "none", "n/a", "na", "nothing", "no", "nothing missing", "nothing superfluous"}
+
+
+def _is_empty(text: Optional[str]) -> bool:
+    return re.sub(r"[^\w\s/]", "", (text or "")).strip().lower() in _EMPTY_CRITIQUE
+
+
+def critique_is_empty(reflection: Optional[dict]) -> bool:
+    if not reflection:
+        return False
+    return _is_empty(reflection.get("missing")) and _is_empty(reflection.get("superfluous"))
+
+
+def _latest_answer_args(messages: List[BaseMessage], skip: int = 0) -> Optional[dict]:
+    # Walks back from the end; answers sit every other message, so this is a few steps
+    for message in reversed(messages):
+        if isinstance(message, AIMessage) and message.tool_calls:
+            args = message.tool_calls[0]["args"]
+            if "answer" in args:
+                if skip == 0:
+                    return args
+                skip -= 1
+    return None
+
+
+def has_converged(messages: List[BaseMessage], threshold: float = CONVERGENCE_THRESHOLD) -> bool:
+    current = _latest_answer_args(messages)
+    if current is None:
+        return False
+    if critique_is_empty(current.get("reflection")):
+        return True
+    previous = _latest_answer_args(messages, skip=1)
+    if previous is None:
+        return False
+    return texts_converged(previous.get("answer", ""), current.get("answer", ""), threshold)
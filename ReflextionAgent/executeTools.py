@@ -1,75 +1,230 @@
-import json
+import asyncio
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import List, Dict, Any
-from langchain_core.messages import AIMessage, BaseMessage, ToolMessage, HumanMessage
-from langchain_community.tools import TavilySearchResults
+from typing import Callable, Optional
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from searchCache import CachedSearchTool, SQLiteSearchStore
+from queryDedup import DEDUP_THRESHOLD, QueryIndex, index_prior_results
+from toolPayload import SourceRegistry
 
-# Create the Tavily search tool
-tavily_tool = TavilySearchResults(max_results=5)
+# Repeated queries are answered from a local cache (memory LRU + SQLite file) instead of the API
+SEARCH_CACHE_PATH = os.getenv(
+    "SEARCH_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".search_cache.sqlite")
+)
+_search_tool = None
 
-# Function to execute search queries from AnswerQuestion tool calls
-def execute_tools(state: List[BaseMessage]) -> List[BaseMessage]:
+
+# Create the (cached) Tavily search tool on first use, so importing this module
+# doesn't need a TAVILY_API_KEY when a different tool is passed in.
+# Cache misses go through the shared "tavily" rate limiter (rateLimiter.py);
+# identical misses in flight at the same time (concurrent runs asking about
+# the same topic) share one request (singleFlight.py).
+# With LOCAL_SEARCH_INDEX set, the local BM25 index (localSearch.py) is used
+# instead: no API key or network, and no cache needed in front of it.
+def get_search_tool():
+    global _search_tool
+    if _search_tool is None and os.getenv("LOCAL_SEARCH_INDEX"):
+        # Checked first: localSearch needs numpy, which Tavily users don't
+        from localSearch import get_local_search_tool
+        _search_tool = get_local_search_tool(max_results=5)
+    if _search_tool is None:
+        from rateLimiter import rate_limited, tavily_search_tool
+        from singleFlight import single_flight
+        tavily_tool = single_flight(rate_limited(tavily_search_tool(max_results=5), "tavily"))
+        _search_tool = CachedSearchTool(tavily_tool, store=SQLiteSearchStore(SEARCH_CACHE_PATH))
+    return _search_tool
+
+# How many searches may be in flight at once, and how long (seconds) one search may take
+MAX_CONCURRENCY = 8
+QUERY_TIMEOUT = 20.0
+
+
+# Collect (tool_call_id, search_queries) for every AnswerQuestion / ReviseAnswer tool call
+def collect_search_queries(state: List[BaseMessage]) -> List[tuple]:
     last_ai_message: AIMessage = state[-1]
-    
+
     # Extract tool calls from the AI message
     if not hasattr(last_ai_message, "tool_calls") or not last_ai_message.tool_calls:
         return []
-    
-    # Process the AnswerQuestion or ReviseAnswer tool calls to extract search queries
+
+    return [
+        (tool_call["id"], tool_call["args"].get("search_queries", []))
+        for tool_call in last_ai_message.tool_calls
+        if tool_call["name"] in ["AnswerQuestion", "ReviseAnswer"]
+    ]
+
+
+# Run every query at once on a thread pool; results come back in the same order as `queries`
+def run_search_queries(
+    queries: List[str],
+    tool=None,
+    max_concurrency: int = MAX_CONCURRENCY,
+    timeout: float = QUERY_TIMEOUT,
+    progress: Optional[Callable[[str, str], None]] = None,
+) -> List[Any]:
+    tool = tool or get_search_tool()
+    if not queries:
+        return []
+    # progress(query, status) is called from this thread as each search settles
+    report = progress or (lambda query, status: None)
+
+    results: List[Any] = [None] * len(queries)
+    started: Dict[int, float] = {}
+
+    def search(index: int, query: str):
+        started[index] = time.monotonic()
+        return tool.invoke(query)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(queries))))
+    try:
+        pending = {executor.submit(search, i, q): i for i, q in enumerate(queries)}
+        while pending:
+            # Wake up on the next completion, or when the oldest running search hits its timeout
+            now = time.monotonic()
+            running = [started[i] for i in pending.values() if i in started]
+            wait_for = max(0.0, min(running) + timeout - now) if running else timeout
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    results[index] = future.result()
+                    report(queries[index], "done")
+                except Exception as e:
+                    # Same shape the stock Tavily tool uses for its own failures
+                    results[index] = repr(e)
+                    report(queries[index], "failed")
+
+            now = time.monotonic()
+            for future, index in list(pending.items()):
+                if index in started and now - started[index] >= timeout:
+                    pending.pop(future)
+                    results[index] = repr(TimeoutError(f"Search timed out after {timeout}s: {queries[index]}"))
+                    report(queries[index], "timeout")
+    finally:
+        # Don't block on searches that timed out; their threads finish in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
+
+
+# Async version: same ordering guarantees, concurrency bounded by a semaphore
+async def arun_search_queries(
+    queries: List[str],
+    tool=None,
+    max_concurrency: int = MAX_CONCURRENCY,
+    timeout: float = QUERY_TIMEOUT,
+    progress: Optional[Callable[[str, str], None]] = None,
+) -> List[Any]:
+    tool = tool or get_search_tool()
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    report = progress or (lambda query, status: None)
+
+    async def search(query: str):
+        async with semaphore:
+            try:
+                result = await asyncio.wait_for(tool.ainvoke(query), timeout)
+                report(query, "done")
+                return result
+            except asyncio.TimeoutError:
+                report(query, "timeout")
+                return repr(TimeoutError(f"Search timed out after {timeout}s: {query}"))
+            except Exception as e:
+                report(query, "failed")
+                return repr(e)
+
+    return list(await asyncio.gather(*(search(q) for q in queries)))
+
+
+# Decide which queries really need a search.
+# Queries already answered earlier in the run (or earlier in this batch) reuse
+# that result instead; returns (queries to search, plan) where each plan entry
+# is ("search" | "shared", position in queries to search) or ("reuse", earlier result).
+def plan_searches(state: List[BaseMessage], queries: List[str], threshold: float = DEDUP_THRESHOLD):
+    answered = index_prior_results(state, threshold)
+    batch = QueryIndex(threshold)
+    to_search: List[str] = []
+    plan = []
+    for query in queries:
+        match = answered.match(query)
+        if match is not None:
+            plan.append(("reuse", match[1]))
+            continue
+        match = batch.match(query)
+        if match is not None:
+            plan.append(("shared", match[1]))
+            continue
+        batch.add(query, len(to_search))
+        plan.append(("search", len(to_search)))
+        to_search.append(query)
+    return to_search, plan
+
+
+# Turn the flat list of results back into one ToolMessage per tool call
+# (compact payload: each URL is written out once per run, see toolPayload.py)
+def build_tool_messages(
+    state: List[BaseMessage], calls: List[tuple], plan: List[tuple], results: List[Any]
+) -> List[BaseMessage]:
+    registry = SourceRegistry(state)
     tool_messages = []
-    
-    for tool_call in last_ai_message.tool_calls:
-        if tool_call["name"] in ["AnswerQuestion", "ReviseAnswer"]:
-            call_id = tool_call["id"]
-            search_queries = tool_call["args"].get("search_queries", [])
-            
-            # Execute each search query using the tavily tool
-            query_results = {}
-            for query in search_queries:
-                result = tavily_tool.invoke(query)
-                query_results[query] = result
-            
-            # Create a tool message with the results
-            tool_messages.append(
-                ToolMessage(
-                    content=json.dumps(query_results),
-                    tool_call_id=call_id
-                )
+    position = 0
+    for call_id, search_queries in calls:
+        query_results = {}
+        skipped = 0
+        for query in search_queries:
+            kind, value = plan[position]
+            query_results[query] = value if kind == "reuse" else results[value]
+            if kind != "search":
+                skipped += 1
+            position += 1
+
+        # Create a tool message with the results
+        # (artifact records how many queries were answered without a new search)
+        tool_messages.append(
+            ToolMessage(
+                content=registry.encode(query_results),
+                tool_call_id=call_id,
+                artifact={"skipped_queries": skipped}
             )
-    
+        )
     return tool_messages
 
-# Example usage
-test_state = [
-    HumanMessage(
-        content="Write about how small business can leverage AI to grow"
-    ),
-    AIMessage(
-        content="", 
-        tool_calls=[
-            {
-                "name": "AnswerQuestion",
-                "args": {
-                    'answer': '', 
-                    'search_queries': [
-                            'AI tools for small business', 
-                            'AI in small business marketing', 
-                            'AI automation for small business'
-                    ], 
-                    'reflection': {
-                        'missing': '', 
-                        'superfluous': ''
-                    }
-                },
-                "id": "call_KpYHichFFEmLitHFvFhKy1Ra",
-            }
-        ],
-    )
-]
-
-# Execute the tools
-# results = execute_tools(test_state)
-
-# print("Raw results:", results)
-# if results:
-#     parsed_content = json.loads(results[0].content)
-#     print("Parsed content:", parsed_content)
\ No newline at end of file
+
+# Function to execute search queries from AnswerQuestion tool calls
+# All queries across all tool calls are searched at once, so this node takes
+# as long as the slowest query instead of the sum of all of them.
+def execute_tools(
+    state: List[BaseMessage],
+    tool=None,
+    max_concurrency: int = MAX_CONCURRENCY,
+    timeout: float = QUERY_TIMEOUT,
+    progress: Optional[Callable[[str, str], None]] = None,
+) -> List[BaseMessage]:
+    calls = collect_search_queries(state)
+    queries = [query for _, search_queries in calls for query in search_queries]
+    to_search, plan = plan_searches(state, queries)
+    if progress:
+        for (kind, _), query in zip(plan, queries):
+            progress(query, "searching" if kind == "search" else "reused")
+    results = run_search_queries(to_search, tool, max_concurrency, timeout, progress)
+    return build_tool_messages(state, calls, plan, results)
+
+
+# Async node for graphs run with `ainvoke` / `astream`
+async def aexecute_tools(
+    state: List[BaseMessage],
+    tool=None,
+    max_concurrency: int = MAX_CONCURRENCY,
+    timeout: float = QUERY_TIMEOUT,
+    progress: Optional[Callable[[str, str], None]] = None,
+) -> List[BaseMessage]:
+    calls = collect_search_queries(state)
+    queries = [query for _, search_queries in calls for query in search_queries]
+    to_search, plan = plan_searches(state, queries)
+    if progress:
+        for (kind, _), query in zip(plan, queries):
+            progress(query, "searching" if kind == "search" else "reused")
+    results = await arun_search_queries(to_search, tool, max_concurrency, timeout, progress)
+    return build_tool_messages(state, calls, plan, results)
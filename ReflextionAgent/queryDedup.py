@@ -0,0 +1,104 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage, ToolMessage
+
+from toolPayload import decode_tool_payload
+
+# ---------------------------------------------------
+# Query deduplication across Reflexion iterations
+#
+# The model tends to re-issue the same (or slightly reworded) search queries on
+# every revisor pass. Before searching, each query is matched against the ones
+# already answered in this run, and earlier results are reused when it is a
+# near-duplicate.
+# ---------------------------------------------------
+
+# Token-set (Jaccard) similarity at or above this counts as "the same query"
+DEDUP_THRESHOLD = 0.8
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at by for from how in is of on or the to what with".split()
+)
+
+
+def _singular(token: str) -> str:
+    if len(token) <= 3:
+        return token
+    if token.endswith("sses"):
+        return token[:-2]
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def query_tokens(query: str) -> frozenset:
+    # Lowercased word tokens without stopwords and with a naive plural strip,
+    # so "AI tools for businesses" == "ai tool business"
+    return frozenset(
+        _singular(token) for token in _TOKEN_RE.findall(query.lower()) if token not in _STOPWORDS
+    )
+
+
+def query_similarity(a: frozenset, b: frozenset) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class QueryIndex:
+    """Queries answered so far in a run, searchable by exact or near-duplicate match."""
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD):
+        self.threshold = threshold
+        self._entries: List[Tuple[str, frozenset, Any]] = []
+        self._exact: Dict[frozenset, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, query: str, result: Any) -> None:
+        tokens = query_tokens(query)
+        if tokens in self._exact:
+            return
+        self._exact[tokens] = len(self._entries)
+        self._entries.append((query, tokens, result))
+
+    def match(self, query: str) -> Optional[Tuple[str, Any]]:
+        tokens = query_tokens(query)
+        index = self._exact.get(tokens)
+        if index is not None:
+            earlier, _, result = self._entries[index]
+            return earlier, result
+
+        best, best_score = None, self.threshold
+        for earlier, earlier_tokens, result in self._entries:
+            score = query_similarity(tokens, earlier_tokens)
+            if score >= best_score:
+                best, best_score = (earlier, result), score
+        return best
+
+
+def index_prior_results(state: List[BaseMessage], threshold: float = DEDUP_THRESHOLD) -> QueryIndex:
+    # Every ToolMessage from execute_tools maps queries to their source ids;
+    # failed searches (error strings) are not reused
+    index = QueryIndex(threshold)
+    for message in state:
+        if not isinstance(message, ToolMessage):
+            continue
+        for query, result in decode_tool_payload(message.content)["queries"].items():
+            if isinstance(result, list):
+                index.add(query, result)
+    return index
+
+
+def count_skipped_queries(state: List[BaseMessage]) -> int:
+    # Total queries answered from earlier results during this run
+    return sum(
+        (message.artifact or {}).get("skipped_queries", 0)
+        for message in state
+        if isinstance(message, ToolMessage) and isinstance(message.artifact, dict)
+    )
@@ -0,0 +1,234 @@
+import json
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+# ---------------------------------------------------
+# Cache for search tool results (Tavily or any tool with invoke/ainvoke)
+#
+#   query ──► in-memory LRU ──► on-disk store ──► real search tool
+#
+# Entries are keyed on the normalized query + max_results and expire after a TTL.
+# ---------------------------------------------------
+
+DEFAULT_TTL = 24 * 60 * 60   # one day, in seconds
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_DISK_ENTRIES = 10_000
+
+
+def normalize_query(query: str) -> str:
+    # "  AI tools  for Small business " and "ai tools for small business" share one entry
+    return " ".join(str(query).lower().split())
+
+
+def make_cache_key(query: str, max_results: Optional[int]) -> str:
+    payload = json.dumps({"q": normalize_query(query), "max_results": max_results}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------
+# Backing stores: anything with get(key) -> (value, stored_at) | None, set(key, value) and clear()
+# ---------------------------------------------------
+class MemorySearchStore:
+    """Dict-backed store, useful in tests or when nothing should touch disk."""
+
+    def __init__(self, max_entries: int = DEFAULT_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (value, stored_at if stored_at is not None else time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteSearchStore:
+    """SQLite file store. Keeps at most `max_entries` rows, evicting the least recently used."""
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_DISK_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened on first use so importing the module never touches disk
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " stored_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS search_cache_last_used ON search_cache (last_used)"
+            )
+        return self._conn
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, stored_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE search_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, value, stored_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), stored_at if stored_at is not None else now, now),
+            )
+            conn.execute(
+                "DELETE FROM search_cache WHERE key IN ("
+                " SELECT key FROM search_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+            conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM search_cache")
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# ---------------------------------------------------
+# The cached tool itself
+# ---------------------------------------------------
+class CachedSearchTool:
+    """Wraps a search tool with an in-memory LRU in front of a persistent store.
+
+    Only successful results (lists of hits) are cached; errors (raised, or
+    returned as strings by the stock Tavily tool) go back to the network next time.
+    """
+
+    def __init__(
+        self,
+        tool,
+        store=None,
+        ttl: float = DEFAULT_TTL,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+    ):
+        self.tool = tool
+        self.store = store if store is not None else MemorySearchStore()
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.max_results = getattr(tool, "max_results", None)
+        self._memory: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def name(self) -> str:
+        return getattr(self.tool, "name", type(self.tool).__name__)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def _fresh(self, stored_at: float) -> bool:
+        return time.time() - stored_at < self.ttl
+
+    def lookup(self, query: str) -> Tuple[bool, Any]:
+        key = make_cache_key(query, self.max_results)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and self._fresh(entry[1]):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return True, entry[0]
+
+        entry = self.store.get(key)
+        if entry is not None:
+            if self._fresh(entry[1]):
+                self._remember(key, entry)
+                with self._lock:
+                    self.hits += 1
+                return True, entry[0]
+            self.store.delete(key)
+
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def _remember(self, key: str, entry: Tuple[Any, float]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def save(self, query: str, result: Any) -> None:
+        if not isinstance(result, list):
+            return
+        key = make_cache_key(query, self.max_results)
+        stored_at = time.time()
+        self._remember(key, (result, stored_at))
+        self.store.set(key, result, stored_at)
+
+    def invoke(self, query: str, config=None, **kwargs) -> Any:
+        found, result = self.lookup(query)
+        if found:
+            return result
+        result = self.tool.invoke(query, config, **kwargs)
+        self.save(query, result)
+        return result
+
+    async def ainvoke(self, query: str, config=None, **kwargs) -> Any:
+        found, result = self.lookup(query)
+        if found:
+            return result
+        result = await self.tool.ainvoke(query, config, **kwargs)
+        self.save(query, result)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        self.store.clear()
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, message_chunk_to_message
+
+from searchCache import normalize_query
+
+# ---------------------------------------------------
+# Speculative search for the draft node
+#
+# While the draft's AnswerQuestion tool call is still streaming, its arguments
+# are scanned as they arrive; every `search_queries` string is sent to the
+# search tool the moment its closing quote shows up. execute_tools then gets
+# those in-flight (or finished) searches instead of starting from scratch.
+# ---------------------------------------------------
+
+MAX_CONCURRENCY = 8
+
+
+class SearchQueryScanner:
+    """Incremental scanner over streamed tool-call argument JSON.
+
+    feed() looks at each new character exactly once and returns the
+    `search_queries` strings that were closed by this chunk.
+    """
+
+    def __init__(self, key: str = "search_queries"):
+        self.key = key
+        self.stack: List[str] = []
+        self.in_string = False
+        self.escape = False
+        self.buffering = False
+        self.buffer: List[str] = []
+        self.expect_key = False
+        self.last_string: Optional[str] = None
+        self.current_key: Optional[str] = None
+        self.in_target = False
+
+    def feed(self, text: str) -> List[str]:
+        closed = []
+        for char in text:
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.buffering:
+                        value = json.loads('"' + "".join(self.buffer) + '"')
+                        if self.in_target and len(self.stack) == 2:
+                            closed.append(value)
+                        else:
+                            self.last_string = value
+                    continue
+                if self.buffering:
+                    self.buffer.append(char)
+                continue
+
+            if char == '"':
+                self.in_string = True
+                # Only keys of the top-level object and the target array's items are kept
+                self.buffering = (len(self.stack) == 1 and self.expect_key) or (self.in_target and len(self.stack) == 2)
+                self.buffer = []
+                self.last_string = None
+            elif char == "{":
+                self.stack.append("{")
+                self.expect_key = len(self.stack) == 1
+            elif char == "[":
+                self.stack.append("[")
+                if len(self.stack) == 2 and self.current_key == self.key:
+                    self.in_target = True
+            elif char in "}]":
+                if self.stack:
+                    self.stack.pop()
+                if len(self.stack) == 1:
+                    self.in_target = False
+            elif char == ":" and len(self.stack) == 1:
+                self.current_key = self.last_string
+                self.expect_key = False
+            elif char == "," and len(self.stack) == 1:
+                self.current_key = None
+                self.expect_key = True
+        return closed
+
+
+class SpeculativeSearcher:
+    """Starts searches early and hands them to execute_tools through `invoke`.
+
+    Use it as the `tool` for execute_tools: queries that were started
+    speculatively wait on the running search, anything else is searched normally.
+    One searcher serves one run; close() it (or use it as a context manager)
+    once that run's execute_tools is done, which also drops searches nobody asked for.
+    """
+
+    def __init__(self, tool=None, max_concurrency: int = MAX_CONCURRENCY):
+        self._tool = tool
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Any] = {}
+        # normalized query -> {"started", "finished", "requested"} (perf_counter seconds)
+        self._timings: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def tool(self):
+        if self._tool is None:
+            from executeTools import get_search_tool
+            self._tool = get_search_tool()
+        return self._tool
+
+    def _run(self, key: str, query: str):
+        timing = self._timings[key]
+        try:
+            return self.tool.invoke(query)
+        finally:
+            timing["finished"] = time.perf_counter()
+
+    def prefetch(self, query: str) -> None:
+        key = normalize_query(query)
+        with self._lock:
+            if key in self._futures:
+                return
+            self._timings[key] = {"started": time.perf_counter()}
+            self._futures[key] = self._executor.submit(self._run, key, query)
+
+    def invoke(self, query: str, config=None, **kwargs):
+        key = normalize_query(query)
+        with self._lock:
+            future = self._futures.get(key)
+            timing = self._timings.setdefault(key, {"started": time.perf_counter()})
+            timing["requested"] = time.perf_counter()
+        if future is not None:
+            return future.result()
+        try:
+            return self.tool.invoke(query, config, **kwargs)
+        finally:
+            timing["finished"] = time.perf_counter()
+
+    async def ainvoke(self, query: str, config=None, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(None, self.invoke, query, config)
+
+    def finish(self, queries: List[str]) -> float:
+        """Forget these queries and return the search wall time speculation saved for them.
+
+        Without speculation the searches all start when execute_tools runs and
+        the node waits for the slowest one; with it, it only waits for whatever
+        was still left of each search.
+        """
+        with self._lock:
+            timings = [self._timings.pop(normalize_query(q), None) for q in queries]
+            for query in queries:
+                self._futures.pop(normalize_query(query), None)
+        timings = [t for t in timings if t and "finished" in t and "requested" in t]
+        if not timings:
+            return 0.0
+        full = max(t["finished"] - t["started"] for t in timings)
+        waited = max(max(0.0, t["finished"] - t["requested"]) for t in timings)
+        return max(0.0, full - waited)
+
+    def close(self) -> None:
+        """Cancel searches that haven't started and let the worker threads go."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._futures.clear()
+            self._timings.clear()
+
+    def __enter__(self) -> "SpeculativeSearcher":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def stream_draft(self, chain, inputs: dict, config=None) -> AIMessage:
+        """Stream `chain`, prefetching search queries as they close; returns the full AIMessage."""
+        scanners: Dict[int, SearchQueryScanner] = {}
+        full = None
+        for chunk in chain.stream(inputs, config):
+            full = chunk if full is None else full + chunk
+            for tool_chunk in getattr(chunk, "tool_call_chunks", None) or []:
+                scanner = scanners.setdefault(tool_chunk.get("index") or 0, SearchQueryScanner())
+                for query in scanner.feed(tool_chunk.get("args") or ""):
+                    self.prefetch(query)
+        return message_chunk_to_message(full)
@@ -0,0 +1,123 @@
+import os
+import sys
+from typing import Any, Dict, Iterator, Optional
+
+from langchain_core.messages import AIMessageChunk
+
+# Run as a script: put the repo root (shared helpers: partialJson.py, fakeModels.py, ...) on the path;
+# importers (tests/, batchRunner.py, ...) have already done that
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from partialJson import IncrementalJSONParser
+
+# ---------------------------------------------------
+# Streaming for the Reflexion graph
+#
+# stream_reflexion() turns app.stream(...) into a flat sequence of events:
+#   {"type": "node_start",  "node": "revisor"}
+#   {"type": "answer",      "node": "revisor", "delta": "...new answer text..."}
+#   {"type": "search",      "query": "...", "status": "searching" | "done" | ...}
+#   {"type": "node_end",    "node": "revisor"}
+#   {"type": "final",       "state": {...final graph state...}}
+#
+# The answer text is pulled out of the AnswerQuestion / ReviseAnswer tool-call
+# arguments while they are still streaming in, so the first words show up long
+# before the node finishes.
+# ---------------------------------------------------
+
+STREAM_MODES = ["tasks", "messages", "custom", "values"]
+
+
+class _AnswerTracker:
+    """Parses streamed tool-call argument JSON incrementally and reports new `answer` text."""
+
+    def __init__(self):
+        self.parsers: Dict[tuple, IncrementalJSONParser] = {}
+
+    def feed(self, run_key: str, chunk: AIMessageChunk) -> str:
+        delta = ""
+        for tool_chunk in chunk.tool_call_chunks or []:
+            key = (run_key, tool_chunk.get("index") or 0)
+            parser = self.parsers.setdefault(key, IncrementalJSONParser(ignore_trailing=True))
+            for event, path, text in parser.feed(tool_chunk.get("args") or ""):
+                if event == "delta" and path == ("answer",):
+                    delta += text
+        return delta
+
+
+def stream_reflexion(app, inputs: Dict[str, Any], config: Optional[dict] = None) -> Iterator[dict]:
+    tracker = _AnswerTracker()
+    final_state = None
+    for mode, payload in app.stream(inputs, config, stream_mode=STREAM_MODES):
+        if mode == "tasks":
+            if "result" in payload or "error" in payload:
+                yield {"type": "node_end", "node": payload["name"], "error": payload.get("error")}
+            else:
+                yield {"type": "node_start", "node": payload["name"]}
+        elif mode == "messages":
+            chunk, metadata = payload
+            if isinstance(chunk, AIMessageChunk):
+                run_key = chunk.id or metadata.get("langgraph_checkpoint_ns", "")
+                delta = tracker.feed(run_key, chunk)
+                if delta:
+                    yield {"type": "answer", "node": metadata.get("langgraph_node"), "delta": delta}
+        elif mode == "custom":
+            if isinstance(payload, dict) and "search" in payload:
+                yield {"type": "search", "query": payload["search"], "status": payload["status"]}
+        elif mode == "values":
+            final_state = payload
+    yield {"type": "final", "state": final_state}
+
+
+def print_stream(app, inputs: Dict[str, Any], config: Optional[dict] = None) -> Dict[str, Any]:
+    """CLI printer for stream_reflexion; returns the final graph state."""
+    final_state = None
+    for event in stream_reflexion(app, inputs, config):
+        if event["type"] == "node_start":
+            print(f"\n▶ {event['node']}", flush=True)
+        elif event["type"] == "node_end":
+            status = f" (error: {event['error']})" if event.get("error") else ""
+            print(f"\n■ {event['node']} finished{status}", flush=True)
+        elif event["type"] == "answer":
+            print(event["delta"], end="", flush=True)
+        elif event["type"] == "search":
+            print(f"  🔎 [{event['status']}] {event['query']}", flush=True)
+        elif event["type"] == "final":
+            final_state = event["state"]
+    return final_state
+
+
+# ---------------------------------------------------
+# Offline demo: python streaming.py
+# Runs the real graph wiring against a scripted fake chat model and fake search.
+# ---------------------------------------------------
+if __name__ == "__main__":
+    from langchain_core.runnables import RunnableLambda
+    from langchain_core.tools import tool
+
+    from fakeModels import FakeToolCallingChatModel, tool_call_message
+    from Graph import build_graph, initial_state
+
+    def scripted(name: str, n: int) -> dict:
+        return tool_call_message(name, {
+            "answer": f"Revision {n}: small businesses can use AI for marketing, support and bookkeeping. " * 3,
+            "search_queries": [f"ai for small business {n}", f"ai marketing tools {n}"],
+            "reflection": {"missing": "numbers", "superfluous": "repetition"},
+            "references": [],
+        }, call_id=f"call_{n}")
+
+    llm = FakeToolCallingChatModel(
+        responses=[scripted("AnswerQuestion", 0)] + [scripted("ReviseAnswer", n) for n in range(1, 4)],
+        chunk_delay=0.005,
+    )
+    as_prompt = RunnableLambda(lambda inputs: inputs["messages"])
+
+    @tool
+    def fake_search(query: str) -> list:
+        """Offline search."""
+        return [{"title": query, "url": f"https://example.com/{query.replace(' ', '-')}", "content": query}]
+
+    app = build_graph(as_prompt | llm, as_prompt | llm, search_tool=fake_search).compile()
+    state = print_stream(app, initial_state("Write about how small business can leverage AI to grow"))
+    print("\niterations:", state["iterations"])
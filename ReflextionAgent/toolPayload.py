@@ -0,0 +1,188 @@
+import json
+import os
+import time
+from typing import Any, Dict, List, Sequence
+
+from langchain_core.messages import BaseMessage, ToolMessage
+
+# orjson is a lot faster than the stdlib encoder; fall back to compact json if it isn't installed
+try:
+    import orjson
+
+    def dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    loads = orjson.loads
+except ImportError:  # pragma: no cover - depends on the environment
+    def dumps(obj) -> str:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+    loads = json.loads
+
+# ---------------------------------------------------
+# Compact ToolMessage payload for execute_tools
+#
+#   {"sources": {"1": {"title": ..., "url": ..., "snippet": ...}, ...},
+#    "queries": {"ai tools for small business": [1, 4, 2], ...}}
+#
+# Every URL gets one run-wide id the first time it is seen, and its source entry
+# is written only into that ToolMessage. Later ToolMessages (and later queries in
+# the same message) just list the ids. A failed search keeps its error string.
+# ---------------------------------------------------
+
+SNIPPET_CHARS = 300
+
+
+def decode_tool_payload(content: Any) -> Dict[str, dict]:
+    """Return {"sources": {...}, "queries": {...}} for a ToolMessage body.
+
+    The older `{query: [hit, ...]}` format is still understood (hits are
+    returned inline, with no source ids).
+    """
+    try:
+        payload = loads(content)
+    except (TypeError, ValueError):
+        return {"sources": {}, "queries": {}}
+    if not isinstance(payload, dict):
+        return {"sources": {}, "queries": {}}
+    if "queries" in payload and "sources" in payload:
+        return payload
+    return {"sources": {}, "queries": payload}
+
+
+class SourceRegistry:
+    """URL -> source id for one run, rebuilt from the ToolMessages already in the state."""
+
+    def __init__(self, state: Sequence[BaseMessage] = ()):
+        self.ids: Dict[str, int] = {}
+        for message in state:
+            if isinstance(message, ToolMessage):
+                for source_id, source in decode_tool_payload(message.content)["sources"].items():
+                    self.ids[source["url"]] = int(source_id)
+        self.next_id = max(self.ids.values(), default=0) + 1
+
+    def encode(self, query_results: Dict[str, Any]) -> str:
+        # Values are either fresh search hits (list of dicts), ids reused from
+        # earlier messages (list of ints), or an error string.
+        sources: Dict[str, dict] = {}
+        queries: Dict[str, Any] = {}
+        for query, hits in query_results.items():
+            if not isinstance(hits, list):
+                queries[query] = hits
+                continue
+            refs = []
+            for hit in hits:
+                if isinstance(hit, int):
+                    refs.append(hit)
+                    continue
+                url = hit.get("url", "")
+                source_id = self.ids.get(url)
+                if source_id is None:
+                    source_id = self.ids[url] = self.next_id
+                    self.next_id += 1
+                    sources[str(source_id)] = {
+                        "title": hit.get("title", ""),
+                        "url": url,
+                        "snippet": (hit.get("content") or "")[:SNIPPET_CHARS],
+                    }
+                refs.append(source_id)
+            queries[query] = refs
+        return dumps({"sources": sources, "queries": queries})
+
+
+def expand_tool_payloads(state: Sequence[BaseMessage]) -> Dict[str, Any]:
+    """Every query answered in the run with its sources resolved: {query: [source, ...] | error}."""
+    sources: Dict[int, dict] = {}
+    expanded: Dict[str, Any] = {}
+    for message in state:
+        if not isinstance(message, ToolMessage):
+            continue
+        payload = decode_tool_payload(message.content)
+        sources.update({int(k): v for k, v in payload["sources"].items()})
+        for query, hits in payload["queries"].items():
+            if isinstance(hits, list):
+                expanded[query] = [sources.get(hit, hit) if isinstance(hit, int) else hit for hit in hits]
+            else:
+                expanded[query] = hits
+    return expanded
+
+
+# ---------------------------------------------------
+# Benchmark: payload bytes + serialization time, legacy json.dumps vs compact format
+#
+#   python toolPayload.py [fixture.json]     # default: fixtures/tavily_small_business.json
+#   python toolPayload.py --synthetic         # generated run instead
+#   python toolPayload.py --record out.json   # re-search the fixture's queries with Tavily
+#
+# A fixture is a JSON list with one {query: tavily_results} dict per
+# execute_tools pass: three passes of the "small business + AI" example, with
+# the overlapping URLs a real Reflexion run gets. --record needs TAVILY_API_KEY.
+# ---------------------------------------------------
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "tavily_small_business.json")
+
+
+def load_fixture(path: str = FIXTURE_PATH) -> List[Dict[str, list]]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def record_fixture(path: str, queries_from: str = FIXTURE_PATH) -> None:
+    from langchain_community.tools import TavilySearchResults
+
+    tool = TavilySearchResults(max_results=5)
+    passes = [{query: tool.invoke(query) for query in batch} for batch in load_fixture(queries_from)]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(passes, f, indent=1, ensure_ascii=False)
+
+
+def _synthetic_fixture(passes: int = 3, queries: int = 3, hits: int = 5) -> List[Dict[str, list]]:
+    fixture = []
+    for p in range(passes):
+        batch = {}
+        for q in range(queries):
+            batch[f"pass {p} query {q}"] = [
+                {
+                    "title": f"Result {(q + h) % 8}",
+                    "url": f"https://example.com/article-{(q + h) % 8}",
+                    "content": f"Long article body number {(q + h) % 8}. " * 60,
+                    "score": 0.9 - h * 0.1,
+                }
+                for h in range(hits)
+            ]
+        fixture.append(batch)
+    return fixture
+
+
+def _bench(fixture: List[Dict[str, list]], repeat: int = 200) -> None:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        legacy = [json.dumps(batch) for batch in fixture]
+    legacy_time = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        registry = SourceRegistry()
+        compact = [registry.encode(batch) for batch in fixture]
+    compact_time = (time.perf_counter() - start) / repeat
+
+    legacy_bytes = sum(len(body.encode("utf-8")) for body in legacy)
+    compact_bytes = sum(len(body.encode("utf-8")) for body in compact)
+    print(f"passes: {len(fixture)}")
+    print(f"legacy  json.dumps : {legacy_bytes:>9} bytes  {legacy_time * 1e6:9.1f} us/run")
+    print(f"compact payload    : {compact_bytes:>9} bytes  {compact_time * 1e6:9.1f} us/run")
+    print(f"size reduction     : {1 - compact_bytes / legacy_bytes:.1%}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    if args[:1] == ["--record"]:
+        record_fixture(args[1])
+    elif args[:1] == ["--synthetic"]:
+        print("fixture: synthetic")
+        _bench(_synthetic_fixture())
+    else:
+        path = args[0] if args else FIXTURE_PATH
+        print(f"fixture: {path}")
+        _bench(load_fixture(path))
@@ -1,21 +1,37 @@
 from pydantic import BaseModel, Field
-from langchain_google_genai import ChatGoogleGenerativeAI
 import os
-from dotenv import load_dotenv
+import sys
 
-# ---------------------------------------------------
-# 1. Load environment variables from .env
-# ---------------------------------------------------
-load_dotenv()
+# Run as a script: put the repo root (shared helpers: modelRegistry.py, ...) on the path;
+# importers (tests/, batchRunner.py, ...) have already done that
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The Gemini client is created on first use (get_llm()), so importing this
+# module is fast and doesn't need the API key
+_llm = None
+_structured_llm = None
+_streaming_llm = None
 
 # ---------------------------------------------------
-# 2. Setup Google Gemini as the LLM
+# 1-2. Load environment variables from .env and setup Google Gemini as the LLM
 # ---------------------------------------------------
-google_api_key = os.getenv("googleapi")  # read API key from .env
-llm = ChatGoogleGenerativeAI(
-    model='gemini-1.5-flash',  # Fast + cheap model for testing
-    google_api_key=google_api_key
-)
+def get_llm():
+    global _llm
+    if _llm is None:
+        from dotenv import load_dotenv
+        from modelRegistry import get_chat_model
+
+        load_dotenv()
+        google_api_key = os.getenv("googleapi")  # read API key from .env
+        # Same registry client as ReflectionAgent/Chain.py (shared connections + limit)
+        _llm = get_chat_model(
+            "google",
+            'gemini-1.5-flash',  # Fast + cheap model for testing
+            google_api_key=google_api_key,
+            max_retries=0,  # 429s are retried by the "google" rate limiter (rateLimiter.py)
+        )
+    return _llm
 
 # ---------------------------------------------------
 # 3. Define a Pydantic schema for structured output
@@ -29,16 +45,58 @@ class Celebrity(BaseModel):
 # ---------------------------------------------------
 # 4. Wrap the LLM with structured output
 # ---------------------------------------------------
-structured_llm = llm.with_structured_output(Celebrity)
+def get_structured_llm():
+    global _structured_llm
+    if _structured_llm is None:
+        from rateLimiter import rate_limited
 
-# ---------------------------------------------------
-# 5. Invoke the LLM
-# ---------------------------------------------------
-response = structured_llm.invoke("Tell me about Hania Amir")
+        # Shared "google" quota with the other Gemini callers; 429s are retried
+        _structured_llm = rate_limited(get_llm().with_structured_output(Celebrity), "google")
+    return _structured_llm
+
+
+# Same model answering with a Celebrity tool call that can be streamed:
+# stream() yields each field as soon as it's complete (see streamingOutput.py)
+def get_streaming_llm():
+    global _streaming_llm
+    if _streaming_llm is None:
+        from rateLimiter import rate_limited
+        from streamingOutput import tool_calling_llm
 
+        _streaming_llm = rate_limited(tool_calling_llm(get_llm(), Celebrity), "google")
+    return _streaming_llm
+
+
+def stream(prompt: str):
+    from streamingOutput import stream_structured
+
+    return stream_structured(get_streaming_llm(), Celebrity, prompt)
+
+
+# `from Method1 import structured_llm` (or llm) still works, built on first access
+def __getattr__(name):
+    if name == "llm":
+        return get_llm()
+    if name == "structured_llm":
+        return get_structured_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# For thousands of names at once, see bulkExtraction.py
 # ---------------------------------------------------
-# 6. Since response is already a Celebrity object, access fields directly
+# 5. Invoke the LLM (only when run directly, so other scripts can import structured_llm)
 # ---------------------------------------------------
-print("Name:", response.name)
-print("Country:", response.country)
-print("Instagram Followers:", response.insta_followers)
+if __name__ == "__main__":
+    # python Method1.py --stream prints each field as soon as it's complete
+    if "--stream" in sys.argv:
+        from streamingOutput import print_structured
+
+        print_structured(stream("Tell me about Hania Amir"))
+    else:
+        response = get_structured_llm().invoke("Tell me about Hania Amir")
+
+        # ---------------------------------------------------
+        # 6. Since response is already a Celebrity object, access fields directly
+        # ---------------------------------------------------
+        print("Name:", response.name)
+        print("Country:", response.country)
+        print("Instagram Followers:", response.insta_followers)
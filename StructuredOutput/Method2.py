@@ -1,17 +1,21 @@
 from typing_extensions import Annotated, TypedDict
 from typing import Optional
-from dotenv import load_dotenv
 import os
-from langchain_google_genai import ChatGoogleGenerativeAI
+import sys
 
-# ---------------------------------------------------
-# 1. Load environment variables (API key from .env)
-# ---------------------------------------------------
-load_dotenv()
-google_api_key = os.getenv("googleapi")
+# Run as a script: put the repo root (shared helpers: modelRegistry.py, ...) on the path;
+# importers (tests/, batchRunner.py, ...) have already done that
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The Gemini client is created on first use (get_llm()), so importing this
+# module is fast and doesn't need the API key
+_llm = None
+_structured_llm = None
+_streaming_llm = None
 
 # ---------------------------------------------------
-# 2. Define a structured schema using TypedDict
+# 1-2. Define a structured schema using TypedDict
 # ---------------------------------------------------
 class Joke(TypedDict):
     """Joke to tell user."""
@@ -21,26 +25,78 @@ class Joke(TypedDict):
     rating: Annotated[Optional[int], None, "How funny the joke is, from 1 to 10"]
 
 # ---------------------------------------------------
-# 3. Initialize Gemini model
+# 3. Initialize Gemini model (reads the API key from .env on first use)
 # ---------------------------------------------------
-llm = ChatGoogleGenerativeAI(
-    model="gemini-1.5-flash",  # Fast + cheap model
-    google_api_key=google_api_key
-)
+def get_llm():
+    global _llm
+    if _llm is None:
+        from dotenv import load_dotenv
+        from modelRegistry import get_chat_model
+
+        load_dotenv()
+        # Same registry client as ReflectionAgent/Chain.py (shared connections + limit)
+        _llm = get_chat_model(
+            "google",
+            "gemini-1.5-flash",  # Fast + cheap model
+            google_api_key=os.getenv("googleapi"),
+            max_retries=0,  # 429s are retried by the "google" rate limiter (rateLimiter.py)
+        )
+    return _llm
 
 # ---------------------------------------------------
 # 4. Wrap the LLM to force structured output
 # ---------------------------------------------------
-structured_llm = llm.with_structured_output(Joke)
+def get_structured_llm():
+    global _structured_llm
+    if _structured_llm is None:
+        from rateLimiter import rate_limited
 
-# ---------------------------------------------------
-# 5. Invoke the LLM
-# ---------------------------------------------------
-response = structured_llm.invoke("Tell me a short programming joke and rate it")
+        # Shared "google" quota with the other Gemini callers; 429s are retried
+        _structured_llm = rate_limited(get_llm().with_structured_output(Joke), "google")
+    return _structured_llm
+
+
+# Same model answering with a Joke tool call that can be streamed:
+# stream() yields each field as soon as it's complete (see streamingOutput.py)
+def get_streaming_llm():
+    global _streaming_llm
+    if _streaming_llm is None:
+        from rateLimiter import rate_limited
+        from streamingOutput import tool_calling_llm
+
+        _streaming_llm = rate_limited(tool_calling_llm(get_llm(), Joke), "google")
+    return _streaming_llm
+
+
+def stream(prompt: str):
+    from streamingOutput import stream_structured
+
+    return stream_structured(get_streaming_llm(), Joke, prompt)
+
+
+# `from Method2 import structured_llm` (or llm) still works, built on first access
+def __getattr__(name):
+    if name == "llm":
+        return get_llm()
+    if name == "structured_llm":
+        return get_structured_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ---------------------------------------------------
-# 6. Since response is a Joke TypedDict, access fields directly
+# 5. Invoke the LLM (only when run directly, so other scripts can import structured_llm)
 # ---------------------------------------------------
-print("Setup:", response["setup"])
-print("Punchline:", response["punchline"])
-print("Rating:", response["rating"])
+if __name__ == "__main__":
+    # python Method2.py --stream prints the setup while the punchline is still being generated
+    if "--stream" in sys.argv:
+        from streamingOutput import print_structured
+
+        print_structured(stream("Tell me a short programming joke and rate it"))
+    else:
+        response = get_structured_llm().invoke("Tell me a short programming joke and rate it")
+
+        # ---------------------------------------------------
+        # 6. Since response is a Joke TypedDict, access fields directly
+        # ---------------------------------------------------
+        print("Setup:", response["setup"])
+        print("Punchline:", response["punchline"])
+        print("Rating:", response["rating"])
@@ -0,0 +1,313 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+# Run as a script: put the repo root (shared helpers: modelRegistry.py, fakeModels.py, ...) on the path;
+# importers (tests/, batchRunner.py, ...) have already done that
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Method1 import Celebrity
+
+# ---------------------------------------------------
+# Bulk Celebrity extraction over Method1's structured_llm
+#
+#   python bulkExtraction.py names.txt celebrities.jsonl --concurrency 8
+#   python bulkExtraction.py names.txt celebrities.parquet     # needs pyarrow
+#   python bulkExtraction.py --bench 2000                      # fake model, no API key
+#
+# Names are read lazily (one per line), sent through structured_llm in chunks
+# with bounded concurrency, validated into Celebrity, and written out
+# chunk by chunk, so memory stays flat for any number of names. A failed name
+# (API error, invalid output) is retried on its own in a later chunk; the rest
+# of its chunk is written right away. Names that still fail after the retries
+# go to <output>.errors.jsonl. Records are written in completion order.
+# The real structured_llm shares the "google" rate limiter (rateLimiter.py);
+# raise it with configure_limiter("google", ...) on a paid tier.
+# ---------------------------------------------------
+
+DEFAULT_CONCURRENCY = 8
+CHUNK_SIZE = 64          # names per chunk
+MAX_RETRIES = 2          # extra attempts for a failed name
+RETRY_BACKOFF = 0.5      # seconds, doubled per attempt (plus jitter)
+PROMPT = "Tell me about {name}"
+
+
+def read_names(path: str) -> Iterator[str]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            name = line.strip()
+            if name:
+                yield name
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    chunk: List[Any] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _validate(result: Any, schema: Type[BaseModel]) -> BaseModel:
+    # structured_llm normally returns the model already; dicts (json mode) and
+    # the exceptions run() collected end up here too
+    if isinstance(result, BaseException):
+        raise result
+    if isinstance(result, schema):
+        return result
+    return schema.model_validate(result)
+
+
+async def extract(
+    names: Iterable[str],
+    structured_llm=None,
+    schema: Type[BaseModel] = Celebrity,
+    max_concurrency: int = DEFAULT_CONCURRENCY,
+    chunk_size: int = CHUNK_SIZE,
+    max_retries: int = MAX_RETRIES,
+) -> AsyncIterator[Tuple[List[Tuple[str, BaseModel]], List[Tuple[str, str]]]]:
+    """Yields ([(name, record)], [(name, error)]) as each chunk finishes.
+
+    Failed names don't hold up their chunk: they are retried as part of a
+    later chunk (or in a final retry pass), and only reported as errors once
+    they've used up max_retries. The next chunk is already being extracted
+    while the caller writes the current one; both share one max_concurrency
+    budget, so no more than max_concurrency calls are ever in flight.
+    """
+    if structured_llm is None:
+        from Method1 import get_structured_llm
+        structured_llm = get_structured_llm()
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    retry_queue: List[Tuple[str, int]] = []
+
+    async def call(name: str):
+        async with semaphore:
+            try:
+                return await structured_llm.ainvoke(PROMPT.format(name=name))
+            except Exception as e:
+                return e
+
+    async def run(items: List[Tuple[str, int]]):
+        results = await asyncio.gather(*(call(name) for name, _ in items))
+        records, failed = [], []
+        for (name, attempt), result in zip(items, results):
+            try:
+                records.append((name, _validate(result, schema)))
+            except Exception as e:  # API errors and invalid output alike
+                failed.append((name, attempt, repr(e)))
+        return records, failed
+
+    def settle(records, failed):
+        errors = []
+        for name, attempt, error in failed:
+            if attempt < max_retries:
+                retry_queue.append((name, attempt + 1))
+            else:
+                errors.append((name, error))
+        return records, errors
+
+    pending: Optional[asyncio.Task] = None
+    for chunk in _chunks(((name, 0) for name in names), chunk_size):
+        chunk += retry_queue
+        retry_queue.clear()
+        task = asyncio.ensure_future(run(chunk))
+        if pending is not None:
+            yield settle(*await pending)
+        pending = task
+    if pending is not None:
+        yield settle(*await pending)
+
+    # Whatever failed in the last chunks
+    attempt = 0
+    while retry_queue:
+        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt * (1 + random.random()))
+        items = list(retry_queue)
+        retry_queue.clear()
+        yield settle(*await run(items))
+        attempt += 1
+
+
+# ---------------------------------------------------
+# Writers: JSONL (default) or Parquet / Arrow IPC by file extension
+# ---------------------------------------------------
+class JSONLWriter:
+    def __init__(self, path: str, schema: Type[BaseModel]):
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, records: List[BaseModel]) -> None:
+        self.file.writelines(json.dumps(record.model_dump(), ensure_ascii=False) + "\n" for record in records)
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _arrow_schema(schema: Type[BaseModel]):
+    import pyarrow as pa
+
+    types = {str: pa.string(), int: pa.int64(), float: pa.float64(), bool: pa.bool_()}
+    return pa.schema([
+        pa.field(name, types.get(field.annotation, pa.string()), nullable=not field.is_required())
+        for name, field in schema.model_fields.items()
+    ])
+
+
+class ArrowWriter:
+    """One Parquet row group / Arrow record batch per chunk (columnar, written as it goes)."""
+
+    def __init__(self, path: str, schema: Type[BaseModel]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet/Arrow output needs pyarrow: pip install pyarrow") from e
+        self.pa = pa
+        self.schema = _arrow_schema(schema)
+        if path.endswith(".parquet"):
+            self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+        else:
+            self.writer = pa.ipc.new_file(path, self.schema)
+
+    def write(self, records: List[BaseModel]) -> None:
+        if not records:
+            return
+        rows = [record.model_dump() for record in records]
+        columns = {field.name: [self._cell(row.get(field.name), field.type) for row in rows] for field in self.schema}
+        batch = self.pa.RecordBatch.from_pydict(columns, schema=self.schema)
+        if hasattr(self.writer, "write_batch"):
+            self.writer.write_batch(batch)
+        else:
+            self.writer.write(batch)
+
+    def _cell(self, value: Any, arrow_type) -> Any:
+        # Fields without a plain Arrow type (lists, nested models, ...) are stored as JSON text
+        if arrow_type == self.pa.string() and value is not None and not isinstance(value, str):
+            return json.dumps(value, ensure_ascii=False)
+        return value
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def open_writer(path: str, schema: Type[BaseModel]):
+    if path.endswith((".parquet", ".arrow", ".feather")):
+        return ArrowWriter(path, schema)
+    return JSONLWriter(path, schema)
+
+
+async def extract_to_file(
+    names: Iterable[str],
+    output_path: str,
+    structured_llm=None,
+    schema: Type[BaseModel] = Celebrity,
+    max_concurrency: int = DEFAULT_CONCURRENCY,
+    chunk_size: int = CHUNK_SIZE,
+    max_retries: int = MAX_RETRIES,
+) -> Dict[str, Any]:
+    writer = open_writer(output_path, schema)
+    stats = {"ok": 0, "failed": 0, "seconds": 0.0}
+    start = time.perf_counter()
+    try:
+        with open(output_path + ".errors.jsonl", "w", encoding="utf-8") as errors_file:
+            async for records, errors in extract(
+                names, structured_llm, schema, max_concurrency, chunk_size, max_retries
+            ):
+                writer.write([record for _, record in records])
+                for name, error in errors:
+                    errors_file.write(json.dumps({"name": name, "error": error}, ensure_ascii=False) + "\n")
+                stats["ok"] += len(records)
+                stats["failed"] += len(errors)
+    finally:
+        writer.close()
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    stats["names_per_second"] = round((stats["ok"] + stats["failed"]) / stats["seconds"], 1) if stats["seconds"] else 0.0
+    return stats
+
+
+# ---------------------------------------------------
+# Benchmark with a fake structured-output model (no API key needed):
+# 20 ms per call, 5% of answers invalid on the first try
+# ---------------------------------------------------
+def fake_structured_llm(latency: float = 0.02, flaky: float = 0.05, seed: int = 0):
+    from fakeModels import FakeToolCallingChatModel, tool_call_message
+
+    rng = random.Random(seed)
+    seen = set()
+
+    def answer(messages):
+        name = messages[-1].content.replace(PROMPT.format(name=""), "")
+        followers: Any = rng.randint(10_000, 90_000_000)
+        if name not in seen and rng.random() < flaky:
+            followers = "a lot"  # fails Celebrity validation, fine on the retry
+        seen.add(name)
+        return tool_call_message("Celebrity", {"name": name, "country": "Pakistan", "insta_followers": followers})
+
+    llm = FakeToolCallingChatModel(responses=[answer], latency=latency)
+    return llm.with_structured_output(Celebrity)
+
+
+def _bench(count: int, output_dir: str) -> None:
+    names = [f"Celebrity {i}" for i in range(count)]
+
+    # Baseline: one structured_llm.invoke per name, as Method1 does today
+    structured_llm = fake_structured_llm(flaky=0.0)
+    sample = names[: min(count, 200)]
+    start = time.perf_counter()
+    for name in sample:
+        structured_llm.invoke(PROMPT.format(name=name))
+    elapsed = time.perf_counter() - start
+    print(f"one invoke per name   {len(sample):6d} ok            {elapsed:7.2f}s  {len(sample) / elapsed:8.1f} names/s")
+
+    outputs = ["bench.jsonl"] + (["bench.parquet"] if _has_pyarrow() else [])
+    for concurrency in (1, 8, 32):
+        for output in outputs:
+            path = os.path.join(output_dir, output)
+            stats = asyncio.run(extract_to_file(
+                iter(names), path, fake_structured_llm(), max_concurrency=concurrency,
+                chunk_size=max(CHUNK_SIZE, concurrency * 4),
+            ))
+            print(
+                f"concurrency {concurrency:3d}  {output:<14} {stats['ok']:6d} ok {stats['failed']:3d} failed"
+                f"  {stats['seconds']:7.2f}s  {stats['names_per_second']:8.1f} names/s"
+            )
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract Celebrity records for a file of names.")
+    parser.add_argument("input", nargs="?", help="text file, one name per line")
+    parser.add_argument("output", nargs="?", help=".jsonl, .parquet or .arrow")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES)
+    parser.add_argument("--bench", type=int, metavar="N", help="benchmark N names against a fake model")
+    args = parser.parse_args()
+
+    if args.bench:
+        import tempfile
+        _bench(args.bench, tempfile.mkdtemp())
+    elif args.input and args.output:
+        print(asyncio.run(extract_to_file(
+            read_names(args.input), args.output,
+            max_concurrency=args.concurrency, chunk_size=args.chunk_size, max_retries=args.retries,
+        )))
+    else:
+        parser.error("give input and output files, or --bench N")
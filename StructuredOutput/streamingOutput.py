@@ -0,0 +1,188 @@
+import os
+import sys
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing_extensions import Annotated, get_args, get_origin, get_type_hints
+
+# Run as a script: put the repo root (shared helpers: partialJson.py, fakeModels.py, ...) on the path;
+# importers (tests/, batchRunner.py, ...) have already done that
+if __name__ == "__main__":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from partialJson import IncrementalJSONParser, PartialJSONError
+
+# ---------------------------------------------------
+# Streaming structured output: fields as soon as they are complete
+#
+#   for event in stream_structured(tool_calling_llm(llm, Joke), Joke, "Tell me a joke"):
+#       {"type": "partial", "value": {"setup": "Why do prog"}}          # after every chunk
+#       {"type": "field",   "name": "setup", "value": "Why do ..."}     # complete + validated
+#       {"type": "field_error", "name": "rating", "value": "ten", "error": "..."}
+#       {"type": "final",   "value": <Joke dict / Celebrity object>}   # whole object validated
+#
+# The model is asked for the schema as a tool call (like with_structured_output)
+# and the streamed arguments go through IncrementalJSONParser, so each chunk
+# costs only its own length: the buffer is never re-parsed from the start.
+# ---------------------------------------------------
+
+
+def schema_name(schema: Any) -> str:
+    return schema.__name__
+
+
+def tool_calling_llm(llm, schema: Any):
+    """`llm` made to answer with one call to the `schema` tool (streamable, unlike
+    with_structured_output's parsed result)."""
+    return llm.bind_tools([schema], tool_choice=schema_name(schema))
+
+
+class FieldValidator:
+    """Validates a Pydantic model or TypedDict one top-level field at a time, then as a whole."""
+
+    def __init__(self, schema: Any):
+        self.schema = schema
+        self.is_model = isinstance(schema, type) and issubclass(schema, BaseModel)
+        if self.is_model:
+            types = {name: field.annotation for name, field in schema.model_fields.items()}
+            self._whole = schema.model_validate
+        else:
+            hints = get_type_hints(schema, include_extras=True)
+            # Joke's fields are Annotated[type, default, description]: validate the type
+            types = {name: get_args(hint)[0] if get_origin(hint) is Annotated else hint for name, hint in hints.items()}
+            self._whole = TypeAdapter(schema).validate_python
+        self._fields: Dict[str, TypeAdapter] = {name: TypeAdapter(hint) for name, hint in types.items()}
+
+    def field(self, name: str, value: Any) -> Any:
+        adapter = self._fields.get(name)
+        return value if adapter is None else adapter.validate_python(value)
+
+    def whole(self, value: Any) -> Any:
+        return self._whole(value)
+
+
+class _StructuredStream:
+    # Turns AIMessageChunks into partial / field / field_error events
+    def __init__(self, schema: Any):
+        self.validator = FieldValidator(schema)
+        self.parser = IncrementalJSONParser(ignore_trailing=True)
+        self.tool_index: Optional[int] = None
+        self.json_mode = False
+
+    def _text(self, chunk) -> str:
+        pieces = []
+        for tool_chunk in getattr(chunk, "tool_call_chunks", None) or []:
+            index = tool_chunk.get("index") or 0
+            if self.tool_index is None:
+                self.tool_index = index
+            if index == self.tool_index:
+                pieces.append(tool_chunk.get("args") or "")
+        if self.tool_index is None and isinstance(getattr(chunk, "content", None), str):
+            # JSON-mode output: the object is the message text (anything before "{" is skipped)
+            text = chunk.content
+            if not self.json_mode and "{" in text:
+                self.json_mode = True
+                text = text[text.index("{"):]
+            if self.json_mode:
+                pieces.append(text)
+        return "".join(pieces)
+
+    def feed(self, chunk) -> List[dict]:
+        text = self._text(chunk)
+        return self._events(self.parser.feed(text)) if text else []
+
+    def _events(self, parsed) -> List[dict]:
+        events = []
+        for kind, path, value in parsed:
+            if kind != "value" or len(path) != 1:
+                continue
+            name = path[0]
+            try:
+                events.append({"type": "field", "name": name, "value": self.validator.field(name, value)})
+            except ValidationError as e:
+                events.append({"type": "field_error", "name": name, "value": value, "error": str(e)})
+        if parsed:
+            value = self.parser.value
+            # Shallow copy: later chunks keep filling in the parser's object
+            events.insert(0, {"type": "partial", "value": dict(value) if isinstance(value, dict) else value})
+        return events
+
+    def finish(self) -> List[dict]:
+        events = self._events(self.parser.close())
+        if not self.parser.done:
+            raise PartialJSONError("the model stopped before the structured output was complete")
+        events.append({"type": "final", "value": self.validator.whole(self.parser.value)})
+        return events
+
+
+def stream_structured(llm, schema: Any, input: Any, config: Optional[dict] = None) -> Iterator[dict]:
+    """Stream `schema` from `llm` (see tool_calling_llm) as partial / field / final events.
+
+    A field that fails validation is reported as field_error and streaming goes
+    on; the final validation then raises, just like invoke() would.
+    """
+    stream = _StructuredStream(schema)
+    for chunk in llm.stream(input, config):
+        yield from stream.feed(chunk)
+    yield from stream.finish()
+
+
+async def astream_structured(llm, schema: Any, input: Any, config: Optional[dict] = None) -> AsyncIterator[dict]:
+    stream = _StructuredStream(schema)
+    async for chunk in llm.astream(input, config):
+        for event in stream.feed(chunk):
+            yield event
+    for event in stream.finish():
+        yield event
+
+
+def print_structured(events: Iterator[dict]) -> Any:
+    """CLI printer: each field is printed as soon as it's complete; returns the final value."""
+    final = None
+    for event in events:
+        if event["type"] == "field":
+            print(f"{event['name']}: {event['value']}", flush=True)
+        elif event["type"] == "field_error":
+            print(f"{event['name']}: invalid {event['value']!r}", flush=True)
+        elif event["type"] == "final":
+            final = event["value"]
+    return final
+
+
+# ---------------------------------------------------
+# Offline demo: python streamingOutput.py
+# A fake model streams a Joke tool call 12 characters at a time; setup is
+# validated and shown long before the punchline has finished streaming.
+# ---------------------------------------------------
+if __name__ == "__main__":
+    import time
+
+    from fakeModels import FakeToolCallingChatModel, tool_call_message
+    from Method1 import Celebrity
+    from Method2 import Joke
+
+    joke = tool_call_message("Joke", {
+        "setup": "Why do programmers prefer dark mode? " * 4,
+        "punchline": "Because light attracts bugs. " * 8,
+        "rating": 7,
+    })
+    llm = FakeToolCallingChatModel(responses=[joke], latency=0.05, chunk_delay=0.01)
+
+    start = time.perf_counter()
+    chunks = 0
+    for event in stream_structured(tool_calling_llm(llm, Joke), Joke, "Tell me a short programming joke and rate it"):
+        elapsed = (time.perf_counter() - start) * 1000
+        if event["type"] == "partial":
+            chunks += 1
+        elif event["type"] == "field":
+            print(f"{elapsed:7.0f} ms  after {chunks:3d} chunks  {event['name']} = {str(event['value'])[:40]!r}...")
+        elif event["type"] == "final":
+            print(f"{elapsed:7.0f} ms  complete Joke with {len(event['value'])} fields")
+
+    print()
+    celebrity = tool_call_message("Celebrity", {"name": "Hania Amir", "country": "Pakistan", "insta_followers": "a lot"})
+    llm = FakeToolCallingChatModel(responses=[celebrity], chunk_delay=0.005)
+    try:
+        print_structured(stream_structured(tool_calling_llm(llm, Celebrity), Celebrity, "Tell me about Hania Amir"))
+    except ValidationError as e:
+        print(f"final validation failed ({e.error_count()} error) as expected")
@@ -0,0 +1,193 @@
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Set
+
+# ---------------------------------------------------
+# Batch runner: questions.jsonl -> one of the agent graphs -> results.jsonl
+#
+#   python batchRunner.py reflexion questions.jsonl results.jsonl --concurrency 4
+#
+# Input lines look like {"id": "q1", "question": "..."} (id defaults to the line
+# number). The input is read line by line and at most `concurrency` questions
+# are in flight, so memory does not grow with the input file. Each result is
+# appended to the output as soon as it finishes; re-running the same command
+# skips every id that already has a successful result (failed ones are retried).
+# ---------------------------------------------------
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CONCURRENCY = 4
+
+
+def _import_from(folder: str, module: str):
+    # The agent folders use flat imports (e.g. `from Chain import ...`)
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+    return importlib.import_module(module)
+
+
+def _jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return value
+
+
+# ---------------------------------------------------
+# Targets: how to load each runnable, and how to turn a question into its
+# input and its output into something JSON friendly.
+# The graphs are compiled without a checkpointer: the results file is what
+# makes a batch resumable, and the .env SQLite checkpointer (CHECKPOINT_PATH)
+# is sync-only and keyed on one thread_id, so it can't serve concurrent ainvoke
+# calls anyway.
+# ---------------------------------------------------
+def _load_env() -> None:
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+def _reflexion_target():
+    _load_env()
+    graph_module = _import_from("ReflextionAgent", "Graph")
+    app = graph_module.build_app(checkpointer=None)
+    return app, graph_module.initial_state, lambda state: state["messages"][-1].tool_calls[0]["args"]["answer"]
+
+
+def _reflection_target():
+    from langchain_core.messages import HumanMessage
+
+    _load_env()
+    app = _import_from("ReflectionAgent", "AgentWork").build_app(checkpointer=None)
+    return app, lambda question: HumanMessage(content=question), lambda messages: messages[-1].content
+
+
+def _celebrity_target():
+    structured_llm = _import_from("StructuredOutput", "Method1").get_structured_llm()
+    return structured_llm, lambda question: question, _jsonable
+
+
+def _joke_target():
+    structured_llm = _import_from("StructuredOutput", "Method2").get_structured_llm()
+    return structured_llm, lambda question: question, _jsonable
+
+
+TARGETS: Dict[str, Callable] = {
+    "reflexion": _reflexion_target,
+    "reflection": _reflection_target,
+    "celebrity": _celebrity_target,
+    "joke": _joke_target,
+}
+
+
+# ---------------------------------------------------
+# JSONL helpers
+# ---------------------------------------------------
+def read_questions(path: str) -> Iterator[dict]:
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            record.setdefault("id", str(line_number))
+            yield record
+
+
+def completed_ids(path: str) -> Set[str]:
+    # Ids with a successful result in an existing output file
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # e.g. a half-written last line after a crash
+            if "error" not in record:
+                done.add(str(record["id"]))
+    return done
+
+
+def _ends_with_newline(path: str) -> bool:
+    # An empty file counts as ending cleanly
+    with open(path, "rb") as f:
+        if f.seek(0, os.SEEK_END) == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+# ---------------------------------------------------
+# The runner
+# ---------------------------------------------------
+async def run_batch(
+    runnable,
+    records: Iterator[dict],
+    output_path: str,
+    make_input: Callable[[str], Any] = lambda question: question,
+    read_output: Callable[[Any], Any] = _jsonable,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    config: Optional[dict] = None,
+) -> Dict[str, int]:
+    """Run every record through `runnable.ainvoke`, appending results to `output_path`."""
+    done = completed_ids(output_path)
+    stats = {"ok": 0, "failed": 0, "skipped": 0}
+
+    async def run_one(record: dict) -> dict:
+        start = time.perf_counter()
+        try:
+            output = await runnable.ainvoke(make_input(record["question"]), config)
+            result = {"id": record["id"], "output": read_output(output)}
+        except Exception as e:
+            result = {"id": record["id"], "error": repr(e)}
+        result["elapsed"] = round(time.perf_counter() - start, 3)
+        return result
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        # A crash can leave a half-written last line; start the new results on a line of their own
+        if not _ends_with_newline(output_path):
+            out.write("\n")
+
+        def write(result: dict) -> None:
+            out.write(json.dumps(result, default=str) + "\n")
+            out.flush()
+            stats["failed" if "error" in result else "ok"] += 1
+
+        in_flight: Set[asyncio.Task] = set()
+        for record in records:
+            if str(record["id"]) in done:
+                stats["skipped"] += 1
+                continue
+            # Bounded window: wait for a slot before reading further into the input
+            while len(in_flight) >= concurrency:
+                finished, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    write(task.result())
+            in_flight.add(asyncio.create_task(run_one(record)))
+
+        for task in asyncio.as_completed(in_flight):
+            write(await task)
+
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run questions from a JSONL file through an agent graph.")
+    parser.add_argument("target", choices=sorted(TARGETS))
+    parser.add_argument("input", help="JSONL file with {id, question} per line")
+    parser.add_argument("output", help="JSONL file results are appended to")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    args = parser.parse_args()
+
+    runnable, make_input, read_output = TARGETS[args.target]()
+    start = time.perf_counter()
+    stats = asyncio.run(run_batch(
+        runnable, read_questions(args.input), args.output, make_input, read_output, args.concurrency
+    ))
+    print(f"{stats} in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,130 @@
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+# ---------------------------------------------------
+# Durable checkpoints for the agent graphs
+#
+#   app = graph.compile(checkpointer=sqlite_checkpointer("runs.sqlite"))
+#   run_or_resume(app, inputs, thread_id="run-42")
+#
+# Every finished superstep is saved under its thread id, so a run that crashes
+# or times out can pick up from the last completed step instead of redoing
+# every LLM and search call.
+# ---------------------------------------------------
+
+
+def sqlite_checkpointer(path: str, measured: bool = True, delta: bool = True):
+    """SqliteSaver on `path` (needs the langgraph-checkpoint-sqlite package).
+
+    delta=True stores message lists as per-step deltas (see deltaCheckpoints.py).
+    """
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    from deltaCheckpoints import DeltaCheckpointer
+
+    conn = sqlite3.connect(path, check_same_thread=False)
+    # WAL + NORMAL sync: one fsync per checkpoint batch instead of per write
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    saver = SqliteSaver(conn)
+    if delta:
+        saver = DeltaCheckpointer(saver)
+    return MeasuredCheckpointer(saver) if measured else saver
+
+
+class MeasuredCheckpointer(BaseCheckpointSaver):
+    """Wraps a checkpointer and times every checkpoint write (put / put_writes)."""
+
+    def __init__(self, saver: BaseCheckpointSaver):
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.write_seconds = 0.0
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            with self._lock:
+                self.writes += 1
+                self.write_seconds += time.perf_counter() - start
+
+    async def _atimed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return await method(*args)
+        finally:
+            with self._lock:
+                self.writes += 1
+                self.write_seconds += time.perf_counter() - start
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "writes": self.writes,
+            "write_seconds": round(self.write_seconds, 4),
+            "ms_per_write": round(1000 * self.write_seconds / self.writes, 3) if self.writes else 0.0,
+        }
+
+    @property
+    def config_specs(self):
+        return self.saver.config_specs
+
+    def get_tuple(self, config):
+        return self.saver.get_tuple(config)
+
+    async def aget_tuple(self, config):
+        return await self.saver.aget_tuple(config)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        return self.saver.list(config, filter=filter, before=before, limit=limit)
+
+    def alist(self, config, *, filter=None, before=None, limit=None):
+        return self.saver.alist(config, filter=filter, before=before, limit=limit)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        return self._timed(self.saver.put, config, checkpoint, metadata, new_versions)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await self._atimed(self.saver.aput, config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        return self._timed(self.saver.put_writes, config, writes, task_id, task_path)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await self._atimed(self.saver.aput_writes, config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id):
+        return self.saver.delete_thread(thread_id)
+
+    async def adelete_thread(self, thread_id):
+        return await self.saver.adelete_thread(thread_id)
+
+    def get_next_version(self, current, channel):
+        return self.saver.get_next_version(current, channel)
+
+
+def thread_config(thread_id: str, **configurable) -> dict:
+    return {"configurable": {"thread_id": thread_id, **configurable}}
+
+
+def run_or_resume(app, inputs: Any, thread_id: str, config: Optional[dict] = None):
+    """Start `thread_id` with `inputs`, or resume it if an earlier run stopped part way.
+
+    A thread that already finished just returns its final state. Other
+    `configurable` entries in `config` (e.g. a deadline) are kept.
+    """
+    config = config or {}
+    run_config = {**config, "configurable": {**config.get("configurable", {}), "thread_id": thread_id}}
+    snapshot = app.get_state(run_config)
+    if snapshot.next:
+        # Interrupted run: passing None continues from the last saved superstep
+        return app.invoke(None, run_config)
+    if snapshot.values:
+        return snapshot.values
+    return app.invoke(inputs, run_config)
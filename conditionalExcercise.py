@@ -1,6 +1,7 @@
 # Step 0: Import required types and LangGraph components
 from typing import TypedDict
 from langgraph.graph import StateGraph, START, END  # START and END are special nodes for graph flow
+from graphOptimizer import compile_graph  # GRAPH_OPTIMIZE=1 / GRAPH_PARALLEL=1, see graphOptimizer.py
 
 
 # Step 1: Define the shape of the state (like an interface in TypeScript)
@@ -102,7 +103,7 @@ graph.add_conditional_edges(
 graph.add_edge('mulnode',END)
 graph.add_edge('divnode',END)
 # Step 11: Compile the graph into a runnable application
-app = graph.compile()
+app = compile_graph(graph)
 
 
 # Step 12: Run the graph with initial input
@@ -0,0 +1,187 @@
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# ---------------------------------------------------
+# Deadline-aware runs for the iterative agents
+#
+#   app.invoke(inputs, with_deadline(30))          # whole run must fit in 30 s
+#
+# Every node is timed (timed_node), feeding a moving average per node name.
+# Before starting another round, a graph asks deadline.fits([...nodes of the
+# next round...]); if the predicted time does not fit in what is left, it
+# returns the best answer it has and records stopped_early.
+# A node never timed in this process is estimated from the Deadline's
+# `defaults` (seconds per node name), else from the slowest node of the
+# current run, else from the time the run has taken so far.
+# ---------------------------------------------------
+
+EMA_ALPHA = 0.3       # weight of the newest duration in the moving average
+SAFETY_FACTOR = 1.2   # predicted round time is padded by this much before comparing
+
+
+class NodeTimings:
+    """Exponential moving average of each node's duration (seconds)."""
+
+    def __init__(self, alpha: float = EMA_ALPHA, initial: Optional[Dict[str, float]] = None):
+        self.alpha = alpha
+        self._averages: Dict[str, float] = dict(initial or {})
+        self._lock = threading.Lock()
+
+    def record(self, node: str, seconds: float) -> None:
+        with self._lock:
+            previous = self._averages.get(node)
+            self._averages[node] = seconds if previous is None else self.alpha * seconds + (1 - self.alpha) * previous
+
+    def estimate(self, node: str) -> Optional[float]:
+        return self._averages.get(node)
+
+    def predict(self, nodes: Iterable[str]) -> Optional[float]:
+        """Expected time for running `nodes` one after the other; None if any is unknown."""
+        total = 0.0
+        for node in nodes:
+            estimate = self.estimate(node)
+            if estimate is None:
+                return None
+            total += estimate
+        return total
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._averages)
+
+
+# Shared by every run in the process, so later runs predict from earlier ones
+DEFAULT_TIMINGS = NodeTimings()
+
+
+class Deadline:
+    def __init__(
+        self,
+        seconds: Optional[float] = None,
+        at: Optional[float] = None,
+        timings: Optional[NodeTimings] = None,
+        safety: float = SAFETY_FACTOR,
+        defaults: Optional[Dict[str, float]] = None,
+    ):
+        if (seconds is None) == (at is None):
+            raise ValueError("pass exactly one of seconds= or at=")
+        self.started = time.time()
+        self.at = at if at is not None else self.started + seconds
+        self.timings = timings or DEFAULT_TIMINGS
+        self.safety = safety
+        self.defaults: Dict[str, float] = dict(defaults or {})
+        self.node_seconds: List[Tuple[str, float]] = []
+        self.stopped_early = False
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        return self.at - time.time()
+
+    def elapsed(self) -> float:
+        return time.time() - self.started
+
+    def record(self, node: str, seconds: float) -> None:
+        with self._lock:
+            self.node_seconds.append((node, seconds))
+
+    def estimate(self, node: str) -> float:
+        """Expected duration of `node` (seconds), even in a process that has never run it."""
+        estimate = self.timings.estimate(node)
+        if estimate is not None:
+            return estimate
+        if node in self.defaults:
+            return self.defaults[node]
+        # Cold process: assume it is as slow as the slowest step of this run so far
+        # (before the first node has been recorded, that step is still running)
+        with self._lock:
+            measured = [seconds for _, seconds in self.node_seconds]
+        return max(measured) if measured else self.elapsed()
+
+    def fits(self, nodes: Iterable[str]) -> bool:
+        """Whether running `nodes` next is expected to finish before the deadline."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            return False
+        predicted = sum(self.estimate(node) for node in nodes)
+        return predicted * self.safety <= remaining
+
+    def stop_early(self) -> None:
+        self.stopped_early = True
+
+    def report(self) -> Dict[str, Any]:
+        per_node: Dict[str, float] = {}
+        for node, seconds in self.node_seconds:
+            per_node[node] = per_node.get(node, 0.0) + seconds
+        return {
+            "elapsed": round(self.elapsed(), 3),
+            "remaining": round(self.remaining(), 3),
+            "stopped_early": self.stopped_early,
+            "node_seconds": {node: round(seconds, 3) for node, seconds in per_node.items()},
+        }
+
+
+def with_deadline(
+    seconds: float,
+    config: Optional[dict] = None,
+    timings: Optional[NodeTimings] = None,
+    defaults: Optional[Dict[str, float]] = None,
+) -> dict:
+    """`config` plus a fresh Deadline `seconds` from now (under configurable["deadline"])."""
+    config = dict(config or {})
+    deadline = Deadline(seconds, timings=timings, defaults=defaults)
+    config["configurable"] = {**config.get("configurable", {}), "deadline": deadline}
+    return config
+
+
+def get_deadline(config: Optional[dict]) -> Optional[Deadline]:
+    """The run's Deadline. A plain number in configurable["deadline"] is read as an
+    absolute time.time(); that works too, but then per-run node times aren't kept."""
+    value = ((config or {}).get("configurable") or {}).get("deadline")
+    if value is None or isinstance(value, Deadline):
+        return value
+    return Deadline(at=float(value))
+
+
+# The Reflection graphs return plain messages, so the flag rides on the answer itself
+STOPPED_EARLY_KEY = "stopped_early"
+
+
+def mark_stopped_early(message):
+    """Copy of `message` flagged as returned early because of the deadline."""
+    return message.model_copy(update={"response_metadata": {**message.response_metadata, STOPPED_EARLY_KEY: "deadline"}})
+
+
+def stopped_early(message) -> bool:
+    return bool(getattr(message, "response_metadata", {}).get(STOPPED_EARLY_KEY))
+
+
+def _record_node(name: str, config, seconds: float) -> None:
+    deadline = get_deadline(config)
+    (deadline.timings if deadline else DEFAULT_TIMINGS).record(name, seconds)
+    if deadline is not None:
+        deadline.record(name, seconds)
+
+
+def timed_node(name: str, fn: Callable) -> Callable:
+    """Wrap a graph node (sync or async) so its duration feeds the run's Deadline and the moving averages."""
+    takes_config = "config" in inspect.signature(fn).parameters
+
+    if inspect.iscoroutinefunction(fn):
+        async def node(state, config):
+            start = time.perf_counter()
+            try:
+                return await (fn(state, config=config) if takes_config else fn(state))
+            finally:
+                _record_node(name, config, time.perf_counter() - start)
+    else:
+        def node(state, config):
+            start = time.perf_counter()
+            try:
+                return fn(state, config=config) if takes_config else fn(state)
+            finally:
+                _record_node(name, config, time.perf_counter() - start)
+
+    node.__name__ = getattr(fn, "__name__", name)
+    return node
@@ -0,0 +1,320 @@
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage
+from langgraph.checkpoint.base import BaseCheckpointSaver, CheckpointTuple
+
+# zstd when installed (much better ratio/speed on JSON-ish tool output), zlib otherwise
+try:
+    import zstandard
+
+    _CODEC = "zstd"
+    _compress = zstandard.ZstdCompressor(level=3).compress
+    _zstd_decompress = zstandard.ZstdDecompressor().decompress
+except ImportError:  # pragma: no cover - depends on the environment
+    _CODEC = "zlib"
+    _compress = None
+    _zstd_decompress = None
+
+# ---------------------------------------------------
+# Delta-encoded checkpoints for message-heavy graphs
+#
+# A MessageGraph / `messages` channel grows by a message or two per superstep,
+# but a plain checkpointer re-serializes the whole list every time: O(n^2)
+# bytes over a run. DeltaCheckpointer wraps any checkpointer and, for every
+# channel holding a list of messages, stores only what was appended since the
+# parent checkpoint (large messages compressed). Reads walk back to the nearest
+# full copy and cache reconstructed lists, so loading the latest checkpoint of
+# a running thread only decodes the newest messages.
+# ---------------------------------------------------
+
+DELTA_KEY = "__message_delta__"
+COMPRESS_OVER = 1024       # bytes; smaller messages aren't worth compressing
+CACHE_ENTRIES = 256        # reconstructed message lists kept in memory
+SNAPSHOT_EVERY = 16        # full copy every N checkpoints bounds a cold read's parent walk
+
+
+# Placeholder for "this checkpoint's value still has to be read"
+_FETCH = object()
+
+
+def _is_message_list(value: Any) -> bool:
+    return isinstance(value, list) and bool(value) and isinstance(value[0], BaseMessage)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        return _zstd_decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    return data
+
+
+class DeltaCheckpointer(BaseCheckpointSaver):
+    """Stores message-list channels as deltas against the parent checkpoint."""
+
+    def __init__(
+        self,
+        saver: BaseCheckpointSaver,
+        compress_over: int = COMPRESS_OVER,
+        snapshot_every: int = SNAPSHOT_EVERY,
+    ):
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+        self.compress_over = compress_over
+        self.snapshot_every = snapshot_every
+        self._lock = threading.Lock()
+        # (thread_id, checkpoint_ns, checkpoint_id, channel) -> (full message list, deltas since last full copy)
+        self._lists: "OrderedDict[tuple, Tuple[List[BaseMessage], int]]" = OrderedDict()
+
+    # ---------------------------------------------------
+    # Message (de)serialization
+    # ---------------------------------------------------
+    def _pack(self, message: BaseMessage) -> list:
+        type_, data = self.serde.dumps_typed(message)
+        codec = ""
+        if len(data) > self.compress_over:
+            if _compress is not None:
+                data, codec = _compress(data), "zstd"
+            else:
+                data, codec = zlib.compress(data), "zlib"
+        return [type_, codec, data]
+
+    def _unpack(self, item: list) -> BaseMessage:
+        type_, codec, data = item
+        return self.serde.loads_typed((type_, _decompress(codec, data)))
+
+    # ---------------------------------------------------
+    # Cache of reconstructed lists
+    # ---------------------------------------------------
+    def _cached(self, key: tuple) -> Optional[Tuple[List[BaseMessage], int]]:
+        with self._lock:
+            value = self._lists.get(key)
+            if value is not None:
+                self._lists.move_to_end(key)
+            return value
+
+    def _remember(self, key: tuple, messages: List[BaseMessage], depth: int) -> None:
+        with self._lock:
+            self._lists[key] = (messages, depth)
+            self._lists.move_to_end(key)
+            while len(self._lists) > CACHE_ENTRIES:
+                self._lists.popitem(last=False)
+
+    # ---------------------------------------------------
+    # Reads. The walks below yield the config of every checkpoint they need and
+    # are sent back its tuple, so the sync and async methods share them: _sync()
+    # answers with saver.get_tuple, _async() with saver.aget_tuple.
+    # ---------------------------------------------------
+    def _walk(self, thread_id: str, ns: str, checkpoint_id: str, channel: str, value: Any = _FETCH):
+        """Full message list (and deltas since the last full copy) of `channel` at `checkpoint_id`."""
+        pending = []
+        while True:
+            key = (thread_id, ns, checkpoint_id, channel)
+            cached = self._cached(key)
+            if cached is not None:
+                messages, depth = cached
+                break
+            if value is _FETCH:
+                tuple_ = yield {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns, "checkpoint_id": checkpoint_id}}
+                if tuple_ is None:
+                    messages, depth = [], 0
+                    break
+                value = tuple_.checkpoint["channel_values"].get(channel)
+            if not (isinstance(value, dict) and DELTA_KEY in value):
+                # Written without this wrapper: a plain full list
+                messages, depth = list(value or []), 0
+                break
+            delta = value[DELTA_KEY]
+            pending.append((key, delta["items"]))
+            if delta["parent"] is None:
+                messages, depth = [], -1
+                break
+            checkpoint_id, value = delta["parent"], _FETCH
+
+        # Replay the deltas oldest first, caching every list on the way
+        for key, items in reversed(pending):
+            messages = messages + [self._unpack(item) for item in items]
+            depth += 1
+            self._remember(key, messages, depth)
+        return messages, depth
+
+    def _restore(self, tuple_: Optional[CheckpointTuple]):
+        if tuple_ is None:
+            return None
+        configurable = tuple_.config["configurable"]
+        thread_id, ns, checkpoint_id = str(configurable["thread_id"]), configurable.get("checkpoint_ns", ""), configurable["checkpoint_id"]
+        values = tuple_.checkpoint["channel_values"]
+        if not any(isinstance(v, dict) and DELTA_KEY in v for v in values.values()):
+            return tuple_
+        restored = {}
+        for channel, value in values.items():
+            if isinstance(value, dict) and DELTA_KEY in value:
+                messages, _ = yield from self._walk(thread_id, ns, checkpoint_id, channel, value)
+                value = list(messages)
+            restored[channel] = value
+        return tuple_._replace(checkpoint={**tuple_.checkpoint, "channel_values": restored})
+
+    def _sync(self, walk):
+        try:
+            config = next(walk)
+            while True:
+                config = walk.send(self.saver.get_tuple(config))
+        except StopIteration as done:
+            return done.value
+
+    async def _async(self, walk):
+        try:
+            config = next(walk)
+            while True:
+                config = walk.send(await self.saver.aget_tuple(config))
+        except StopIteration as done:
+            return done.value
+
+    # ---------------------------------------------------
+    # BaseCheckpointSaver interface
+    # ---------------------------------------------------
+    @property
+    def config_specs(self):
+        return self.saver.config_specs
+
+    def get_tuple(self, config):
+        return self._sync(self._restore(self.saver.get_tuple(config)))
+
+    async def aget_tuple(self, config):
+        return await self._async(self._restore(await self.saver.aget_tuple(config)))
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        # Drain first: SqliteSaver holds its connection lock while the generator is open,
+        # and restoring a delta may need to read its parent
+        tuples = list(self.saver.list(config, filter=filter, before=before, limit=limit))
+        for tuple_ in tuples:
+            yield self._sync(self._restore(tuple_))
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        tuples = [tuple_ async for tuple_ in self.saver.alist(config, filter=filter, before=before, limit=limit)]
+        for tuple_ in tuples:
+            yield await self._async(self._restore(tuple_))
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        stored = self._sync(self._encode(config, checkpoint))
+        return self.saver.put(config, stored, metadata, new_versions)
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        stored = await self._async(self._encode(config, checkpoint))
+        return await self.saver.aput(config, stored, metadata, new_versions)
+
+    def _encode(self, config, checkpoint):
+        """The checkpoint to store: message lists replaced by their delta against the parent."""
+        configurable = config["configurable"]
+        thread_id, ns = str(configurable["thread_id"]), configurable.get("checkpoint_ns", "")
+        parent_id = configurable.get("checkpoint_id")
+
+        values = dict(checkpoint["channel_values"])
+        for channel, value in checkpoint["channel_values"].items():
+            if not _is_message_list(value):
+                continue
+            delta, depth = yield from self._delta(thread_id, ns, parent_id, channel, value)
+            values[channel] = {DELTA_KEY: delta}
+            self._remember((thread_id, ns, checkpoint["id"], channel), list(value), depth)
+        return {**checkpoint, "channel_values": values}
+
+    def _delta(self, thread_id: str, ns: str, parent_id: Optional[str], channel: str, messages: list):
+        parent, depth = (yield from self._walk(thread_id, ns, parent_id, channel)) if parent_id else ([], 0)
+        appended = (
+            bool(parent)
+            and depth + 1 < self.snapshot_every
+            and len(messages) >= len(parent)
+            and all(a is b or a == b for a, b in zip(parent, messages))
+        )
+        if appended:
+            return {"parent": parent_id, "items": [self._pack(m) for m in messages[len(parent):]]}, depth + 1
+        # First checkpoint, removed/edited messages, or time for a fresh full copy: store everything
+        return {"parent": None, "items": [self._pack(m) for m in messages]}, 0
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        return self.saver.put_writes(config, writes, task_id, task_path)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await self.saver.aput_writes(config, writes, task_id, task_path)
+
+    def _forget(self, thread_id) -> None:
+        with self._lock:
+            for key in [k for k in self._lists if k[0] == str(thread_id)]:
+                del self._lists[key]
+
+    def delete_thread(self, thread_id):
+        self._forget(thread_id)
+        return self.saver.delete_thread(thread_id)
+
+    async def adelete_thread(self, thread_id):
+        self._forget(thread_id)
+        return await self.saver.adelete_thread(thread_id)
+
+    def get_next_version(self, current, channel):
+        return self.saver.get_next_version(current, channel)
+
+
+# ---------------------------------------------------
+# Benchmark: python deltaCheckpoints.py [steps]
+# Bytes written per step and read latency, full snapshots vs deltas, for a
+# synthetic Reflexion-like history (draft/tool/revision messages, 4 KB tool bodies).
+# ---------------------------------------------------
+def _bench(steps: int = 60) -> None:
+    import os
+    import sqlite3
+    import tempfile
+    import time
+    import uuid
+
+    from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+    from langgraph.checkpoint.base import empty_checkpoint
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    def history(n: int) -> List[BaseMessage]:
+        messages: List[BaseMessage] = [HumanMessage(content="How can small businesses use AI?", id="h")]
+        for i in range(n):
+            if i % 2 == 0:
+                messages.append(AIMessage(content=f"Draft {i}: " + "answer text " * 40, id=f"a{i}"))
+            else:
+                body = '{"sources": {"%d": {"url": "https://example.com/%d", "snippet": "%s"}}}' % (i, i, "tool output " * 330)
+                messages.append(ToolMessage(content=body, tool_call_id=f"call_{i}", id=f"t{i}"))
+        return messages
+
+    def run(make_saver) -> Tuple[int, float, float]:
+        path = os.path.join(tempfile.mkdtemp(), "bench.sqlite")
+        conn = sqlite3.connect(path, check_same_thread=False)
+        saver = make_saver(SqliteSaver(conn))
+        full = history(steps)
+        config = {"configurable": {"thread_id": "bench", "checkpoint_ns": ""}}
+        for step in range(1, steps + 1):
+            checkpoint = empty_checkpoint()
+            checkpoint["id"] = str(uuid.uuid6(clock_seq=step)) if hasattr(uuid, "uuid6") else f"{step:08d}"
+            checkpoint["channel_values"] = {"messages": full[:step + 1]}
+            config = saver.put(config, checkpoint, {"step": step}, {})
+        conn.commit()
+        written = sum(len(row[0]) for row in conn.execute("SELECT checkpoint FROM checkpoints"))
+
+        cold_saver = make_saver(SqliteSaver(conn))
+        start = time.perf_counter()
+        cold_saver.get_tuple(config)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        cold_saver.get_tuple(config)
+        warm = time.perf_counter() - start
+        return written, cold, warm
+
+    for name, make_saver in (("full snapshots", lambda s: s), (f"deltas ({_CODEC})", DeltaCheckpointer)):
+        written, cold, warm = run(make_saver)
+        print(
+            f"{name:<16} {written / steps / 1024:8.1f} KB/step  {written / 1024:9.1f} KB total"
+            f"  read latest: cold {cold * 1000:7.2f} ms, warm {warm * 1000:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    import sys
+
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 60)
@@ -0,0 +1,100 @@
+import itertools
+import json
+import threading
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, message_chunk_to_message
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+# ---------------------------------------------------
+# Offline stand-ins for the real chat models (no API key, no network)
+#
+# FakeToolCallingChatModel replays scripted AIMessages, tool calls included, and
+# streams them the way OpenAI/Gemini do: content word by word, tool-call
+# arguments as small pieces of JSON. Use it to run or benchmark any of the
+# graphs in this repo locally.
+# ---------------------------------------------------
+
+
+class FakeToolCallingChatModel(BaseChatModel):
+    """Replays `responses` in order (cycling). Each response is an AIMessage or a
+    callable taking the prompt messages and returning one."""
+
+    responses: List[Any]
+    # Characters of tool-call arguments per streamed chunk
+    chunk_size: int = 12
+    # Simulated latency: before the first token, and per streamed chunk
+    latency: float = 0.0
+    chunk_delay: float = 0.0
+
+    _cursor: Any = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-tool-calling"
+
+    def _next_message(self, messages: List[BaseMessage]) -> AIMessage:
+        with self._lock:
+            if self._cursor is None:
+                self._cursor = itertools.cycle(self.responses)
+            response = next(self._cursor)
+            self.calls += 1
+        message = response(messages) if callable(response) else response
+        return message.model_copy()
+
+    def bind_tools(self, tools, **kwargs):
+        # The scripted responses already decide which tool gets called
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if not self.chunk_delay:
+            if self.latency:
+                time.sleep(self.latency)
+            return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+        # Same total latency as streaming the response
+        full = None
+        for chunk in self._stream(messages, stop=stop, **kwargs):
+            full = chunk.message if full is None else full + chunk.message
+        return ChatResult(generations=[ChatGeneration(message=message_chunk_to_message(full))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        message = self._next_message(messages)
+
+        def emit(chunk: AIMessageChunk, token: str = ""):
+            if self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            generation = ChatGenerationChunk(message=chunk)
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=generation)
+            return generation
+
+        if isinstance(message.content, str) and message.content:
+            for word in message.content.split(" "):
+                yield emit(AIMessageChunk(content=word + " ", id=message.id), word + " ")
+
+        for index, tool_call in enumerate(message.tool_calls):
+            args = json.dumps(tool_call["args"])
+            pieces = [args[i:i + self.chunk_size] for i in range(0, len(args), self.chunk_size)] or [""]
+            for n, piece in enumerate(pieces):
+                yield emit(AIMessageChunk(
+                    content="",
+                    id=message.id,
+                    tool_call_chunks=[{
+                        "name": tool_call["name"] if n == 0 else None,
+                        "id": tool_call.get("id") if n == 0 else None,
+                        "args": piece,
+                        "index": index,
+                    }],
+                ))
+
+
+def tool_call_message(name: str, args: dict, call_id: Optional[str] = None, content: str = "") -> AIMessage:
+    """Shorthand for a scripted AIMessage carrying one tool call."""
+    return AIMessage(content=content, tool_calls=[{"name": name, "args": args, "id": call_id or f"call_{name}"}])
@@ -0,0 +1,410 @@
+import copy
+import inspect
+import os
+import typing
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from langgraph.channels import BinaryOperatorAggregate, LastValue
+from langgraph.errors import InvalidUpdateError
+from langgraph.graph import END, START, StateGraph
+from langgraph.pregel import Pregel
+from langgraph.types import Command
+
+# ---------------------------------------------------
+# Compile-time optimizer for StateGraphs
+#
+#   app = compile_graph(graph)                 # optimized when GRAPH_OPTIMIZE=1
+#   app = compile_graph(graph, optimize=True)
+#   app = compile_graph(graph, parallel=True)  # GRAPH_PARALLEL=1, see parallelScheduler.py
+#   print(format_report(app.optimization_report))
+#
+# Every node costs a full superstep: scheduling, a copy of the state, and a
+# checkpoint write when there is a checkpointer. Two passes remove the steps
+# that do no work:
+# - identity nodes (`lambda state: state`, used as a hub for conditional
+#   edges) are folded away: whatever led into them goes straight to their
+#   conditional edges / successor;
+# - linear chains (A's only successor is B, B's only predecessor is A) are
+#   fused into one node "A+B" that runs the members one after another on a
+#   local copy of the state, then writes the combined update in one step.
+# The final state is the same as the unoptimized graph's. What changes is
+# what you can observe per step: stream(stream_mode="updates") reports "A+B"
+# once instead of A and B, and there are fewer checkpoints.
+#
+# Left alone (and listed under "skipped" in the report): graphs where two
+# nodes can run in the same step (fan-out, waiting edges, Command goto, a
+# router that may return a list), state with reducers other than plain
+# binary operators or with managed values, non-TypedDict state, and nodes
+# with retry/cache policies, deferred nodes, subgraphs, nodes reading a
+# private input schema, and nodes named in interrupt_before/after.
+# ---------------------------------------------------
+
+_IDENTITY = (lambda state: state).__code__
+
+
+def node_function(runnable: Any) -> Any:
+    """The plain function behind a node or router added as a function (None otherwise)."""
+    # LangGraph's wrapper for plain functions and RunnableLambda both keep it as .func / .afunc
+    func = getattr(runnable, "func", None) or getattr(runnable, "afunc", None)
+    return func if inspect.isfunction(func) or inspect.ismethod(func) else None
+
+
+def is_identity(runnable: Any) -> bool:
+    """True for `lambda state: state` (or any function with the same body)."""
+    code = getattr(node_function(runnable), "__code__", None)
+    return (
+        code is not None
+        and code.co_code == _IDENTITY.co_code
+        and code.co_argcount == 1
+        and code.co_kwonlyargcount == 0
+        and code.co_flags & 0x0C == 0  # no *args / **kwargs
+    )
+
+
+def _single_target(branch: Any) -> bool:
+    # A router annotated `-> str` (or a Literal) sends the run to one node; an
+    # unannotated one might return a list of nodes or Send()s, i.e. fan out
+    func = node_function(branch.path)
+    try:
+        hint = typing.get_type_hints(func).get("return") if func is not None else None
+    except Exception:
+        return False
+    return hint is str or typing.get_origin(hint) is typing.Literal
+
+
+def _parallel_reason(graph: StateGraph) -> Optional[str]:
+    # Why two nodes might run in the same superstep (None if they can't)
+    if graph.waiting_edges:
+        return "the graph has waiting edges (fan-in)"
+    successors: Dict[str, int] = defaultdict(int)
+    for start, _ in graph.edges:
+        successors[start] += 1
+    for start, branches in graph.branches.items():
+        successors[start] += len(branches)
+        for name, branch in branches.items():
+            if not _single_target(branch):
+                return f"router {name!r} may return several nodes (annotate it `-> str`)"
+    for start, count in successors.items():
+        if count > 1:
+            return f"{start!r} has {count} successors (fan-out)"
+    for name, spec in graph.nodes.items():
+        if spec.ends:
+            return f"{name!r} can route with Command(goto=...)"
+    return None
+
+
+def _unsupported_node(graph: StateGraph, name: str) -> Optional[str]:
+    spec = graph.nodes[name]
+    if spec.retry_policy or spec.cache_policy:
+        return "has a retry/cache policy"
+    if spec.defer:
+        return "is deferred"
+    if isinstance(spec.runnable, Pregel):
+        return "is a subgraph"
+    if spec.input_schema is not graph.state_schema:
+        return "reads its own input schema"
+    return None
+
+
+def _copy_graph(graph: StateGraph) -> StateGraph:
+    new = copy.copy(graph)
+    new.nodes = dict(graph.nodes)
+    new.edges = set(graph.edges)
+    new.branches = defaultdict(dict, {start: dict(branches) for start, branches in graph.branches.items()})
+    new.waiting_edges = set(graph.waiting_edges)
+    new.compiled = False
+    return new
+
+
+# ---------------------------------------------------
+# Pass 1: fold identity nodes into their predecessors' edges
+# ---------------------------------------------------
+def _fold_identities(graph: StateGraph, keep: set, report: dict) -> None:
+    for name in list(graph.nodes):
+        if name in keep or not is_identity(graph.nodes[name].runnable):
+            continue
+        reason = _unsupported_node(graph, name)
+        if reason is None and not all(isinstance(ch, LastValue) for ch in graph.channels.values()):
+            # Returning the state re-applies every reducer: operator.add would double lists
+            reason = "the state has reducers, so returning it unchanged is not a no-op"
+        incoming = [start for start, end in graph.edges if end == name]
+        if reason is None and not incoming:
+            reason = "nothing leads into it with a plain edge"
+        if reason is None and any(name in (branch.ends or {name: name}).values()
+                                  for branches in graph.branches.values() for branch in branches.values()):
+            reason = "a conditional edge leads into it"
+        if reason is None and any(start in graph.branches for start in incoming):
+            reason = "a predecessor also has conditional edges"
+        if reason is not None:
+            report["skipped"][name] = f"identity node, but {reason}"
+            continue
+
+        outgoing = [end for start, end in graph.edges if start == name]
+        branches = graph.branches.pop(name, {})
+        graph.edges = {(start, end) for start, end in graph.edges if name not in (start, end)}
+        for start in incoming:
+            graph.edges.update((start, end) for end in outgoing)
+            if branches:
+                graph.branches[start].update(branches)
+        del graph.nodes[name]
+        report["folded"].append(name)
+
+
+# ---------------------------------------------------
+# Pass 2: fuse linear chains
+# ---------------------------------------------------
+def _updates(name: str, output: Any) -> List[Tuple[str, Any]]:
+    # A node's return value as (key, value) writes, the way StateGraph reads it
+    if output is None:
+        return []
+    if isinstance(output, dict):
+        return list(output.items())
+    if isinstance(output, Command):
+        if output.goto or output.graph is not None or output.resume is not None:
+            raise InvalidUpdateError(
+                f"node {name!r} routed with a Command inside a fused node; "
+                f"keep it out of the optimizer with compile_graph(..., keep=[{name!r}])"
+            )
+        return list(output._update_as_tuples())
+    if isinstance(output, (list, tuple)) and output and all(isinstance(item, Command) for item in output):
+        return [write for item in output for write in _updates(name, item)]
+    raise InvalidUpdateError(f"Expected dict, got {output}")
+
+
+class _FusedChain(Runnable):
+    """Runs the member nodes in order on a local copy of the state and returns
+    their writes as a single update (reducer writes kept one by one).
+
+    A Runnable rather than a function so that it has both invoke and ainvoke;
+    like the plain-function nodes it replaces, it adds no trace run of its own."""
+
+    def __init__(self, name: str, members: List[Tuple[str, Any]], channels: Dict[str, Any]):
+        self.name = name
+        self.members = members
+        self.channels = channels
+
+    def _apply(self, name: str, output: Any, state: dict, writes: List[Tuple[str, Any]]) -> None:
+        for key, value in _updates(name, output):
+            channel = self.channels.get(key)
+            if channel is None:
+                continue
+            # Same semantics as the real channel: last value, or the reducer applied
+            # (copy() of the graph's channel = the key's initial value)
+            updated = channel.from_checkpoint(state[key]) if key in state else channel.copy()
+            updated.update([value])
+            state[key] = updated.get()
+            writes.append((key, value))
+
+    def _combined(self, writes: List[Tuple[str, Any]]) -> Optional[list]:
+        # A LastValue channel takes one write per step: keep the last one
+        last = {key: i for i, (key, _) in enumerate(writes) if isinstance(self.channels[key], LastValue)}
+        writes = [(key, value) for i, (key, value) in enumerate(writes) if last.get(key, i) == i]
+        return [Command(update=writes)] if writes else None
+
+    def invoke(self, state: dict, config: Optional[RunnableConfig] = None, **kwargs) -> Optional[list]:
+        state, writes = dict(state), []
+        for name, runnable in self.members:
+            # Each member gets its own dict, like a separate node would
+            self._apply(name, runnable.invoke(dict(state), config), state, writes)
+        return self._combined(writes)
+
+    async def ainvoke(self, state: dict, config: Optional[RunnableConfig] = None, **kwargs) -> Optional[list]:
+        state, writes = dict(state), []
+        for name, runnable in self.members:
+            self._apply(name, await runnable.ainvoke(dict(state), config), state, writes)
+        return self._combined(writes)
+
+
+def _fuse_chains(graph: StateGraph, keep: set, report: dict) -> None:
+    def fusable(name: str) -> bool:
+        if name in (START, END) or name in keep or name not in graph.nodes:
+            return False
+        reason = _unsupported_node(graph, name)
+        if reason is not None:
+            report["skipped"].setdefault(name, f"not fused: {reason}")
+        return reason is None
+
+    successors: Dict[str, List[str]] = defaultdict(list)
+    predecessors: Dict[str, List[str]] = defaultdict(list)
+    for start, end in graph.edges:
+        successors[start].append(end)
+        predecessors[end].append(start)
+    # Conditional edges can lead into a chain's head, but not into the middle of one
+    all_branches = [branch for branches in graph.branches.values() for branch in branches.values()]
+    if any(branch.ends is None for branch in all_branches):
+        targets = set(graph.nodes)
+    else:
+        targets = {end for branch in all_branches for end in branch.ends.values()}
+    renamed: Dict[str, str] = {}
+
+    def next_in_chain(name: str) -> Optional[str]:
+        if name in graph.branches or len(successors[name]) != 1:
+            return None
+        nxt = successors[name][0]
+        return nxt if len(predecessors[nxt]) == 1 and nxt not in targets and fusable(nxt) else None
+
+    linked = {nxt for name in graph.nodes if fusable(name) and (nxt := next_in_chain(name))}
+    for head in [name for name in graph.nodes if name not in linked and fusable(name)]:
+        chain = [head]
+        while (nxt := next_in_chain(chain[-1])) is not None:
+            chain.append(nxt)
+        if len(chain) < 2:
+            continue
+
+        fused = "+".join(chain)
+        members = [(name, graph.nodes[name].runnable) for name in chain]
+        runner = _FusedChain(fused, members, dict(graph.channels))
+        tail = chain[-1]
+        outgoing = successors[tail]
+        branches = graph.branches.pop(tail, {})
+        incoming = predecessors[head]
+        graph.edges = {(start, end) for start, end in graph.edges if start not in chain and end not in chain}
+        for name in chain:
+            del graph.nodes[name]
+        graph.add_node(fused, runner, metadata={"fused": chain})
+        # Neighbours may have been fused already
+        graph.edges.update((renamed.get(start, start), fused) for start in incoming)
+        graph.edges.update((fused, renamed.get(end, end)) for end in outgoing)
+        if branches:
+            graph.branches[fused] = branches
+        renamed.update((name, fused) for name in chain)
+        report["fused"][fused] = chain
+
+    if renamed:
+        for branches in graph.branches.values():
+            for name, branch in branches.items():
+                ends = {key: renamed.get(end, end) for key, end in branch.ends.items()}
+                branches[name] = branch._replace(ends=ends)
+
+
+def optimize_graph(graph: StateGraph, keep=()) -> Tuple[StateGraph, dict]:
+    """A copy of `graph` with identity nodes folded and linear chains fused,
+    plus a report: {"folded": [...], "fused": {"a+b": ["a", "b"]}, "skipped": {...}}.
+
+    `graph` itself is left untouched; nodes in `keep` are never removed or fused.
+    """
+    report = {"folded": [], "fused": {}, "skipped": {}}
+    reason = None
+    if not typing.is_typeddict(graph.state_schema):
+        reason = "the state is not a TypedDict"
+    elif graph.managed:
+        reason = "the state has managed values (they count steps)"
+    elif not all(isinstance(ch, (LastValue, BinaryOperatorAggregate)) for ch in graph.channels.values()):
+        reason = "the state has channel types the optimizer doesn't model"
+    else:
+        reason = _parallel_reason(graph)
+    if reason is not None:
+        report["skipped"]["*"] = reason
+        return graph, report
+
+    optimized = _copy_graph(graph)
+    _fold_identities(optimized, set(keep), report)
+    _fuse_chains(optimized, set(keep), report)
+    return optimized, report
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "0").lower() in ("1", "true", "yes")
+
+
+def compile_graph(graph: StateGraph, optimize: Optional[bool] = None, keep=(),
+                  parallel: Optional[bool] = None, access=None, **compile_kwargs):
+    """graph.compile(**compile_kwargs), through optimize_graph() when `optimize`
+    (default: the GRAPH_OPTIMIZE environment variable) is on, and through
+    parallelScheduler.parallelize_graph() first when `parallel` (default:
+    GRAPH_PARALLEL) is on; `access` declares node reads/writes for the latter.
+
+    The report is attached to the compiled app as `app.optimization_report`.
+    """
+    if optimize is None:
+        optimize = _env_flag("GRAPH_OPTIMIZE")
+    if parallel is None:
+        parallel = _env_flag("GRAPH_PARALLEL")
+    parallel_plan = None
+    if parallel:
+        from parallelScheduler import parallelize_graph  # imports this module
+
+        try:
+            graph, parallel_plan = parallelize_graph(graph, access)
+        except ValueError as e:
+            parallel_plan = str(e)
+    report = {"folded": [], "fused": {}, "skipped": {}}
+    if optimize:
+        interrupts = [compile_kwargs.get("interrupt_before"), compile_kwargs.get("interrupt_after")]
+        if "*" in interrupts:
+            report["skipped"]["*"] = "interrupts on every node"
+        else:
+            keep = set(keep).union(*(names or () for names in interrupts))
+            graph, report = optimize_graph(graph, keep)
+    if parallel_plan is not None:
+        report["parallel"] = parallel_plan
+    app = graph.compile(**compile_kwargs)
+    app.optimization_report = report
+    return app
+
+
+def format_report(report: dict) -> str:
+    lines = [f"folded {name} (identity node)" for name in report["folded"]]
+    lines += [f"fused {' -> '.join(members)} into {name}" for name, members in report["fused"].items()]
+    lines += [f"skipped {name}: {reason}" for name, reason in report["skipped"].items()]
+    plan = report.get("parallel")
+    if isinstance(plan, str):
+        lines.append(f"not parallelized: {plan}")
+    elif plan is not None:
+        from parallelScheduler import format_plan
+
+        lines.append(format_plan(plan))
+    return "\n".join(lines) or "nothing to optimize"
+
+
+# ---------------------------------------------------
+# Benchmark: python graphOptimizer.py
+# Per-invoke latency of the tutorial graphs (MultiNodes, condtionalAgent,
+# conditionalExcercise) compiled as-is and optimized, without and with a
+# checkpointer. That both give the same final state is checked in
+# tests/test_graphOptimizer.py.
+# ---------------------------------------------------
+if __name__ == "__main__":
+    import contextlib
+    import importlib
+    import io
+    import time
+
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    def load(module: str) -> StateGraph:
+        with contextlib.redirect_stdout(io.StringIO()):  # the scripts run and print on import
+            return importlib.import_module(module).graph
+
+    numbers = [{"number1": a, "number2": b, "number3": c, "number4": d}
+               for a, b, c, d in [(30, 5, 7, 2), (-4, 9, 1, 3), (0, 0, 6, 4)]]
+    cases = {
+        "MultiNodes": [{"name": name, "age": age} for name, age in [("hamza", "12"), ("ali", "30"), ("", "0")]],
+        "condtionalAgent": [{"number1": n["number1"], "number2": n["number2"], "operation": op}
+                            for n in numbers for op in "+-"],
+        "conditionalExcercise": [dict(n, operation=op, operation2=op2) for n in numbers for op in "+-" for op2 in "*/"],
+    }
+
+    def per_invoke(app, inputs: List[dict], config_for, rounds: int) -> float:
+        start = time.perf_counter()
+        for i in range(rounds):
+            app.invoke(inputs[i % len(inputs)], config_for(i))
+        return (time.perf_counter() - start) / rounds * 1e6
+
+    for module, inputs in cases.items():
+        graph = load(module)
+        optimized, report = optimize_graph(graph)
+        print(f"{module}: {len(graph.nodes)} nodes -> {len(optimized.nodes)}")
+        print("  " + format_report(report).replace("\n", "\n  "))
+
+        for label, checkpointer in [("no checkpointer", None), ("InMemorySaver", InMemorySaver)]:
+            timings = []
+            for g in (graph, optimized):
+                app = g.compile(checkpointer=checkpointer() if checkpointer else None)
+                config_for = (lambda i: {"configurable": {"thread_id": str(i)}}) if checkpointer else (lambda i: None)
+                per_invoke(app, inputs, config_for, 50)  # warm-up
+                timings.append(per_invoke(app, inputs, config_for, 1000))
+            print(f"  {label:<16} {timings[0]:7.0f} us -> {timings[1]:7.0f} us per invoke "
+                  f"({(1 - timings[1] / timings[0]) * 100:.0f}% faster)")
@@ -0,0 +1,116 @@
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+# ---------------------------------------------------
+# Startup budget check for the agent modules
+#
+#   python importBudget.py              # table + exit code 1 if over budget
+#   python importBudget.py --budget-ms 800
+#   python -m pytest tests/test_importBudget.py   # the same check as a test
+#
+# Each module is imported in a fresh interpreter with `python -X importtime`,
+# so workers that import it to call get_app() later pay exactly this much at
+# cold start. A module fails if its cumulative import time is over the budget
+# or if importing it pulled in an LLM provider / search package, which must
+# only be loaded by the factories (get_llm(), get_app(), ...).
+# ---------------------------------------------------
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# (folder, module) as the scripts import each other: flat, from their own folder
+MODULES: List[Tuple[str, str]] = [
+    ("ReflectionAgent", "Chain"),
+    ("ReflectionAgent", "AgentWork"),
+    ("ReflextionAgent", "Chains"),
+    ("ReflextionAgent", "Graph"),
+    ("StructuredOutput", "Method1"),
+    ("StructuredOutput", "Method2"),
+    (".", "ReactAgent"),
+]
+
+# Packages that may only be imported when a client is actually built
+DEFERRED_PACKAGES = (
+    "langchain_google_genai",
+    "langchain_openai",
+    "langchain_community",
+    "langchain.agents",
+    "openai",
+    "google.generativeai",
+    "tavily",
+)
+
+DEFAULT_BUDGET_MS = 1500.0
+DEFAULT_REPEAT = 3
+
+# The module's own folder first (flat imports), then the repo root (shared helpers)
+_PROBE = """
+import sys
+sys.path[:0] = [{folder!r}, {root!r}]
+import {module}
+deferred = {deferred!r}
+loaded = sorted(name for name in sys.modules if name in deferred or name.startswith(tuple(p + "." for p in deferred)))
+print(",".join(loaded))
+"""
+
+
+def measure_import(folder: str, module: str) -> Tuple[float, List[str]]:
+    """(cumulative import time in ms, deferred packages that got imported) for one fresh interpreter."""
+    path = os.path.normpath(os.path.join(ROOT, folder))
+    probe = _PROBE.format(folder=path, root=ROOT, module=module, deferred=DEFERRED_PACKAGES)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=path,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+
+    cumulative_us: Optional[int] = None
+    for line in result.stderr.splitlines():
+        # "import time:      self [us] | cumulative | imported package"
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative_us = int(parts[1])
+    if cumulative_us is None:
+        raise RuntimeError(f"no importtime entry for {module}")
+
+    leaked = [name for name in result.stdout.strip().split(",") if name]
+    # Report only the top-level offenders (not every submodule)
+    leaked = sorted({name for name in leaked if name in DEFERRED_PACKAGES} or set(leaked))
+    return cumulative_us / 1000, leaked
+
+
+def best_of(folder: str, module: str, repeat: int = DEFAULT_REPEAT) -> Tuple[float, List[str]]:
+    # Best of `repeat` runs: the first one also pays for a cold OS file cache
+    runs = [measure_import(folder, module) for _ in range(repeat)]
+    return min(run[0] for run in runs), runs[0][1]
+
+
+def check(budget_ms: float = DEFAULT_BUDGET_MS, repeat: int = DEFAULT_REPEAT) -> Dict[str, dict]:
+    report = {}
+    for folder, module in MODULES:
+        ms, leaked = best_of(folder, module, repeat)
+        report[module] = {"ms": ms, "leaked": leaked, "ok": ms <= budget_ms and not leaked}
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check cold import time of the agent modules.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    args = parser.parse_args()
+
+    report = check(args.budget_ms, args.repeat)
+    for module, row in report.items():
+        status = "ok" if row["ok"] else "FAIL"
+        leaked = f"  imports {', '.join(row['leaked'])} at import time" if row["leaked"] else ""
+        print(f"{module:<12} {row['ms']:8.1f} ms  {status}{leaked}")
+    failed = [module for module, row in report.items() if not row["ok"]]
+    print(f"budget {args.budget_ms:.0f} ms: {'all ok' if not failed else 'over budget: ' + ', '.join(failed)}")
+    sys.exit(1 if failed else 0)
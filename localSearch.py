@@ -0,0 +1,636 @@
+import hashlib
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import time
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr
+
+# ---------------------------------------------------
+# Offline search: a BM25 index over a directory of documents, usable wherever
+# TavilySearchResults is (same invoke(query) -> [{url, content, score, title}])
+#
+#   python localSearch.py build ./docs ./search_index     # .txt .md .html .jsonl
+#   python localSearch.py update ./docs ./search_index    # only new/changed/removed files
+#   python localSearch.py query ./search_index "hania amir dramas"
+#   LOCAL_SEARCH_INDEX=./search_index python ReactAgent.py   # agents use it instead of Tavily
+#
+# The index is a directory of segments. Each build/update writes a new
+# segment and marks replaced or removed documents as deleted in the old ones,
+# so updates never rewrite what is already there; compact() merges them all
+# back into one. Every segment is a handful of flat arrays (sorted term
+# dictionary, postings as uint32 doc ids + uint16 term counts, document
+# lengths, stored text) that are memory-mapped on open: opening a 1M document
+# index reads almost nothing, the OS pages in what queries touch.
+# ---------------------------------------------------
+
+K1 = 1.2
+B = 0.75
+DEFAULT_MAX_RESULTS = 5
+SNIPPET_CHARS = 400       # content returned per hit (Tavily returns a short snippet too)
+STORED_CHARS = 4000       # text kept per document for snippets
+SEGMENT_DOCS = 250_000    # documents per segment while building (bounds builder memory)
+DOCUMENT_SUFFIXES = (".txt", ".md", ".html", ".htm", ".jsonl")
+
+_TOKEN = re.compile(r"\w+")
+_TAG = re.compile(r"<[^>]+>")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was were "
+    "what when where which who will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.casefold()) if token not in STOPWORDS]
+
+
+def _url_hash(url: str) -> int:
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _save(path: Path, values) -> None:
+    np.save(path, np.asarray(values))
+
+
+# ---------------------------------------------------
+# Reading documents
+# ---------------------------------------------------
+def _title(text: str, fallback: str) -> str:
+    for line in text.splitlines():
+        line = " ".join(line.strip().lstrip("#").split())
+        if line:
+            return line[:120]
+    return fallback
+
+
+def read_documents(path: Path) -> Iterator[dict]:
+    """Documents in one file: a .jsonl holds one {url, title?, content} per line,
+    any other file is one document whose url is the file's file:// URI."""
+    if path.suffix == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                content = record.get("content") or record.get("text") or ""
+                url = record.get("url") or f"{path.resolve().as_uri()}#{number}"
+                yield {"url": url, "title": record.get("title") or _title(content, url), "content": content}
+        return
+    text = path.read_text(encoding="utf-8", errors="replace")
+    if path.suffix in (".html", ".htm"):
+        text = _TAG.sub(" ", text)
+    yield {"url": path.resolve().as_uri(), "title": _title(text, path.name), "content": text}
+
+
+def scan_directory(directory: str) -> Dict[str, Tuple[int, int]]:
+    """{path: (mtime_ns, size)} of every document file under `directory`."""
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.endswith(DOCUMENT_SUFFIXES):
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                files[os.path.abspath(path)] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+
+# ---------------------------------------------------
+# One segment on disk
+# ---------------------------------------------------
+class _SegmentWriter:
+    def __init__(self):
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.doc_len = array("I")
+        self.doc_source = array("I")
+        self.urls: List[str] = []
+        self.stored: List[bytes] = []
+        self.tokens = 0
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def add(self, document: dict, source: int) -> None:
+        doc = len(self.urls)
+        counts = Counter(tokenize(document["content"]))
+        for term, count in counts.items():
+            entry = self.postings.get(term)
+            if entry is None:
+                entry = self.postings[term] = (array("I"), array("H"))
+            entry[0].append(doc)
+            entry[1].append(min(count, 65535))
+        length = sum(counts.values())
+        self.tokens += length
+        self.doc_len.append(length)
+        self.doc_source.append(source)
+        self.urls.append(document["url"])
+        title = document.get("title") or ""
+        self.stored.append("\n".join((document["url"], title, document["content"][:STORED_CHARS])).encode("utf-8"))
+
+    def write(self, directory: Path, deleted: Optional[np.ndarray] = None) -> None:
+        directory.mkdir(parents=True)
+        terms = sorted(self.postings)
+        encoded = [term.encode("utf-8") for term in terms]
+        (directory / "terms.bin").write_bytes(b"".join(encoded))
+        _save(directory / "term_offsets.npy", np.cumsum([0] + [len(t) for t in encoded], dtype=np.uint64))
+        lengths = [len(self.postings[term][0]) for term in terms]
+        _save(directory / "post_offsets.npy", np.cumsum([0] + lengths, dtype=np.uint64))
+        docs = np.frombuffer(b"".join(self.postings[term][0].tobytes() for term in terms), dtype=np.uint32)
+        tfs = np.frombuffer(b"".join(self.postings[term][1].tobytes() for term in terms), dtype=np.uint16)
+        _save(directory / "post_docs.npy", docs)
+        _save(directory / "post_tfs.npy", tfs)
+        _save(directory / "doc_len.npy", np.frombuffer(self.doc_len.tobytes(), dtype=np.uint32))
+        _save(directory / "doc_source.npy", np.frombuffer(self.doc_source.tobytes(), dtype=np.uint32))
+        (directory / "store.bin").write_bytes(b"".join(self.stored))
+        _save(directory / "store_offsets.npy", np.cumsum([0] + [len(s) for s in self.stored], dtype=np.uint64))
+        hashes = np.array([_url_hash(url) for url in self.urls], dtype=np.uint64)
+        order = np.argsort(hashes, kind="stable")
+        _save(directory / "url_hash.npy", hashes[order])
+        _save(directory / "url_doc.npy", order.astype(np.uint32))
+        if deleted is None:
+            deleted = np.zeros(len(self.urls), dtype=bool)
+        _save(directory / "deleted.npy", deleted)
+
+
+class _Segment:
+    def __init__(self, directory: Path):
+        self.directory = directory
+        load = lambda name: np.load(directory / name, mmap_mode="r")
+        self.term_offsets = load("term_offsets.npy")
+        self.post_offsets = load("post_offsets.npy")
+        self.post_docs = load("post_docs.npy")
+        self.post_tfs = load("post_tfs.npy")
+        self.doc_len = load("doc_len.npy")
+        self.doc_source = load("doc_source.npy")
+        self.store_offsets = load("store_offsets.npy")
+        self.url_hash = load("url_hash.npy")
+        self.url_doc = load("url_doc.npy")
+        # Small (1 byte per document) and changed by updates: kept in memory
+        self.deleted = np.load(directory / "deleted.npy")
+        self._terms = self._map("terms.bin")
+        self._store = self._map("store.bin")
+        self.size = len(self.doc_len)
+        self.vocabulary = len(self.term_offsets) - 1
+        self._norm, self._norm_key = None, None
+
+    def length_norm(self, k1: float, b: float, avgdl: float) -> np.ndarray:
+        """BM25's per-document k1 * (1 - b + b * length / avgdl), kept until avgdl changes."""
+        key = (k1, b, avgdl)
+        if self._norm_key != key:
+            self._norm = (k1 * (1 - b + b * np.asarray(self.doc_len, dtype=np.float32) / avgdl)).astype(np.float32)
+            self._norm_key = key
+        return self._norm
+
+    def _map(self, name: str):
+        path = self.directory / name
+        if path.stat().st_size == 0:
+            return b""
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _term(self, index: int) -> bytes:
+        return self._terms[int(self.term_offsets[index]):int(self.term_offsets[index + 1])]
+
+    def lookup(self, term: str) -> Optional[Tuple[int, int]]:
+        """Postings range of `term` (binary search over the sorted dictionary)."""
+        key = term.encode("utf-8")
+        low, high = 0, self.vocabulary
+        while low < high:
+            middle = (low + high) // 2
+            if self._term(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.vocabulary and self._term(low) == key:
+            return int(self.post_offsets[low]), int(self.post_offsets[low + 1])
+        return None
+
+    def terms(self) -> Iterator[Tuple[str, int, int]]:
+        for index in range(self.vocabulary):
+            yield self._term(index).decode("utf-8"), int(self.post_offsets[index]), int(self.post_offsets[index + 1])
+
+    def stored(self, doc: int) -> Tuple[str, str, str]:
+        raw = self._store[int(self.store_offsets[doc]):int(self.store_offsets[doc + 1])]
+        url, title, content = bytes(raw).decode("utf-8").split("\n", 2)
+        return url, title, content
+
+    def find_url(self, url: str) -> Optional[int]:
+        """The live document with this url. A segment can also hold deleted copies
+        of it (the same url twice in one batch), so every entry with its hash is checked."""
+        key = np.uint64(_url_hash(url))
+        position = int(np.searchsorted(self.url_hash, key))
+        while position < len(self.url_hash) and self.url_hash[position] == key:
+            doc = int(self.url_doc[position])
+            if not self.deleted[doc]:
+                return doc
+            position += 1
+        return None
+
+    def live_postings(self, found: Optional[Tuple[int, int]]) -> int:
+        """How many documents in a postings range are not deleted."""
+        if found is None:
+            return 0
+        start, end = found
+        if not self.deleted.any():
+            return end - start
+        return end - start - int(np.count_nonzero(self.deleted[self.post_docs[start:end]]))
+
+    def save_deleted(self) -> None:
+        tmp = self.directory / "deleted.tmp.npy"
+        _save(tmp, self.deleted)
+        os.replace(tmp, self.directory / "deleted.npy")
+
+
+# ---------------------------------------------------
+# The index
+# ---------------------------------------------------
+class LocalSearchIndex:
+    def __init__(self, path: str):
+        self.path = Path(path)
+        meta_path = self.path / "meta.json"
+        self.meta = json.loads(meta_path.read_text()) if meta_path.exists() else {
+            "version": 1, "k1": K1, "b": B, "segments": [], "next_segment": 0, "files": {}, "next_file": 0,
+        }
+        self.segments = [_Segment(self.path / "segments" / name) for name in self.meta["segments"]]
+        self._refresh_stats()
+
+    @classmethod
+    def build(cls, documents_dir: str, index_path: str) -> "LocalSearchIndex":
+        """Fresh index over every document file in `documents_dir` (replaces index_path)."""
+        if os.path.exists(index_path):
+            shutil.rmtree(index_path)
+        index = cls(index_path)
+        index.update_from_directory(documents_dir)
+        return index
+
+    def _refresh_stats(self) -> None:
+        live = 0
+        tokens = 0
+        for segment in self.segments:
+            alive = ~segment.deleted
+            live += int(alive.sum())
+            tokens += int(segment.doc_len[alive].sum(dtype=np.uint64))
+        self.documents = live
+        self.avgdl = tokens / live if live else 0.0
+
+    def _save_meta(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp = self.path / "meta.tmp.json"
+        tmp.write_text(json.dumps(self.meta))
+        os.replace(tmp, self.path / "meta.json")
+
+    # ---------------------------------------------------
+    # Updates
+    # ---------------------------------------------------
+    def add_documents(self, documents: Iterable[dict], source: int = 0) -> int:
+        """Index {url, content, title?} documents; a url already in the index is replaced."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        touched = set()
+        writer, in_writer, replaced = _SegmentWriter(), {}, []
+        added = 0
+
+        def flush():
+            nonlocal writer, in_writer, replaced
+            if not len(writer):
+                return
+            deleted = np.zeros(len(writer), dtype=bool)
+            deleted[replaced] = True
+            name = f"{self.meta['next_segment']:06d}"
+            writer.write(self.path / "segments" / name, deleted)
+            self.meta["next_segment"] += 1
+            self.meta["segments"].append(name)
+            self.segments.append(_Segment(self.path / "segments" / name))
+            writer, in_writer, replaced = _SegmentWriter(), {}, []
+
+        for document in documents:
+            url = document["url"]
+            for index, segment in enumerate(self.segments):
+                doc = segment.find_url(url)
+                if doc is not None:
+                    segment.deleted[doc] = True
+                    touched.add(index)
+            if url in in_writer:  # same url twice in one segment: the last one wins
+                replaced.append(in_writer[url])
+            in_writer[url] = len(writer)
+            writer.add(document, document.get("source", source))
+            added += 1
+            if len(writer) >= SEGMENT_DOCS:
+                flush()
+        flush()
+        for index in touched:
+            self.segments[index].save_deleted()
+        self._save_meta()
+        self._refresh_stats()
+        return added
+
+    def delete_source(self, source: int) -> int:
+        deleted = 0
+        for segment in self.segments:
+            hits = (np.asarray(segment.doc_source) == source) & ~segment.deleted
+            if hits.any():
+                segment.deleted |= hits
+                segment.save_deleted()
+                deleted += int(hits.sum())
+        if deleted:
+            self._refresh_stats()
+        return deleted
+
+    def update_from_directory(self, documents_dir: str) -> Dict[str, int]:
+        """Bring the index in line with `documents_dir`: new and changed files are
+        (re)indexed, removed files' documents are deleted, the rest is untouched."""
+        files = self.meta["files"]
+        current = scan_directory(documents_dir)
+        report = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0, "documents": 0}
+        for path in [path for path in files if path not in current]:
+            self.delete_source(files.pop(path)["id"])
+            report["removed"] += 1
+
+        def changed_documents():
+            for path, (mtime, size) in sorted(current.items()):
+                known = files.get(path)
+                if known and known["mtime"] == mtime and known["size"] == size:
+                    report["unchanged"] += 1
+                    continue
+                if known:
+                    # Its documents may have different urls now (jsonl): drop them all
+                    self.delete_source(known["id"])
+                    report["changed"] += 1
+                    source = known["id"]
+                else:
+                    report["added"] += 1
+                    source = self.meta["next_file"]
+                    self.meta["next_file"] += 1
+                files[path] = {"id": source, "mtime": mtime, "size": size}
+                for document in read_documents(Path(path)):
+                    document["source"] = source
+                    yield document
+
+        report["documents"] = self.add_documents(changed_documents())
+        self._save_meta()
+        return report
+
+    def compact(self) -> None:
+        """Merge every segment into one, dropping deleted documents."""
+        if len(self.segments) <= 1 and not any(segment.deleted.any() for segment in self.segments):
+            return
+        writer = _SegmentWriter()
+        remaps = []
+        for segment in self.segments:
+            alive = ~segment.deleted
+            remap = np.full(segment.size, -1, dtype=np.int64)
+            remap[alive] = np.arange(len(writer), len(writer) + int(alive.sum()))
+            remaps.append(remap)
+            for doc in np.nonzero(alive)[0]:
+                url, title, content = segment.stored(int(doc))
+                writer.urls.append(url)
+                writer.stored.append("\n".join((url, title, content)).encode("utf-8"))
+                writer.doc_len.append(int(segment.doc_len[doc]))
+                writer.doc_source.append(int(segment.doc_source[doc]))
+        for segment, remap in zip(self.segments, remaps):
+            for term, start, end in segment.terms():
+                docs = remap[segment.post_docs[start:end]]
+                keep = docs >= 0
+                if not keep.any():
+                    continue
+                entry = writer.postings.get(term)
+                if entry is None:
+                    entry = writer.postings[term] = (array("I"), array("H"))
+                entry[0].extend(docs[keep].astype(np.uint32).tolist())
+                entry[1].extend(np.asarray(segment.post_tfs[start:end])[keep].tolist())
+        name = f"{self.meta['next_segment']:06d}"
+        writer.write(self.path / "segments" / name)
+        old = self.meta["segments"]
+        self.meta["next_segment"] += 1
+        self.meta["segments"] = [name]
+        self._save_meta()
+        self.segments = [_Segment(self.path / "segments" / name)]
+        for stale in old:
+            shutil.rmtree(self.path / "segments" / stale, ignore_errors=True)
+        self._refresh_stats()
+
+    # ---------------------------------------------------
+    # Search
+    # ---------------------------------------------------
+    def search(self, query: str, max_results: int = DEFAULT_MAX_RESULTS) -> List[Dict[str, Any]]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.documents:
+            return []
+        k1, b = self.meta["k1"], self.meta["b"]
+        ranges = [[segment.lookup(term) for term in terms] for segment in self.segments]
+        # Document frequency across segments, live documents only (like self.documents):
+        # otherwise replaced documents push df past the document count and idf below zero
+        df = [sum(segment.live_postings(segment_ranges[i]) for segment, segment_ranges in zip(self.segments, ranges))
+              for i in range(len(terms))]
+        idf = [math.log(1 + (self.documents - n + 0.5) / (n + 0.5)) if n else 0.0 for n in df]
+
+        best: List[Tuple[float, int, int]] = []
+        for s, (segment, segment_ranges) in enumerate(zip(self.segments, ranges)):
+            matched = []
+            scores = np.zeros(segment.size, dtype=np.float32)
+            for weight, found in zip(idf, segment_ranges):
+                if found is None or not weight:
+                    continue
+                start, end = found
+                docs = segment.post_docs[start:end]
+                tf = segment.post_tfs[start:end].astype(np.float32)
+                # Doc ids in one postings list are unique, so += is a plain scatter
+                scores[docs] += weight * (k1 + 1) * tf / (tf + segment.length_norm(k1, b, self.avgdl)[docs])
+                matched.append(docs)
+            if not matched:
+                continue
+            # Rank only the documents that matched a term (whole segment if that's most of it)
+            candidates = np.unique(np.concatenate(matched)) if len(matched) > 1 else np.asarray(matched[0])
+            if len(candidates) > segment.size // 4:
+                candidates = np.arange(segment.size)
+            candidate_scores = scores[candidates]
+            candidate_scores[segment.deleted[candidates]] = 0
+            count = min(max_results, len(candidates))
+            top = np.argpartition(candidate_scores, -count)[-count:]
+            best.extend((float(candidate_scores[i]), s, int(candidates[i])) for i in top if candidate_scores[i] > 0)
+
+        best.sort(reverse=True)
+        best = best[:max_results]
+        if not best:
+            return []
+        top_score = best[0][0]
+        results = []
+        for score, s, doc in best:
+            url, title, content = self.segments[s].stored(doc)
+            results.append({
+                "title": title,
+                "url": url,
+                "content": snippet(content, terms),
+                # Relative to the best hit, so it reads like Tavily's 0-1 relevance
+                "score": round(score / top_score, 4),
+            })
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        size = sum(f.stat().st_size for f in self.path.rglob("*") if f.is_file())
+        return {
+            "documents": self.documents,
+            "segments": len(self.segments),
+            "terms": sum(segment.vocabulary for segment in self.segments),
+            "postings": sum(len(segment.post_docs) for segment in self.segments),
+            "bytes": size,
+        }
+
+
+def snippet(content: str, terms: List[str], size: int = SNIPPET_CHARS) -> str:
+    """A window of `content` around the first query term it contains."""
+    lowered = content.casefold()
+    positions = [position for position in (lowered.find(term) for term in terms) if position >= 0]
+    start = max(0, min(positions) - size // 4) if positions else 0
+    text = " ".join(content[start:start + size].split())
+    return ("..." if start else "") + text + ("..." if start + size < len(content) else "")
+
+
+# ---------------------------------------------------
+# The tool: same input and result shape as TavilySearchResults
+# ---------------------------------------------------
+class LocalSearchInput(BaseModel):
+    query: str = Field(description="search query to look up")
+
+
+class LocalSearchTool(BaseTool):
+    name: str = "local_search_results_json"
+    description: str = (
+        "A search engine over a local document collection. "
+        "Useful for when you need to answer questions about current events or facts. "
+        "Input should be a search query."
+    )
+    args_schema: type = LocalSearchInput
+    index_path: str
+    max_results: int = DEFAULT_MAX_RESULTS
+
+    _index: Optional[LocalSearchIndex] = PrivateAttr(default=None)
+
+    @property
+    def index(self) -> LocalSearchIndex:
+        if self._index is None:
+            self._index = LocalSearchIndex(self.index_path)
+        return self._index
+
+    def _run(self, query: str, run_manager=None) -> List[Dict[str, Any]]:
+        return self.index.search(query, self.max_results)
+
+
+def get_local_search_tool(max_results: int = DEFAULT_MAX_RESULTS) -> Optional[LocalSearchTool]:
+    """The local tool when LOCAL_SEARCH_INDEX points at an index, else None (use Tavily)."""
+    path = os.getenv("LOCAL_SEARCH_INDEX")
+    if not path:
+        return None
+    if not (Path(path) / "meta.json").exists():
+        raise ValueError(f"LOCAL_SEARCH_INDEX={path} is not a search index; build it with: python localSearch.py build <docs> {path}")
+    return LocalSearchTool(index_path=path, max_results=max_results)
+
+
+# ---------------------------------------------------
+# Benchmark: python localSearch.py bench [sizes]
+# Synthetic corpus (Zipf-distributed 50k-word vocabulary, ~60 words per
+# document), 300 queries of 1-3 words from the same distribution minus its
+# 100 most frequent words.
+# ---------------------------------------------------
+def _lexicon(vocabulary: int = 50_000) -> List[str]:
+    syllables = ["ka", "ri", "to", "mu", "se", "la", "no", "vi", "da", "pe", "zu", "ho", "gi", "fa", "be", "ny"]
+    return ["".join(syllables[(i >> (4 * k)) % 16] for k in range(2 + i % 3)) + str(i % 7) for i in range(vocabulary)]
+
+
+def _synthetic_documents(count: int, seed: int = 0, vocabulary: int = 50_000, words: int = 60) -> Iterator[dict]:
+    rng = np.random.default_rng(seed)
+    lexicon = _lexicon(vocabulary)
+    batch = 10_000
+    for first in range(0, count, batch):
+        n = min(batch, count - first)
+        lengths = rng.integers(words // 2, words * 3 // 2, size=n)
+        ids = (rng.zipf(1.2, size=int(lengths.sum())) - 1) % vocabulary
+        position = 0
+        for i in range(n):
+            text = " ".join(lexicon[j] for j in ids[position:position + lengths[i]])
+            position += lengths[i]
+            yield {"url": f"https://local.test/doc/{first + i}", "title": f"Document {first + i}", "content": text}
+
+
+def _queries(count: int, seed: int = 1, vocabulary: int = 50_000, head: int = 100) -> List[str]:
+    # Words drawn from the corpus distribution, minus its `head` most frequent
+    # words (in a real corpus those would be stopwords)
+    rng = np.random.default_rng(seed)
+    lexicon = _lexicon(vocabulary)
+    ids = (rng.zipf(1.2, size=count * 20) - 1) % vocabulary
+    ids = ids[ids >= head]
+    queries, position = [], 0
+    for _ in range(count):
+        n = int(rng.integers(1, 4))
+        queries.append(" ".join(lexicon[j] for j in ids[position:position + n]))
+        position += n
+    return queries
+
+
+def _bench(sizes: List[int], directory: str, queries: int = 300) -> None:
+    query_texts = _queries(queries)
+    print(f"{'docs':>9} {'build s':>8} {'index MB':>9} {'open ms':>8} {'p50 ms':>7} {'p95 ms':>7} {'mean ms':>8}")
+    for size in sizes:
+        path = os.path.join(directory, f"bench_{size}")
+        shutil.rmtree(path, ignore_errors=True)
+        start = time.perf_counter()
+        index = LocalSearchIndex(path)
+        index.add_documents(_synthetic_documents(size))
+        build = time.perf_counter() - start
+        megabytes = index.stats()["bytes"] / 1e6
+
+        start = time.perf_counter()
+        index = LocalSearchIndex(path)
+        opened = (time.perf_counter() - start) * 1000
+
+        latencies = []
+        for query in query_texts:
+            start = time.perf_counter()
+            index.search(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        p50, p95 = latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]
+        print(f"{size:9d} {build:8.1f} {megabytes:9.1f} {opened:8.1f} {p50:7.2f} {p95:7.2f} {sum(latencies) / len(latencies):8.2f}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local BM25 search index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("build", "update"):
+        command = commands.add_parser(name)
+        command.add_argument("documents")
+        command.add_argument("index")
+    command = commands.add_parser("query")
+    command.add_argument("index")
+    command.add_argument("text")
+    command.add_argument("-k", type=int, default=DEFAULT_MAX_RESULTS)
+    commands.add_parser("compact").add_argument("index")
+    command = commands.add_parser("bench")
+    command.add_argument("sizes", nargs="?", default="10000,100000,1000000")
+    command.add_argument("--dir", default=None, help="where the benchmark indexes go (default: a temp dir)")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        index = LocalSearchIndex.build(args.documents, args.index)
+        print(index.stats(), f"{time.perf_counter() - start:.1f}s")
+    elif args.command == "update":
+        print(LocalSearchIndex(args.index).update_from_directory(args.documents))
+    elif args.command == "query":
+        print(json.dumps(LocalSearchIndex(args.index).search(args.text, args.k), indent=2, ensure_ascii=False))
+    elif args.command == "compact":
+        index = LocalSearchIndex(args.index)
+        index.compact()
+        print(index.stats())
+    else:
+        import tempfile
+        _bench([int(size) for size in args.sizes.split(",")], args.dir or tempfile.mkdtemp())
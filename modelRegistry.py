@@ -0,0 +1,277 @@
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# ---------------------------------------------------
+# One place that hands out the chat model clients
+#
+#   llm = get_chat_model("google", "gemini-1.5-flash", google_api_key=...)
+#   llm = get_chat_model("openai", "gpt-4o")
+#
+# - Clients are created on first request and shared afterwards, keyed by
+#   (provider, model, params): Chain.py, Method1.py and Method2.py asking for
+#   the same Gemini model get the same client (and its open connections).
+# - OpenAI-compatible clients all go through one pooled keep-alive httpx
+#   client, so calls reuse TCP/TLS connections instead of opening new ones.
+#   (Gemini talks gRPC: one shared client = one multiplexed channel.)
+# - Every (provider, model) has a concurrency limit: calls beyond it wait for
+#   a free slot instead of piling onto the provider's rate limit.
+# ---------------------------------------------------
+
+DEFAULT_CONCURRENCY = int(os.getenv("MODEL_MAX_CONCURRENCY", "8"))
+MAX_CONNECTIONS = 32
+MAX_KEEPALIVE_CONNECTIONS = 16
+KEEPALIVE_EXPIRY = 30.0  # seconds an idle connection stays open
+
+
+class ConcurrencyLimit:
+    """At most `limit` calls in flight: threads share one semaphore, asyncio
+    callers one semaphore per event loop."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphore = threading.BoundedSemaphore(limit)
+        self._async_semaphores: Dict[int, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = 0
+        self.wait_seconds = 0.0
+
+    def _enter(self, waited: float) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.calls += 1
+            self.peak = max(self.peak, self.in_flight)
+            self.wait_seconds += waited
+
+    def _exit(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    @contextmanager
+    def acquire(self):
+        start = time.perf_counter()
+        with self._semaphore:
+            self._enter(time.perf_counter() - start)
+            try:
+                yield
+            finally:
+                self._exit()
+
+    @asynccontextmanager
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._async_semaphores.setdefault(id(loop), asyncio.Semaphore(self.limit))
+        start = time.perf_counter()
+        async with semaphore:
+            self._enter(time.perf_counter() - start)
+            try:
+                yield
+            finally:
+                self._exit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "peak": self.peak,
+            "calls": self.calls,
+            "wait_seconds": round(self.wait_seconds, 4),
+        }
+
+
+class _ConcurrencyLimited:
+    # Mixed in front of the provider's chat model class. Everything else
+    # (bind_tools, with_structured_output, caching, callbacks) is untouched.
+    # The limit is a private attribute of the client (see _limited_class), so
+    # copies made with model_copy() share it; without one, calls aren't limited.
+    def _acquire(self):
+        limit = self._concurrency_limit
+        return limit.acquire() if limit is not None else nullcontext()
+
+    def _aacquire(self):
+        limit = self._concurrency_limit
+        return limit.aacquire() if limit is not None else nullcontext()
+
+    def _generate(self, *args, **kwargs):
+        with self._acquire():
+            return super()._generate(*args, **kwargs)
+
+    async def _agenerate(self, *args, **kwargs):
+        async with self._aacquire():
+            return await super()._agenerate(*args, **kwargs)
+
+    def _stream(self, *args, **kwargs):
+        with self._acquire():
+            yield from super()._stream(*args, **kwargs)
+
+    async def _astream(self, *args, **kwargs):
+        async with self._aacquire():
+            async for chunk in super()._astream(*args, **kwargs):
+                yield chunk
+
+
+_limited_classes: Dict[type, type] = {}
+
+
+def _limited_class(cls: type) -> type:
+    # Same class name on purpose: LangChain's cache keys and serialization use it
+    if cls not in _limited_classes:
+        from pydantic import PrivateAttr
+
+        _limited_classes[cls] = type(cls.__name__, (_ConcurrencyLimited, cls), {
+            "__module__": cls.__module__,
+            "__annotations__": {"_concurrency_limit": Optional[ConcurrencyLimit]},
+            "_concurrency_limit": PrivateAttr(default=None),
+        })
+    return _limited_classes[cls]
+
+
+def _freeze(value: Any) -> Any:
+    # Hashable stand-in for a param value (objects such as caches by identity)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return ("id", id(value))
+
+
+# ---------------------------------------------------
+# Providers: name -> factory(registry, model, params) returning (class, kwargs)
+# ---------------------------------------------------
+def _google(registry: "ModelRegistry", model: str, params: dict) -> Tuple[type, dict]:
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI, {"model": model, **params}
+
+
+def _openai(registry: "ModelRegistry", model: str, params: dict) -> Tuple[type, dict]:
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI, {
+        "model": model,
+        "http_client": registry.http_client(),
+        "http_async_client": registry.async_http_client(),
+        **params,
+    }
+
+
+PROVIDERS: Dict[str, Callable] = {"google": _google, "openai": _openai}
+
+
+class ModelRegistry:
+    def __init__(
+        self,
+        default_concurrency: int = DEFAULT_CONCURRENCY,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = KEEPALIVE_EXPIRY,
+    ):
+        self.default_concurrency = default_concurrency
+        self.providers: Dict[str, Callable] = dict(PROVIDERS)
+        self._pool = (max_connections, max_keepalive_connections, keepalive_expiry)
+        self._lock = threading.RLock()
+        self._clients: Dict[tuple, Any] = {}
+        self._limits: Dict[Tuple[str, str], ConcurrencyLimit] = {}
+        self._http_client = None
+        self._async_http_client = None
+
+    def register(self, provider: str, factory: Callable) -> None:
+        """Add a provider: factory(registry, model, params) -> (chat model class, constructor kwargs)."""
+        self.providers[provider] = factory
+
+    # ---------------------------------------------------
+    # Shared HTTP connection pool (created on first use)
+    # ---------------------------------------------------
+    def _limits_config(self):
+        import httpx
+
+        max_connections, max_keepalive, expiry = self._pool
+        return httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_keepalive, keepalive_expiry=expiry
+        )
+
+    def http_client(self):
+        with self._lock:
+            if self._http_client is None:
+                import httpx
+                self._http_client = httpx.Client(limits=self._limits_config(), timeout=httpx.Timeout(60.0, connect=10.0))
+            return self._http_client
+
+    def async_http_client(self):
+        with self._lock:
+            if self._async_http_client is None:
+                import httpx
+                self._async_http_client = httpx.AsyncClient(
+                    limits=self._limits_config(), timeout=httpx.Timeout(60.0, connect=10.0)
+                )
+            return self._async_http_client
+
+    # ---------------------------------------------------
+    # Clients
+    # ---------------------------------------------------
+    def set_concurrency(self, provider: str, model: str, limit: int) -> None:
+        """Set a model's limit; call before its first client is created."""
+        with self._lock:
+            self._limits[(provider, model)] = ConcurrencyLimit(limit)
+
+    def get(self, provider: str, model: str, max_concurrency: Optional[int] = None, **params):
+        """The shared client for (provider, model, params), created on first call.
+
+        max_concurrency only counts when the model's first client is created.
+        """
+        if provider not in self.providers:
+            raise ValueError(f"unknown provider {provider!r}, expected one of {sorted(self.providers)}")
+        key = (provider, model, _freeze(params))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                return client
+            limit = self._limits.get((provider, model))
+            if limit is None:
+                limit = self._limits[(provider, model)] = ConcurrencyLimit(max_concurrency or self.default_concurrency)
+            cls, kwargs = self.providers[provider](self, model, params)
+            client = _limited_class(cls)(**kwargs)
+            client._concurrency_limit = limit
+            self._clients[key] = client
+            return client
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {f"{provider}/{model}": limit.stats() for (provider, model), limit in self._limits.items()}
+
+    def close(self) -> None:
+        with self._lock:
+            self._clients.clear()
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
+            # The async client is closed with its event loop; just drop it
+            self._async_http_client = None
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
+
+
+def get_chat_model(provider: str, model: str, **params):
+    """Shared chat model client from the process-wide registry."""
+    return get_registry().get(provider, model, **params)
+
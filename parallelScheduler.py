@@ -0,0 +1,451 @@
+import ast
+import inspect
+import textwrap
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from langgraph.channels import LastValue
+from langgraph.errors import InvalidUpdateError
+from langgraph.graph import END, START, StateGraph
+from langgraph.pregel import Pregel
+
+from graphOptimizer import is_identity, node_function
+
+# ---------------------------------------------------
+# Parallel scheduling of independent steps by state-key dependencies
+#
+#   app = parallelize_graph(graph)[0].compile()
+#   app = compile_graph(graph, parallel=True)     # graphOptimizer; or GRAPH_PARALLEL=1
+#
+# A graph written as one step after another (a node, or a router choosing
+# one of several nodes) is cut into those steps, and each step gets the state
+# keys it reads and writes: declared with @state_access(reads=..., writes=...)
+# or the `access` argument, or inferred from the source (state["key"] reads
+# and assignments, state.get("key"), returned dict literals). A step that
+# can't be read that way (state passed to a helper, computed keys) counts as
+# reading and writing everything, so it stays in order.
+#
+# Step j waits for an earlier step i when it reads what i writes, or both write
+# the same key; if j only overwrites something i reads, it may run alongside i
+# but never before it. Steps that don't wait on each other run in the same
+# superstep: LangGraph runs them on its thread pool (sync nodes) or with
+# asyncio (ainvoke / async nodes). In conditionalExcercise.py the
+# add/subtract and mul/div routers touch separate keys and run together.
+#
+# Each node's update is cut down to the keys it writes. A node that changes a
+# key it doesn't write raises WriteConflictError instead of racing another
+# node for it.
+# ---------------------------------------------------
+
+
+class WriteConflictError(InvalidUpdateError):
+    pass
+
+
+def state_access(reads: Iterable[str] = (), writes: Iterable[str] = ()):
+    """Declare the state keys a node (or router) reads and writes, instead of
+    letting them be inferred from its source."""
+    def decorate(fn):
+        fn.__state_access__ = (frozenset(reads), frozenset(writes))
+        return fn
+    return decorate
+
+
+# ---------------------------------------------------
+# Inferring reads / writes from a node's source
+# ---------------------------------------------------
+class _AccessVisitor(ast.NodeVisitor):
+    def __init__(self, param: str):
+        self.param = param
+        self.reads: set = set()
+        self.writes: set = set()
+        self.unknown = False          # the state is used some other way
+        self.returns_state = False
+        self.returns_other = False    # returns something that isn't a dict literal / the state / None
+
+    def _key(self, node: ast.Subscript) -> Optional[str]:
+        if isinstance(node.value, ast.Name) and node.value.id == self.param:
+            if isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str):
+                return node.slice.value
+            self.unknown = True
+        return None
+
+    def visit_Subscript(self, node: ast.Subscript) -> None:
+        key = self._key(node)
+        if key is None:
+            self.generic_visit(node)
+        elif isinstance(node.ctx, ast.Load):
+            self.reads.add(key)
+        elif isinstance(node.ctx, ast.Store):
+            self.writes.add(key)
+        else:
+            self.unknown = True
+
+    def visit_AugAssign(self, node: ast.AugAssign) -> None:
+        if isinstance(node.target, ast.Subscript) and (key := self._key(node.target)) is not None:
+            self.reads.add(key)
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        func = node.func
+        if (isinstance(func, ast.Attribute) and func.attr == "get" and isinstance(func.value, ast.Name)
+                and func.value.id == self.param and node.args
+                and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str)):
+            self.reads.add(node.args[0].value)
+            for arg in node.args[1:]:
+                self.visit(arg)
+            return
+        self.generic_visit(node)
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if node.id == self.param:
+            self.unknown = True
+
+    def returned(self, value: Optional[ast.AST]) -> None:
+        if value is None or (isinstance(value, ast.Constant) and value.value is None):
+            return
+        if isinstance(value, ast.Name) and value.id == self.param:
+            self.returns_state = True
+            return
+        if isinstance(value, ast.Dict) and all(isinstance(k, ast.Constant) and isinstance(k.value, str)
+                                               for k in value.keys):
+            self.writes.update(k.value for k in value.keys)
+            for v in value.values:
+                self.visit(v)
+            return
+        self.returns_other = True
+        self.visit(value)
+
+    def visit_Return(self, node: ast.Return) -> None:
+        self.returned(node.value)
+
+    def visit_Lambda(self, node: ast.Lambda) -> None:
+        pass  # lambdas inside the body are their own scope
+
+
+def _source_tree(fn: Any) -> Optional[ast.AST]:
+    # The FunctionDef / Lambda node of `fn`, or None when the source isn't available
+    try:
+        source = textwrap.dedent(inspect.getsource(fn))
+        tree = ast.parse(source)
+    except (OSError, TypeError, SyntaxError):
+        return None
+    if fn.__name__ == "<lambda>":
+        lambdas = [node for node in ast.walk(tree) if isinstance(node, ast.Lambda)]
+        return lambdas[0] if len(lambdas) == 1 else None
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == fn.__name__:
+            return node
+    return None
+
+
+def infer_access(fn: Any, router: bool = False) -> Optional[Tuple[FrozenSet[str], FrozenSet[str], bool]]:
+    """(reads, writes, returns_state) read off the source of `fn`, or None if
+    it can't be: the state escapes into other code, or keys are computed.
+    A router's return value is where to go, not an update."""
+    fn = inspect.unwrap(fn)
+    tree = _source_tree(fn)
+    if tree is None or not tree.args.args:
+        return None
+    visitor = _AccessVisitor(tree.args.args[0].arg)
+    if isinstance(tree, ast.Lambda):
+        visitor.returned(tree.body)
+    else:
+        for statement in tree.body:
+            visitor.visit(statement)
+    if visitor.unknown:
+        return None
+    if router:
+        return frozenset(visitor.reads), frozenset(), False
+    if visitor.returns_other:
+        return None
+    return frozenset(visitor.reads), frozenset(visitor.writes), visitor.returns_state
+
+
+# ---------------------------------------------------
+# Steps
+# ---------------------------------------------------
+class Step:
+    """One position in the original run order: a node, or a router choosing one of `nodes`."""
+
+    def __init__(self, nodes: List[str], router: Optional[str] = None, branch: Any = None):
+        self.nodes = nodes
+        self.router = router
+        self.branch = branch
+        self.reads: FrozenSet[str] = frozenset()
+        self.writes: FrozenSet[str] = frozenset()
+        self.level = 0
+
+    def __repr__(self) -> str:
+        label = f"{self.router} -> {'|'.join(self.nodes)}" if self.router else self.nodes[0]
+        return f"{label} [reads {', '.join(sorted(self.reads)) or '-'}; writes {', '.join(sorted(self.writes)) or '-'}]"
+
+
+def _steps(graph: StateGraph) -> List[Step]:
+    # Walk the graph from START; anything but one step after another is refused
+    if graph.waiting_edges:
+        raise ValueError("the graph has waiting edges")
+    successors: Dict[str, List[str]] = {}
+    for start, end in graph.edges:
+        successors.setdefault(start, []).append(end)
+    reducers = not all(isinstance(ch, LastValue) for ch in graph.channels.values())
+
+    def check(name: str) -> None:
+        spec = graph.nodes[name]
+        if spec.ends:
+            raise ValueError(f"{name!r} can route with Command(goto=...)")
+        if spec.defer or isinstance(spec.runnable, Pregel):
+            raise ValueError(f"{name!r} is a deferred node or a subgraph")
+
+    steps: List[Step] = []
+    seen = set()
+    point = START
+    while point != END:
+        if point in seen:
+            raise ValueError(f"the graph loops back to {point!r}")
+        seen.add(point)
+        plain = successors.get(point, [])
+        branches = graph.branches.get(point, {})
+        if point != START:
+            check(point)
+            # `lambda state: state` is a no-op unless it re-applies reducers
+            if reducers or not is_identity(graph.nodes[point].runnable):
+                steps.append(Step([point]))
+        if not branches:
+            if len(plain) != 1:
+                raise ValueError(f"{point!r} has {len(plain)} plain successors")
+            point = plain[0]
+            continue
+        if plain or len(branches) > 1:
+            raise ValueError(f"{point!r} fans out")
+        (router, branch), = branches.items()
+        if branch.ends is None:
+            raise ValueError(f"router {router!r} has no path map")
+        targets = list(dict.fromkeys(branch.ends.values()))
+        joins = set()
+        for target in targets:
+            if target == END or target in seen or target in graph.branches:
+                raise ValueError(f"router {router!r} can go to {target!r}, which doesn't lead on to a common next step")
+            check(target)
+            outgoing = successors.get(target, [])
+            if len(outgoing) != 1:
+                raise ValueError(f"{target!r} has {len(outgoing)} plain successors")
+            joins.add(outgoing[0])
+            seen.add(target)
+        if len(joins) != 1:
+            raise ValueError(f"the nodes router {router!r} chooses from lead to different places")
+        steps.append(Step(targets, router, branch))
+        point = joins.pop()
+    return steps
+
+
+def _access(fn: Any, name: str, keys: FrozenSet[str], reducer_keys: FrozenSet[str],
+            access: Dict[str, Tuple[Iterable[str], Iterable[str]]], router: bool = False) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    if name in access:
+        reads, writes = access[name]
+        return frozenset(reads), frozenset(writes)
+    if fn is not None and hasattr(inspect.unwrap(fn), "__state_access__"):
+        return inspect.unwrap(fn).__state_access__
+    inferred = infer_access(fn, router) if fn is not None else None
+    if inferred is None:
+        return keys, frozenset() if router else keys
+    reads, writes, returns_state = inferred
+    if returns_state:
+        # Returning the state hands every reducer its current value again
+        return reads | reducer_keys, writes | reducer_keys
+    return reads, writes
+
+
+def plan_parallel(graph: StateGraph, access: Optional[Dict[str, Tuple[Iterable[str], Iterable[str]]]] = None) -> List[List[Step]]:
+    """The graph's steps grouped into levels; the steps of a level can share a
+    superstep. Raises ValueError for graphs that aren't one step after another."""
+    access = access or {}
+    keys = frozenset(graph.channels)
+    reducer_keys = frozenset(k for k, ch in graph.channels.items() if not isinstance(ch, LastValue))
+    steps = _steps(graph)
+    for step in steps:
+        reads, writes = set(), set()
+        members = [(name, graph.nodes[name].runnable, False) for name in step.nodes]
+        if step.router:
+            members.append((step.router, step.branch.path, True))
+        for name, runnable, router in members:
+            r, w = _access(node_function(runnable), name, keys, reducer_keys, access, router)
+            reads |= r
+            writes |= w
+        step.reads, step.writes = frozenset(reads), frozenset(writes & keys)
+
+    for j, step in enumerate(steps):
+        for earlier in steps[:j]:
+            if earlier.writes & (step.reads | step.writes):
+                step.level = max(step.level, earlier.level + 1)
+            elif step.writes & earlier.reads:
+                # Must not overwrite what `earlier` reads before it has run
+                step.level = max(step.level, earlier.level)
+    levels: List[List[Step]] = [[] for _ in range(max((s.level for s in steps), default=-1) + 1)]
+    for step in steps:
+        levels[step.level].append(step)
+    for level in levels:
+        written: Dict[str, Step] = {}
+        for step in level:
+            for key in step.writes:
+                if key in written:
+                    raise WriteConflictError(f"{written[key]!r} and {step!r} both write {key!r} in the same step")
+                written[key] = step
+    return levels
+
+
+# ---------------------------------------------------
+# The parallel graph
+# ---------------------------------------------------
+class _GuardedNode(Runnable):
+    """Runs a node on its own copy of the state and passes on only the keys it writes."""
+
+    def __init__(self, name: str, runnable: Any, writes: FrozenSet[str], channels: Dict[str, Any]):
+        self.name = name
+        self.runnable = runnable
+        self.writes = writes
+        self.channels = channels
+
+    def _update(self, state: dict, output: Any) -> Any:
+        if not isinstance(output, dict):
+            return output
+        update = {}
+        for key, value in output.items():
+            if key in self.writes or key not in self.channels:
+                update[key] = value
+            elif (not isinstance(self.channels[key], LastValue)
+                  or key not in state or not (value is state[key] or value == state[key])):
+                raise WriteConflictError(
+                    f"node {self.name!r} changed {key!r}, which it doesn't write; other nodes may run "
+                    f"alongside it. Declare it: @state_access(..., writes=[..., {key!r}])"
+                )
+        return update
+
+    def invoke(self, state: dict, config: Optional[RunnableConfig] = None, **kwargs) -> Any:
+        return self._update(state, self.runnable.invoke(dict(state), config))
+
+    async def ainvoke(self, state: dict, config: Optional[RunnableConfig] = None, **kwargs) -> Any:
+        return self._update(state, await self.runnable.ainvoke(dict(state), config))
+
+
+def parallelize_graph(graph: StateGraph, access=None) -> Tuple[StateGraph, List[List[Step]]]:
+    """A new graph running independent steps of `graph` in the same superstep, and its plan."""
+    levels = plan_parallel(graph, access)
+    new = StateGraph(graph.state_schema, graph.context_schema,
+                     input_schema=graph.input_schema, output_schema=graph.output_schema)
+    channels = dict(graph.channels)
+    previous = [START]
+    for number, level in enumerate(levels):
+        sources = previous
+        if len(previous) > 1 and any(step.router for step in level):
+            # Routers must see every write of the level before: wait for it in one
+            # node, and start the whole level from there so it stays in one superstep
+            hub = f"level{number}"
+            while hub in graph.nodes:
+                hub += "_"
+            new.add_node(hub, lambda state: None)
+            new.edges.update((name, hub) for name in previous)
+            sources = [hub]
+        exits = []
+        for step in level:
+            for name in step.nodes:
+                spec = graph.nodes[name]
+                new.add_node(
+                    name,
+                    _GuardedNode(name, spec.runnable, step.writes, channels),
+                    metadata=spec.metadata,
+                    input_schema=spec.input_schema,
+                    retry_policy=spec.retry_policy,
+                    cache_policy=spec.cache_policy,
+                )
+                exits.append(name)
+            if step.router:
+                router = step.router
+                while router in new.branches[sources[0]]:
+                    router += "_"
+                new.branches[sources[0]][router] = step.branch
+            else:
+                new.edges.update((source, step.nodes[0]) for source in sources)
+        previous = exits
+    new.edges.update((name, END) for name in previous)
+    return new, levels
+
+
+def format_plan(levels: List[List[Step]]) -> str:
+    return "\n".join(
+        f"superstep {number + 1}: " + "\n             ".join(repr(step) for step in level)
+        for number, level in enumerate(levels)
+    )
+
+
+# ---------------------------------------------------
+# Benchmark: python parallelScheduler.py
+# conditionalExcercise and MultiNodes with 100 ms of latency injected into
+# every (non-router) node, run as written and parallelized, with sync nodes
+# (LangGraph's thread pool) and async nodes (asyncio). That both give the
+# same final state is checked in tests/test_parallelScheduler.py.
+# ---------------------------------------------------
+if __name__ == "__main__":
+    import asyncio
+    import contextlib
+    import copy
+    import dataclasses
+    import functools
+    import importlib
+    import io
+    import time
+
+    from langchain_core.runnables import RunnableLambda
+
+    DELAY = 0.1
+
+    def load(module: str) -> StateGraph:
+        with contextlib.redirect_stdout(io.StringIO()):  # the scripts run and print on import
+            return importlib.import_module(module).graph
+
+    def with_latency(graph: StateGraph, use_async: bool) -> StateGraph:
+        slow = copy.copy(graph)
+        slow.nodes = dict(graph.nodes)
+        for name, spec in graph.nodes.items():
+            fn = node_function(spec.runnable)
+            if is_identity(spec.runnable):
+                continue
+            if use_async:
+                @functools.wraps(fn)
+                async def node(state, fn=fn):
+                    await asyncio.sleep(DELAY)
+                    return fn(state)
+                runnable = RunnableLambda(node, name=name)
+            else:
+                @functools.wraps(fn)
+                def node(state, fn=fn):
+                    time.sleep(DELAY)
+                    return fn(state)
+                runnable = RunnableLambda(node, name=name)
+            slow.nodes[name] = dataclasses.replace(spec, runnable=runnable)
+        return slow
+
+    cases = {
+        "conditionalExcercise": [
+            {"number1": a, "number2": b, "number3": c, "number4": d, "operation": op, "operation2": op2}
+            for a, b, c, d in [(30, 5, 7, 2), (-4, 9, 1, 3)] for op in "+-" for op2 in "*/"
+        ],
+        "MultiNodes": [{"name": "hamza", "age": "12"}, {"name": "ali", "age": "30"}],
+    }
+
+    for module, inputs in cases.items():
+        graph = load(module)
+        levels = plan_parallel(graph)
+        print(f"{module}:\n  " + format_plan(levels).replace("\n", "\n  "))
+
+        for use_async in (False, True):
+            slow = with_latency(graph, use_async)
+            timings = []
+            for app in (slow.compile(), parallelize_graph(slow)[0].compile()):
+                start = time.perf_counter()
+                for case in inputs:
+                    result = asyncio.run(app.ainvoke(case)) if use_async else app.invoke(case)
+                timings.append((time.perf_counter() - start) / len(inputs) * 1000)
+            label = "async nodes (asyncio)" if use_async else "sync nodes (thread pool)"
+            print(f"  {label:<26} {timings[0]:6.0f} ms -> {timings[1]:6.0f} ms per invoke "
+                  f"({timings[0] / timings[1]:.1f}x)")
@@ -0,0 +1,353 @@
+import re
+from typing import Any, List, Optional, Tuple
+
+# ---------------------------------------------------
+# Incremental parser for JSON that arrives in pieces (streamed tool-call
+# arguments, JSON-mode output)
+#
+#   parser = IncrementalJSONParser()
+#   for piece in pieces:
+#       for event, path, value in parser.feed(piece):
+#           ...   # ("delta", ("setup",), "Why do") / ("value", ("setup",), "Why do ...")
+#       parser.value                                      # the object so far
+#
+# Every character is looked at once: feed() only scans the new piece and keeps
+# its place (open containers, half-read string/number/escape) between calls,
+# instead of re-parsing the whole buffer the way parse_partial_json does.
+# parser.value is the live object, filled in as it goes: finished values,
+# plus the string still being read so far. Numbers, true/false/null and keys
+# only show up once they are complete.
+# ---------------------------------------------------
+
+_WHITESPACE = " \t\r\n"
+_STRING_RUN = re.compile(r'[^"\\]+')
+_TOKEN_RUN = re.compile(r"[-+.0-9eEtrufalsn]+")
+_INTEGER = re.compile(r"-?(0|[1-9][0-9]*)")
+_NUMBER = re.compile(r"-?(0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?")
+_LITERALS = {"true": True, "false": False, "null": None}
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_MISSING = object()
+
+# What the parser expects next
+_VALUE = "value"                     # any value
+_VALUE_OR_CLOSE = "value_or_close"   # right after "["
+_KEY = "key"                         # after "," in an object
+_KEY_OR_CLOSE = "key_or_close"       # right after "{"
+_COLON = "colon"
+_AFTER = "after"                     # "," or the closing bracket
+_END = "end"                         # the top-level value is complete
+
+Event = Tuple[str, Tuple[Any, ...], Any]
+
+
+class PartialJSONError(ValueError):
+    pass
+
+
+class IncrementalJSONParser:
+    def __init__(self, ignore_trailing: bool = False):
+        # ignore_trailing: text after the top-level value (e.g. a closing code
+        # fence in JSON-mode output) is skipped instead of being an error
+        self.ignore_trailing = ignore_trailing
+        self._root: Any = _MISSING
+        # One [container, current key or index] per open object/array
+        self._stack: List[list] = []
+        self._mode = _VALUE
+        self._token: Optional[List[str]] = None   # number or literal being read
+        self._pieces: Optional[List[str]] = None  # string being read
+        self._is_key = False
+        self._flushed = 0                         # pieces already reported as deltas
+        self._escape: Optional[str] = None        # "" after a backslash, "uXXXX" while reading one
+        self._high_surrogate: Optional[int] = None
+        self.consumed = 0
+
+    @property
+    def done(self) -> bool:
+        return self._mode == _END and self._token is None
+
+    @property
+    def value(self) -> Any:
+        """The object parsed so far (None before the first value starts)."""
+        if self._pieces is not None and not self._is_key:
+            # Bring the open string's slot up to date (the only part rebuilt on demand)
+            text = "".join(self._pieces)
+            if self._flushed == len(self._pieces):
+                self._pieces[:] = [text] if text else []
+                self._flushed = len(self._pieces)
+            self._assign(text)
+        return None if self._root is _MISSING else self._root
+
+    def path(self) -> Tuple[Any, ...]:
+        """Where the value being read (or just finished) sits, e.g. ("items", 2, "name")."""
+        return tuple(frame[1] for frame in self._stack)
+
+    # ---------------------------------------------------
+    # Feeding
+    # ---------------------------------------------------
+    def feed(self, text: str) -> List[Event]:
+        """Parse the next piece; returns the events it completed, in order."""
+        events: List[Event] = []
+        i, n = 0, len(text)
+        while i < n:
+            if self._pieces is not None:
+                i = self._read_string(text, i, events)
+                continue
+            if self._token is not None:
+                match = _TOKEN_RUN.match(text, i)
+                if match:
+                    self._token.append(match.group())
+                    i = match.end()
+                if i < n:  # anything else ends the number/literal
+                    self._finish_token(events)
+                continue
+            c = text[i]
+            if c in _WHITESPACE:
+                i += 1
+                continue
+            self._structural(c, self.consumed + i, events)
+            i += 1
+        self._flush_delta(events)
+        self.consumed += n
+        return events
+
+    def close(self) -> List[Event]:
+        """End of input: finishes a trailing top-level number. The object may still be incomplete."""
+        events: List[Event] = []
+        if self._token is not None:
+            self._finish_token(events)
+        return events
+
+    def _structural(self, c: str, offset: int, events: List[Event]) -> None:
+        mode = self._mode
+        if mode in (_VALUE, _VALUE_OR_CLOSE):
+            if c == "{":
+                container: Any = {}
+                self._assign(container, new=True)
+                self._stack.append([container, None])
+                self._mode = _KEY_OR_CLOSE
+            elif c == "[":
+                container = []
+                self._assign(container, new=True)
+                self._stack.append([container, None])
+                self._mode = _VALUE_OR_CLOSE
+            elif c == '"':
+                self._assign("", new=True)
+                self._open_string(is_key=False)
+            elif c == "-" or c.isdigit() or c in "tfn":
+                self._token = [c]
+            elif c == "]" and mode == _VALUE_OR_CLOSE:
+                self._close(events)
+            else:
+                raise PartialJSONError(f"unexpected {c!r} at offset {offset}, expected a value")
+        elif mode in (_KEY, _KEY_OR_CLOSE):
+            if c == '"':
+                self._open_string(is_key=True)
+            elif c == "}" and mode == _KEY_OR_CLOSE:
+                self._close(events)
+            else:
+                raise PartialJSONError(f"unexpected {c!r} at offset {offset}, expected a key")
+        elif mode == _COLON:
+            if c != ":":
+                raise PartialJSONError(f"unexpected {c!r} at offset {offset}, expected ':'")
+            self._mode = _VALUE
+        elif mode == _AFTER:
+            container = self._stack[-1][0]
+            if c == ",":
+                self._mode = _KEY if isinstance(container, dict) else _VALUE
+            elif c == "}" and isinstance(container, dict):
+                self._close(events)
+            elif c == "]" and isinstance(container, list):
+                self._close(events)
+            else:
+                raise PartialJSONError(f"unexpected {c!r} at offset {offset}, expected ',' or a closing bracket")
+        elif not self.ignore_trailing:
+            raise PartialJSONError(f"unexpected {c!r} at offset {offset}, after the end of the value")
+
+    # ---------------------------------------------------
+    # Values
+    # ---------------------------------------------------
+    def _assign(self, value: Any, new: bool = False) -> None:
+        # Put `value` where the parser currently is; new=True starts a new list item
+        if not self._stack:
+            self._root = value
+            return
+        frame = self._stack[-1]
+        container = frame[0]
+        if isinstance(container, dict):
+            container[frame[1]] = value
+        elif new:
+            container.append(value)
+            frame[1] = len(container) - 1
+        else:
+            container[frame[1]] = value
+
+    def _completed(self, value: Any, events: List[Event]) -> None:
+        events.append(("value", self.path(), value))
+        self._mode = _AFTER if self._stack else _END
+
+    def _close(self, events: List[Event]) -> None:
+        container = self._stack.pop()[0]
+        self._completed(container, events)
+
+    def _finish_token(self, events: List[Event]) -> None:
+        text = "".join(self._token)
+        self._token = None
+        if text in _LITERALS:
+            value = _LITERALS[text]
+        elif _INTEGER.fullmatch(text):
+            value = int(text)
+        elif _NUMBER.fullmatch(text):
+            value = float(text)
+        else:
+            raise PartialJSONError(f"invalid number or literal {text!r}")
+        self._assign(value, new=True)
+        self._completed(value, events)
+
+    # ---------------------------------------------------
+    # Strings
+    # ---------------------------------------------------
+    def _open_string(self, is_key: bool) -> None:
+        self._pieces = []
+        self._flushed = 0
+        self._is_key = is_key
+
+    def _read_string(self, text: str, i: int, events: List[Event]) -> int:
+        n = len(text)
+        pieces = self._pieces
+        while i < n:
+            if self._escape is not None:
+                i = self._read_escape(text, i)
+                continue
+            match = _STRING_RUN.match(text, i)
+            if match:
+                self._pending_surrogate()
+                pieces.append(match.group())
+                i = match.end()
+                continue
+            c = text[i]
+            i += 1
+            if c == "\\":
+                self._escape = ""
+            else:  # closing quote
+                self._pending_surrogate()
+                self._end_string(events)
+                return i
+        return i
+
+    def _read_escape(self, text: str, i: int) -> int:
+        if self._escape == "":
+            c = text[i]
+            if c == "u":
+                self._escape = "u"
+            elif c in _ESCAPES:
+                self._pending_surrogate()
+                self._pieces.append(_ESCAPES[c])
+                self._escape = None
+            else:
+                raise PartialJSONError(f"invalid escape \\{c} at offset {self.consumed + i}")
+            return i + 1
+        part = text[i:i + 5 - len(self._escape)]
+        self._escape += part
+        if len(self._escape) == 5:
+            try:
+                code = int(self._escape[1:], 16)
+            except ValueError:
+                raise PartialJSONError(f"invalid escape \\{self._escape}") from None
+            self._escape = None
+            if 0xDC00 <= code < 0xE000 and self._high_surrogate is not None:
+                high, self._high_surrogate = self._high_surrogate, None
+                self._pieces.append(chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00)))
+            else:
+                self._pending_surrogate()
+                if 0xD800 <= code < 0xDC00:
+                    self._high_surrogate = code  # wait for its low half
+                else:
+                    self._pieces.append(chr(code))
+        return i + len(part)
+
+    def _pending_surrogate(self) -> None:
+        # A high surrogate that wasn't followed by a low one is kept as-is
+        if self._high_surrogate is not None:
+            self._pieces.append(chr(self._high_surrogate))
+            self._high_surrogate = None
+
+    def _flush_delta(self, events: List[Event]) -> None:
+        if self._pieces is None or self._is_key or self._flushed == len(self._pieces):
+            return
+        delta = "".join(self._pieces[self._flushed:])
+        self._flushed = len(self._pieces)
+        events.append(("delta", self.path(), delta))
+
+    def _end_string(self, events: List[Event]) -> None:
+        self._flush_delta(events)
+        text = "".join(self._pieces)
+        is_key = self._is_key
+        self._pieces = None
+        if is_key:
+            self._stack[-1][1] = text
+            self._mode = _COLON
+        else:
+            self._assign(text)
+            self._completed(text, events)
+
+
+def parse_incremental(pieces, parser: Optional[IncrementalJSONParser] = None) -> Any:
+    """Feed every piece and return the (possibly still partial) object."""
+    parser = parser or IncrementalJSONParser()
+    for piece in pieces:
+        parser.feed(piece)
+    parser.close()
+    return parser.value
+
+
+# ---------------------------------------------------
+# Benchmark: python partialJson.py
+# Streams growing JSON documents in 12-character pieces (what a model's
+# tool-call stream looks like) and compares total parse time with re-parsing
+# the accumulated buffer on every piece (langchain's parse_partial_json).
+# ---------------------------------------------------
+if __name__ == "__main__":
+    import json
+    import time
+
+    from langchain_core.utils.json import parse_partial_json
+
+    def document(size: int) -> str:
+        words = " ".join(f"word{i} \\\"quoted\\\" caf\\u00e9" for i in range(size // 30))
+        return json.dumps({
+            "setup": words[: len(words) // 2],
+            "punchline": words[len(words) // 2:],
+            "rating": 7,
+            "tags": ["a", "b", {"nested": [1, 2.5, True, None]}],
+        })
+
+    def pieces_of(text: str, size: int = 12) -> List[str]:
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    for size in (1_000, 10_000, 50_000, 200_000):
+        text = document(size)
+        pieces = pieces_of(text)
+
+        start = time.perf_counter()
+        parser = IncrementalJSONParser()
+        for piece in pieces:
+            parser.feed(piece)
+            parser.value
+        incremental = time.perf_counter() - start
+        assert parser.value == json.loads(text)
+
+        if size <= 50_000:
+            start = time.perf_counter()
+            buffer = ""
+            for piece in pieces:
+                buffer += piece
+                parse_partial_json(buffer)
+            reparse = time.perf_counter() - start
+            reparse_text = f"{reparse * 1000:9.1f} ms"
+        else:
+            reparse_text = "  (skipped)"
+
+        print(
+            f"{len(text):8d} chars {len(pieces):6d} pieces   incremental {incremental * 1000:8.1f} ms"
+            f"   re-parse every piece {reparse_text}"
+        )
@@ -0,0 +1,548 @@
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, AsyncIterator, Optional
+
+from langchain_core.runnables import Runnable
+
+# ---------------------------------------------------
+# Shared rate limiting for LLM chains and search tools
+#
+#   chain = rate_limited(prompt | llm, "google")
+#   tool = rate_limited(tavily_search_tool(), "tavily")
+#
+# Every provider gets one ProviderLimiter, shared by everything wrapped with
+# its name, that combines:
+# - token buckets for requests/second and tokens/minute (requests wait for
+#   budget instead of being sent and bounced),
+# - an AIMD concurrency limit: +1 slot per "window" of successful calls,
+#   halved on a 429 (or shrunk a little when latency goes over target),
+# - retries on 429 with full-jitter exponential backoff, never sooner than
+#   the server's Retry-After.
+# The limiter does the retrying, so clients wrapped with it should be built
+# with their own retries off (max_retries=0): otherwise the client sits out
+# 429s on its own and the limiter never learns about them.
+# ---------------------------------------------------
+
+# Per-provider defaults, sized for the entry paid tiers; override with configure_limiter().
+# Gemini's free tier is only 15 requests/minute: on a free key call
+#   configure_limiter("google", requests_per_second=0.25)
+# (a best-of-N round of 3 drafts + 3 scores then takes ~24 s).
+PROVIDER_LIMITS: Dict[str, Dict[str, Any]] = {
+    "google": {"requests_per_second": 15.0, "tokens_per_minute": 1_000_000, "max_concurrency": 4},
+    "openai": {"requests_per_second": 8.0, "tokens_per_minute": 30_000, "max_concurrency": 8},
+    "tavily": {"requests_per_second": 1.5, "tokens_per_minute": None, "max_concurrency": 4},
+}
+DEFAULT_LIMITS: Dict[str, Any] = {"requests_per_second": 5.0, "tokens_per_minute": None, "max_concurrency": 8}
+
+MAX_RETRIES = 6
+BACKOFF_BASE = 0.5   # seconds; attempt n waits up to BACKOFF_BASE * 2**n
+BACKOFF_CAP = 30.0
+EXPECTED_OUTPUT_TOKENS = 256   # reserved per LLM call until the real usage is known
+
+
+class RateLimitExceeded(Exception):
+    """Still rate limited after all retries."""
+
+
+# ---------------------------------------------------
+# Recognising 429s across providers
+# ---------------------------------------------------
+def is_rate_limited(error: BaseException) -> bool:
+    # openai.RateLimitError / httpx.HTTPStatusError carry a status code,
+    # google.api_core's ResourceExhausted a `code`; fall back to the name/message
+    for attr in ("status_code", "code", "status"):
+        if getattr(error, attr, None) == 429:
+            return True
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    name = type(error).__name__
+    return "RateLimit" in name or "ResourceExhausted" in name or "429" in str(error)[:200]
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds from the Retry-After header of the error's response, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        parsed = email.utils.parsedate_to_datetime(value)
+        return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+def backoff_delay(attempt: int, error: Optional[BaseException] = None,
+                  base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    # Full jitter: spreads the retries of many sessions out instead of synchronising them
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    server_hint = retry_after(error) if error is not None else None
+    return max(delay, server_hint) if server_hint is not None else delay
+
+
+# ---------------------------------------------------
+# Token bucket
+# ---------------------------------------------------
+class TokenBucket:
+    """`rate` units per second, bursts up to `capacity`. Taking more than is
+    available is allowed and puts the bucket in debt (the next caller waits)."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Take `amount` now; returns how long the caller must wait before using it."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level -= min(amount, self.capacity)
+            return 0.0 if self._level >= 0 else -self._level / self.rate
+
+    def refund(self, amount: float) -> None:
+        # Negative amounts charge extra (usage turned out higher than reserved)
+        with self._lock:
+            self._level = min(self.capacity, self._level + amount)
+
+
+# ---------------------------------------------------
+# AIMD concurrency limit
+# ---------------------------------------------------
+class AdaptiveConcurrency:
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32,
+                 latency_target: Optional[float] = None, decrease: float = 0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.decrease = decrease
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def _try_enter(self) -> bool:
+        if self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return True
+        return False
+
+    def acquire(self) -> float:
+        with self._cond:
+            while not self._try_enter():
+                self._cond.wait()
+        return time.monotonic()
+
+    async def aacquire(self) -> float:
+        # Event-loop friendly: poll instead of blocking a thread on the condition
+        delay = 0.002
+        while True:
+            with self._cond:
+                if self._try_enter():
+                    return time.monotonic()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.05)
+
+    def release(self, started: float, latency: Optional[float] = None, rate_limited: bool = False,
+                record: bool = True) -> None:
+        """Give the slot back; record=False skips the AIMD update (the call had no outcome,
+        e.g. a stream the consumer closed early)."""
+        with self._cond:
+            self.in_flight -= 1
+            if record:
+                self._record(started, latency, rate_limited)
+            self._cond.notify_all()
+
+    def _record(self, started: float, latency: Optional[float], rate_limited: bool) -> None:
+        if rate_limited:
+            # One cut per congestion event: 429s from requests sent before
+            # the last cut don't count again
+            if started >= self._last_decrease:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self._last_decrease = time.monotonic()
+        elif latency is not None and self.latency_target and latency > self.latency_target:
+            self.limit = max(self.minimum, self.limit * 0.9)
+        else:
+            # +1 slot after roughly `limit` successes
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+
+# ---------------------------------------------------
+# Token estimates for tokens/minute budgets
+# ---------------------------------------------------
+def estimate_tokens(value: Any) -> int:
+    # ~4 characters per token is close enough for budgeting
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value) // 4 + 1
+    if isinstance(value, dict):
+        return sum(estimate_tokens(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_tokens(v) for v in value)
+    content = getattr(value, "content", None)
+    if content is not None:
+        return estimate_tokens(content)
+    return len(str(value)) // 4 + 1
+
+
+def used_tokens(output: Any) -> Optional[int]:
+    usage = getattr(output, "usage_metadata", None)
+    if usage:
+        return usage.get("total_tokens")
+    return None
+
+
+class ProviderLimiter:
+    def __init__(
+        self,
+        name: str,
+        requests_per_second: float,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: int = 8,
+        latency_target: Optional[float] = None,
+        max_retries: int = MAX_RETRIES,
+        expected_output_tokens: int = EXPECTED_OUTPUT_TOKENS,
+    ):
+        self.name = name
+        self.requests = TokenBucket(requests_per_second, capacity=max(1.0, requests_per_second))
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, capacity=tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = AdaptiveConcurrency(
+            initial=max(1, max_concurrency // 2), maximum=max_concurrency, latency_target=latency_target
+        )
+        self.max_retries = max_retries
+        self.expected_output_tokens = expected_output_tokens
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.waited = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "waited_seconds": round(self.waited, 3),
+            "concurrency_limit": round(self.concurrency.limit, 2),
+        }
+
+    def _budget(self, input: Any) -> tuple:
+        # How long to wait for request + token budget, and the tokens reserved
+        wait = self.requests.reserve(1)
+        reserved = 0
+        if self.tokens is not None:
+            reserved = estimate_tokens(input) + self.expected_output_tokens
+            wait = max(wait, self.tokens.reserve(reserved))
+        with self._lock:
+            self.waited += wait
+        return wait, reserved
+
+    def _settle(self, reserved: int, output: Any) -> None:
+        actual = used_tokens(output)
+        if self.tokens is not None and actual is not None:
+            self.tokens.refund(reserved - actual)
+
+    def _failed(self, attempt: int, error: BaseException) -> float:
+        if not is_rate_limited(error) or attempt >= self.max_retries:
+            if is_rate_limited(error):
+                raise RateLimitExceeded(f"{self.name}: still rate limited after {attempt} retries") from error
+            raise error
+        with self._lock:
+            self.rate_limited += 1
+            self.retries += 1
+        return backoff_delay(attempt, error)
+
+    def call(self, fn: Callable[[], Any], input: Any = None) -> Any:
+        attempt = 0
+        while True:
+            wait, reserved = self._budget(input)
+            if wait:
+                time.sleep(wait)
+            started = self.concurrency.acquire()
+            try:
+                output = fn()
+            except Exception as error:
+                limited = is_rate_limited(error)
+                self.concurrency.release(started, rate_limited=limited)
+                delay = self._failed(attempt, error)
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self.concurrency.release(started, latency=time.monotonic() - started)
+            with self._lock:
+                self.calls += 1
+            self._settle(reserved, output)
+            return output
+
+    async def acall(self, fn: Callable[[], Any], input: Any = None) -> Any:
+        attempt = 0
+        while True:
+            wait, reserved = self._budget(input)
+            if wait:
+                await asyncio.sleep(wait)
+            started = await self.concurrency.aacquire()
+            try:
+                output = await fn()
+            except Exception as error:
+                self.concurrency.release(started, rate_limited=is_rate_limited(error))
+                delay = self._failed(attempt, error)
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self.concurrency.release(started, latency=time.monotonic() - started)
+            with self._lock:
+                self.calls += 1
+            self._settle(reserved, output)
+            return output
+
+    # Streams retry only while nothing has been yielded yet, and hold their slot until
+    # the stream ends. The slot is released in `finally`, so a consumer that stops
+    # early (GeneratorExit) or is cancelled gives it back too; only finished or
+    # failed streams feed the AIMD limit.
+    def stream(self, open_stream: Callable[[], Iterator], input: Any = None) -> Iterator:
+        attempt = 0
+        while True:
+            wait, _ = self._budget(input)
+            if wait:
+                time.sleep(wait)
+            started = self.concurrency.acquire()
+            yielded, outcome, failure = False, None, None
+            try:
+                for chunk in open_stream():
+                    yielded = True
+                    yield chunk
+                outcome = {"latency": time.monotonic() - started}
+            except Exception as error:
+                outcome, failure = {"rate_limited": is_rate_limited(error)}, error
+            finally:
+                self.concurrency.release(started, record=outcome is not None, **(outcome or {}))
+            if failure is None:
+                with self._lock:
+                    self.calls += 1
+                return
+            if yielded:
+                raise failure
+            delay = self._failed(attempt, failure)
+            attempt += 1
+            time.sleep(delay)
+
+    async def astream(self, open_stream: Callable[[], AsyncIterator], input: Any = None) -> AsyncIterator:
+        attempt = 0
+        while True:
+            wait, _ = self._budget(input)
+            if wait:
+                await asyncio.sleep(wait)
+            started = await self.concurrency.aacquire()
+            yielded, outcome, failure = False, None, None
+            try:
+                async for chunk in open_stream():
+                    yielded = True
+                    yield chunk
+                outcome = {"latency": time.monotonic() - started}
+            except Exception as error:
+                outcome, failure = {"rate_limited": is_rate_limited(error)}, error
+            finally:
+                self.concurrency.release(started, record=outcome is not None, **(outcome or {}))
+            if failure is None:
+                with self._lock:
+                    self.calls += 1
+                return
+            if yielded:
+                raise failure
+            delay = self._failed(attempt, failure)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """The process-wide limiter for `provider`, created from PROVIDER_LIMITS on first use."""
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = ProviderLimiter(provider, **PROVIDER_LIMITS.get(provider, DEFAULT_LIMITS))
+        return _limiters[provider]
+
+
+def configure_limiter(provider: str, **limits) -> ProviderLimiter:
+    """Replace `provider`'s limiter (e.g. for a paid tier's higher limits)."""
+    with _limiters_lock:
+        _limiters[provider] = ProviderLimiter(provider, **{**PROVIDER_LIMITS.get(provider, DEFAULT_LIMITS), **limits})
+        return _limiters[provider]
+
+
+# ---------------------------------------------------
+# Runnable wrapper: works for chains, chat models and tools alike
+# ---------------------------------------------------
+class RateLimited(Runnable):
+    def __init__(self, runnable: Runnable, limiter: ProviderLimiter):
+        self.runnable = runnable
+        self.limiter = limiter
+
+    def __getattr__(self, name: str):
+        # Tool attributes (description, args, ...) pass through
+        return getattr(self.runnable, name)
+
+    @property
+    def name(self) -> Optional[str]:
+        # Runnable defines `name` (as None), so __getattr__ never sees it
+        return getattr(self.runnable, "name", None)
+
+    def invoke(self, input: Any, config=None, **kwargs) -> Any:
+        return self.limiter.call(lambda: self.runnable.invoke(input, config, **kwargs), input)
+
+    async def ainvoke(self, input: Any, config=None, **kwargs) -> Any:
+        return await self.limiter.acall(lambda: self.runnable.ainvoke(input, config, **kwargs), input)
+
+    def stream(self, input: Any, config=None, **kwargs) -> Iterator:
+        return self.limiter.stream(lambda: self.runnable.stream(input, config, **kwargs), input)
+
+    async def astream(self, input: Any, config=None, **kwargs) -> AsyncIterator:
+        async for chunk in self.limiter.astream(lambda: self.runnable.astream(input, config, **kwargs), input):
+            yield chunk
+
+
+def rate_limited(runnable: Runnable, provider: str) -> RateLimited:
+    return RateLimited(runnable, get_limiter(provider))
+
+
+# ---------------------------------------------------
+# Tavily: the stock TavilySearchResults catches every exception (a 429
+# included) and returns repr(error) as its result, so a limiter around it
+# would see a success. This subclass lets the HTTP error out instead.
+# ---------------------------------------------------
+_tavily_class = None
+
+
+def tavily_search_tool(**kwargs):
+    """TavilySearchResults(**kwargs) whose request errors raise instead of coming back as strings."""
+    global _tavily_class
+    if _tavily_class is None:
+        from langchain_community.tools import TavilySearchResults
+
+        class RaisingTavilySearchResults(TavilySearchResults):
+            def _search_args(self) -> tuple:
+                return (self.max_results, self.search_depth, self.include_domains, self.exclude_domains,
+                        self.include_answer, self.include_raw_content, self.include_images)
+
+            def _run(self, query: str, run_manager=None):
+                raw_results = self.api_wrapper.raw_results(query, *self._search_args())
+                return self.api_wrapper.clean_results(raw_results["results"]), raw_results
+
+            async def _arun(self, query: str, run_manager=None):
+                raw_results = await self.api_wrapper.raw_results_async(query, *self._search_args())
+                return self.api_wrapper.clean_results(raw_results["results"]), raw_results
+
+        _tavily_class = RaisingTavilySearchResults
+    return _tavily_class(**kwargs)
+
+
+# ---------------------------------------------------
+# Benchmark: python rateLimiter.py
+# A local server that allows 40 requests/second (429 + Retry-After beyond
+# that) is hit with 200 calls from 32 threads: no limiter, retries only,
+# and the full limiter.
+# ---------------------------------------------------
+def _rate_limited_server(rps: float, latency: float = 0.02):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    bucket = TokenBucket(rps, capacity=rps / 4)
+    counts = {"ok": 0, "429": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            wait = bucket.reserve(1)
+            if wait > 0:
+                bucket.refund(1)
+                with lock:
+                    counts["429"] += 1
+                self.send_response(429)
+                self.send_header("Retry-After", f"{wait:.2f}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            time.sleep(latency)
+            with lock:
+                counts["ok"] += 1
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, counts
+
+
+def _bench(calls: int = 200, threads: int = 32, server_rps: float = 40.0) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    import httpx
+    from langchain_core.runnables import RunnableLambda
+
+    class RetriesOnly(Runnable):
+        # Backoff without budget or adaptive concurrency
+        def __init__(self, runnable):
+            self.runnable = runnable
+
+        def invoke(self, input, config=None, **kwargs):
+            for attempt in range(MAX_RETRIES + 1):
+                try:
+                    return self.runnable.invoke(input, config)
+                except Exception as error:
+                    if not is_rate_limited(error) or attempt == MAX_RETRIES:
+                        raise
+                    time.sleep(backoff_delay(attempt, error))
+
+    variants = {
+        "no limiter": lambda call: call,
+        "retries only": RetriesOnly,
+        "limiter": lambda call: RateLimited(call, ProviderLimiter(
+            "bench", requests_per_second=server_rps * 0.95, max_concurrency=threads)),
+    }
+    for name, wrap in variants.items():
+        server, counts = _rate_limited_server(server_rps)
+        url = f"http://127.0.0.1:{server.server_address[1]}/"
+        client = httpx.Client(limits=httpx.Limits(max_connections=threads))
+        call = wrap(RunnableLambda(lambda i: client.post(url, content=b"{}").raise_for_status()))
+
+        def run(i):
+            try:
+                call.invoke(i)
+                return True
+            except Exception:
+                return False
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as pool:
+            succeeded = sum(pool.map(run, range(calls)))
+        elapsed = time.perf_counter() - start
+        print(
+            f"{name:<13} {succeeded:4d}/{calls} ok  {counts['429']:5d} x 429  {elapsed:6.2f}s"
+            f"  {succeeded / elapsed:6.1f} ok/s"
+        )
+        client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    _bench()
@@ -0,0 +1,268 @@
+import asyncio
+import json
+import re
+import threading
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+
+from langchain_core.runnables import Runnable
+
+# ---------------------------------------------------
+# Single-flight: identical calls that are in flight at the same time share
+# one upstream request
+#
+#   search = single_flight(rate_limited(tavily_search_tool(), "tavily"))
+#   llm = single_flight(chat_model)
+#
+# The first caller for a key runs the call; everyone who asks for the same key
+# before it finishes waits for that same result (or gets the same exception).
+# Nothing is kept afterwards: this is not a cache, the next call after it
+# finishes goes upstream again. Works across threads and asyncio tasks, in any
+# mix. Tool inputs are keyed on normalized arguments (whitespace/case), chat
+# model inputs on the exact messages (ids aside).
+# ---------------------------------------------------
+
+_SPACES = re.compile(r"\s+")
+
+
+class _LeaderCancelled(Exception):
+    # The asyncio task running the shared call was cancelled: waiters retry it
+    pass
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self.calls = 0
+        self.upstream = 0
+        self.coalesced = 0
+        self.shared_errors = 0
+
+    def _join(self, key: str):
+        # (future, True) for the caller that has to run the call
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._in_flight[key] = Future()
+            self.upstream += 1
+            return future, True
+
+    def _settle(self, key: str, future: Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    def _shared(self, future: Future) -> Any:
+        try:
+            return future.result()
+        except _LeaderCancelled:
+            raise
+        except Exception:
+            with self._lock:
+                self.shared_errors += 1
+            raise
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                try:
+                    result = fn()
+                except BaseException as e:
+                    self._settle(key, future, error=e)
+                    raise
+                self._settle(key, future, result)
+                return result
+            try:
+                return self._shared(future)
+            except _LeaderCancelled:
+                continue
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                try:
+                    result = await fn()
+                except asyncio.CancelledError:
+                    self._settle(key, future, error=_LeaderCancelled())
+                    raise
+                except BaseException as e:
+                    self._settle(key, future, error=e)
+                    raise
+                self._settle(key, future, result)
+                return result
+            try:
+                # shield: one waiter giving up must not cancel the shared call
+                await asyncio.shield(asyncio.wrap_future(future))
+            except _LeaderCancelled:
+                continue
+            except Exception:
+                pass  # raised (and counted) by _shared
+            return self._shared(future)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "upstream": self.upstream,
+                "coalesced": self.coalesced,
+                "shared_errors": self.shared_errors,
+                "in_flight": len(self._in_flight),
+            }
+
+
+# ---------------------------------------------------
+# Keys
+# ---------------------------------------------------
+def _normalize(value: Any, casefold: bool) -> Any:
+    if isinstance(value, str):
+        value = _SPACES.sub(" ", value).strip()
+        return value.casefold() if casefold else value
+    if isinstance(value, dict):
+        return {str(k): _normalize(v, casefold) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v, casefold) for v in value]
+    if hasattr(value, "to_messages"):  # prompt values
+        return _normalize(value.to_messages(), casefold)
+    if hasattr(value, "type") and hasattr(value, "content"):  # messages; their ids differ per run
+        return {
+            "type": value.type,
+            "content": _normalize(value.content, casefold),
+            "tool_calls": [{"name": c["name"], "args": c["args"]} for c in getattr(value, "tool_calls", None) or []],
+            "tool_call_id": getattr(value, "tool_call_id", None),
+            "name": getattr(value, "name", None),
+        }
+    return value
+
+
+def make_key(value: Any, casefold: bool = False) -> str:
+    return json.dumps(_normalize(value, casefold), sort_keys=True, default=repr, ensure_ascii=False)
+
+
+def _tool_call(value: Any) -> bool:
+    return isinstance(value, dict) and value.get("type") == "tool_call"
+
+
+# ---------------------------------------------------
+# Wrapper for tools and chat models (any Runnable); batch/abatch use
+# invoke/ainvoke, so identical inputs within a batch are coalesced too.
+# Streaming is passed straight through.
+# ---------------------------------------------------
+class SingleFlightRunnable(Runnable):
+    """invoke/ainvoke go through a SingleFlight; everything else passes through.
+
+    Coalesced callers share the leader's result object (and its config:
+    their own callbacks don't see the shared call). A tool invoked with a
+    ToolCall gets back a ToolMessage carrying its own tool_call_id.
+    """
+
+    def __init__(self, runnable, casefold: Optional[bool] = None, flight: Optional[SingleFlight] = None):
+        self.runnable = runnable
+        # Search queries differ only in case/spacing; prompts to a model may not
+        self.casefold = hasattr(runnable, "args_schema") if casefold is None else casefold
+        self.flight = flight or SingleFlight()
+
+    def __getattr__(self, name: str):
+        # Tool attributes (name, description, args, ...) pass through
+        return getattr(self.runnable, name)
+
+    def _key(self, input: Any, kwargs: dict) -> str:
+        if _tool_call(input):
+            input = {"tool": input.get("name"), "args": input.get("args")}
+        return make_key([input, kwargs], self.casefold)
+
+    @staticmethod
+    def _own(input: Any, result: Any) -> Any:
+        if _tool_call(input) and getattr(result, "tool_call_id", input.get("id")) != input.get("id"):
+            return result.model_copy(update={"tool_call_id": input.get("id")})
+        return result
+
+    def invoke(self, input: Any, config=None, **kwargs) -> Any:
+        result = self.flight.do(self._key(input, kwargs), lambda: self.runnable.invoke(input, config, **kwargs))
+        return self._own(input, result)
+
+    async def ainvoke(self, input: Any, config=None, **kwargs) -> Any:
+        result = await self.flight.ado(self._key(input, kwargs), lambda: self.runnable.ainvoke(input, config, **kwargs))
+        return self._own(input, result)
+
+    def stream(self, input: Any, config=None, **kwargs) -> Iterator:
+        return self.runnable.stream(input, config, **kwargs)
+
+    async def astream(self, input: Any, config=None, **kwargs) -> AsyncIterator:
+        async for chunk in self.runnable.astream(input, config, **kwargs):
+            yield chunk
+
+    def stats(self) -> Dict[str, Any]:
+        return self.flight.stats()
+
+
+def single_flight(runnable, casefold: Optional[bool] = None) -> SingleFlightRunnable:
+    """Coalesce identical concurrent invoke/ainvoke calls of a tool or chat model."""
+    return SingleFlightRunnable(runnable, casefold)
+
+
+# ---------------------------------------------------
+# Benchmark: python singleFlight.py
+# 64 threads and 64 asyncio tasks ask about 4 trending topics at the same
+# moment (in varying case/spacing) against a fake search with 0.2 s latency.
+# ---------------------------------------------------
+if __name__ == "__main__":
+    import random
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    from langchain_core.tools import tool
+
+    upstream = {"calls": 0}
+    lock = threading.Lock()
+
+    @tool
+    def search(query: str) -> str:
+        """Fake web search."""
+        with lock:
+            upstream["calls"] += 1
+        time.sleep(0.2)
+        if "outage" in query.lower():
+            raise ConnectionError("search backend down")
+        return f"results for {query.lower()}"
+
+    topics = ["Hania Amir new drama", "alia bhatt movie", "PSL final score", "cloud outage today"]
+    rng = random.Random(0)
+    queries = [rng.choice([t, t.upper(), "  " + t, t.replace(" ", "  ")]) for t in topics * 16]
+
+    def run_threads(target):
+        def call(query):
+            try:
+                return target.invoke(query)
+            except ConnectionError as e:
+                return repr(e)
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            return list(pool.map(call, queries))
+
+    async def run_tasks(target):
+        async def call(query):
+            try:
+                return await target.ainvoke(query)
+            except ConnectionError as e:
+                return repr(e)
+        return await asyncio.gather(*(call(q) for q in queries))
+
+    for label, make in [("plain tool", lambda: search), ("single_flight", lambda: single_flight(search))]:
+        for mode in ("threads", "asyncio"):
+            target = make()
+            upstream["calls"] = 0
+            start = time.perf_counter()
+            results = run_threads(target) if mode == "threads" else asyncio.run(run_tasks(target))
+            elapsed = time.perf_counter() - start
+            errors = sum("ConnectionError" in r for r in results)
+            extra = f"  {target.stats()}" if hasattr(target, "stats") else ""
+            print(f"{label:<14} {mode:<8} {len(results)} calls -> {upstream['calls']:3d} upstream, "
+                  f"{errors} errors, {elapsed:.2f}s{extra}")
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The tutorial folders use flat imports (`from Chains import ...`) and the
+# shared helpers live at the repo root: put all of them on the path, once
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ("StructuredOutput", "ReflextionAgent", "ReflectionAgent", ""):
+    path = os.path.join(ROOT, folder).rstrip(os.sep)
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+from langchain_core.runnables import RunnableLambda
+
+from batchRunner import completed_ids, read_questions, run_batch
+
+
+def echo_runnable(calls, fail=()):
+    """Runnable stand-in that upper-cases the question and fails on the ones in `fail`."""
+
+    async def answer(question):
+        calls.append(question)
+        if question in fail:
+            raise RuntimeError(f"model error on {question}")
+        await asyncio.sleep(0.01)
+        return question.upper()
+
+    return RunnableLambda(lambda question: question, afunc=answer)
+
+
+def write_questions(path, questions):
+    path.write_text("".join(json.dumps(q) + "\n" for q in questions), encoding="utf-8")
+    return str(path)
+
+
+def read_results(path):
+    return [json.loads(line) for line in open(path, encoding="utf-8")]
+
+
+def test_ids_default_to_line_numbers(tmp_path):
+    path = tmp_path / "questions.jsonl"
+    path.write_text('{"question": "a"}\n\n{"id": "x", "question": "b"}\n', encoding="utf-8")
+    assert [r["id"] for r in read_questions(str(path))] == ["1", "x"]
+
+
+def test_every_question_gets_a_result(tmp_path):
+    questions = write_questions(tmp_path / "q.jsonl", [{"id": f"q{i}", "question": f"question {i}"} for i in range(10)])
+    output = str(tmp_path / "out.jsonl")
+    stats = asyncio.run(run_batch(echo_runnable([]), read_questions(questions), output, concurrency=3))
+
+    assert stats == {"ok": 10, "failed": 0, "skipped": 0}
+    results = {r["id"]: r["output"] for r in read_results(output)}
+    assert results == {f"q{i}": f"QUESTION {i}" for i in range(10)}
+
+
+def test_rerun_skips_completed_ids_and_retries_failures(tmp_path):
+    questions = write_questions(tmp_path / "q.jsonl", [{"id": f"q{i}", "question": f"question {i}"} for i in range(5)])
+    output = str(tmp_path / "out.jsonl")
+
+    first_calls = []
+    stats = asyncio.run(run_batch(echo_runnable(first_calls, fail={"question 3"}), read_questions(questions), output))
+    assert stats == {"ok": 4, "failed": 1, "skipped": 0}
+    assert completed_ids(output) == {"q0", "q1", "q2", "q4"}
+
+    second_calls = []
+    stats = asyncio.run(run_batch(echo_runnable(second_calls), read_questions(questions), output))
+    assert stats == {"ok": 1, "failed": 0, "skipped": 4}
+    assert second_calls == ["question 3"]
+    assert completed_ids(output) == {f"q{i}" for i in range(5)}
+
+
+def test_half_written_last_line_is_ignored(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text('{"id": "q0", "output": "A"}\n{"id": "q1", "outp', encoding="utf-8")
+    assert completed_ids(str(output)) == {"q0"}
+
+
+def test_resume_after_a_half_written_line_keeps_new_results_intact(tmp_path):
+    questions = write_questions(tmp_path / "q.jsonl", [{"id": "q0", "question": "a"}, {"id": "q1", "question": "b"}])
+    output = tmp_path / "out.jsonl"
+    output.write_text('{"id": "q0", "output": "A"}\n{"id": "q1", "outp', encoding="utf-8")
+
+    calls = []
+    asyncio.run(run_batch(echo_runnable(calls), read_questions(questions), str(output)))
+    assert calls == ["b"]
+    assert completed_ids(str(output)) == {"q0", "q1"}
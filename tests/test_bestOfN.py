@@ -0,0 +1,85 @@
+import itertools
+import threading
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+from bestOfN import build_best_of_n_graph, parse_score
+from fakeModels import FakeToolCallingChatModel
+from stopping import NO_CHANGES
+
+QUESTION = HumanMessage(content="How Has Hania Amir Gotten Famous?")
+SCORES = {0: 4, 1: 9, 2: 6, 3: 7, 4: 2, 5: 5}
+as_prompt = RunnableLambda(lambda inputs: inputs["messages"])
+
+
+class PeakTracker:
+    """Counts how many fake LLM calls are in flight at once."""
+
+    def __init__(self):
+        self.current = self.peak = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.current -= 1
+
+
+def fake_models(delay=0.05):
+    tracker = PeakTracker()
+    numbers = itertools.count()
+
+    def draft(messages):
+        with tracker:
+            time.sleep(delay)
+            return AIMessage(content=f"tweet {next(numbers)}")
+
+    def score(messages):
+        with tracker:
+            time.sleep(delay)
+            candidate = int(messages[-1].content.split()[-1])
+            return AIMessage(content=f"{NO_CHANGES}\nScore: {SCORES[candidate]}/10")
+
+    generation = FakeToolCallingChatModel(responses=[draft])
+    scoring = FakeToolCallingChatModel(responses=[score])
+    return generation, scoring, tracker
+
+
+def run(n, max_concurrency):
+    generation, scoring, tracker = fake_models()
+    app = build_best_of_n_graph(as_prompt | generation, as_prompt | scoring, n=n, max_concurrency=max_concurrency).compile()
+    return app.invoke(QUESTION), generation, scoring, tracker
+
+
+def test_drafts_and_scores_n_candidates():
+    messages, generation, scoring, _ = run(n=6, max_concurrency=6)
+    assert generation.calls == 6
+    assert scoring.calls == 6
+    assert len(messages) == 2
+
+
+def test_keeps_the_best_scored_candidate():
+    messages, *_ = run(n=6, max_concurrency=6)
+    assert isinstance(messages[-1], AIMessage)
+    assert messages[-1].content == "tweet 1"
+
+
+def test_respects_max_concurrency():
+    _, _, _, tracker = run(n=6, max_concurrency=2)
+    assert tracker.peak == 2
+
+    _, _, _, tracker = run(n=6, max_concurrency=6)
+    assert tracker.peak > 2
+
+
+def test_parse_score():
+    assert parse_score("Score: 7") == 7.0
+    assert parse_score("score = 7.5/10") == 7.5
+    assert parse_score("Score: 3\nActually, Score: 8/10") == 8.0
+    assert parse_score("no score here") == -1.0
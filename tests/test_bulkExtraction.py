@@ -0,0 +1,97 @@
+import asyncio
+import json
+from collections import Counter
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+import bulkExtraction
+from bulkExtraction import PROMPT, extract, extract_to_file, fake_structured_llm
+from Method1 import Celebrity
+
+
+class FlakyExtractor:
+    """structured_llm stand-in: names in `flaky` fail their first attempt, names in `broken` always fail.
+    Tracks attempts per name and the peak number of calls in flight."""
+
+    def __init__(self, flaky=(), broken=(), latency=0.01):
+        self.flaky, self.broken, self.latency = set(flaky), set(broken), latency
+        self.attempts = Counter()
+        self.in_flight = self.peak = 0
+        self.runnable = RunnableLambda(lambda prompt: None, afunc=self._answer)
+
+    async def _answer(self, prompt):
+        name = prompt.replace(PROMPT.format(name=""), "")
+        self.attempts[name] += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if name in self.broken or (name in self.flaky and self.attempts[name] == 1):
+            raise ValueError(f"bad output for {name}")
+        return Celebrity(name=name, country="Pakistan", insta_followers=1)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(bulkExtraction, "RETRY_BACKOFF", 0.0)
+
+
+def collect(names, structured_llm, **kwargs):
+    async def run():
+        records, errors = [], []
+        async for chunk_records, chunk_errors in extract(names, structured_llm, **kwargs):
+            records += chunk_records
+            errors += chunk_errors
+        return records, errors
+
+    return asyncio.run(run())
+
+
+NAMES = [f"Celebrity {i}" for i in range(20)]
+
+
+def test_flaky_names_are_retried_in_a_later_chunk():
+    extractor = FlakyExtractor(flaky={"Celebrity 0", "Celebrity 19"})
+    records, errors = collect(NAMES, extractor.runnable, chunk_size=5)
+
+    assert errors == []
+    assert sorted(name for name, _ in records) == sorted(NAMES)
+    assert extractor.attempts["Celebrity 0"] == 2 and extractor.attempts["Celebrity 19"] == 2
+    assert extractor.attempts["Celebrity 5"] == 1
+
+
+def test_names_that_never_succeed_become_errors_after_the_retries():
+    extractor = FlakyExtractor(broken={"Celebrity 3"})
+    records, errors = collect(NAMES, extractor.runnable, chunk_size=5, max_retries=2)
+
+    assert len(records) == 19
+    assert [name for name, _ in errors] == ["Celebrity 3"]
+    assert "bad output for Celebrity 3" in errors[0][1]
+    assert extractor.attempts["Celebrity 3"] == 3
+
+
+def test_chunks_in_flight_share_one_concurrency_budget():
+    extractor = FlakyExtractor(latency=0.02)
+    collect(NAMES, extractor.runnable, chunk_size=4, max_concurrency=4)
+    assert extractor.peak <= 4
+
+
+def test_extract_to_file_writes_records_and_errors(tmp_path):
+    output = str(tmp_path / "celebrities.jsonl")
+    extractor = FlakyExtractor(flaky={"Celebrity 1"}, broken={"Celebrity 2"})
+    stats = asyncio.run(extract_to_file(NAMES[:6], output, extractor.runnable, chunk_size=3, max_retries=1))
+
+    assert stats["ok"] == 5 and stats["failed"] == 1
+    written = [json.loads(line)["name"] for line in open(output, encoding="utf-8")]
+    assert sorted(written) == sorted(n for n in NAMES[:6] if n != "Celebrity 2")
+    errors = [json.loads(line) for line in open(output + ".errors.jsonl", encoding="utf-8")]
+    assert [e["name"] for e in errors] == ["Celebrity 2"]
+
+
+def test_fake_model_invalid_answers_pass_on_the_retry():
+    records, errors = collect(NAMES, fake_structured_llm(latency=0.0, flaky=0.5))
+    assert errors == []
+    assert sorted(name for name, _ in records) == sorted(NAMES)
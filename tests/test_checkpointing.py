@@ -0,0 +1,84 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, MessageGraph
+
+from checkpointing import MeasuredCheckpointer, run_or_resume
+from deltaCheckpoints import DELTA_KEY, DeltaCheckpointer
+
+
+def counting_graph(replies=3):
+    def reply(state):
+        return AIMessage(content=f"reply {len(state) // 2}")
+
+    def more(state):
+        return "reply" if len(state) < 2 * replies else END
+
+    def ask(state):
+        return HumanMessage(content="again")
+
+    graph = MessageGraph()
+    graph.add_node("reply", reply)
+    graph.add_node("ask", ask)
+    graph.set_entry_point("reply")
+    graph.add_conditional_edges("reply", more, {"reply": "ask", END: END})
+    graph.add_edge("ask", "reply")
+    return graph
+
+
+def stored_messages(saver, thread_id):
+    tuple_ = saver.saver.get_tuple({"configurable": {"thread_id": thread_id}})
+    return tuple_.checkpoint["channel_values"]["__root__"]
+
+
+def test_run_or_resume_keeps_configurable_entries():
+    seen = {}
+
+    def node(state, config):
+        seen.update(config["configurable"])
+        return AIMessage(content="done")
+
+    graph = MessageGraph()
+    graph.add_node("node", node)
+    graph.set_entry_point("node")
+    graph.set_finish_point("node")
+    app = graph.compile(checkpointer=InMemorySaver())
+
+    run_or_resume(app, HumanMessage(content="hi"), "thread-1", {"configurable": {"deadline": "soon"}})
+    assert seen["thread_id"] == "thread-1"
+    assert seen["deadline"] == "soon"
+
+
+def test_delta_checkpointer_round_trips_sync_and_async():
+    sync_saver = DeltaCheckpointer(InMemorySaver())
+    expected = counting_graph().compile(checkpointer=sync_saver).invoke(
+        HumanMessage(content="hi"), {"configurable": {"thread_id": "t"}}
+    )
+    assert DELTA_KEY in stored_messages(sync_saver, "t")
+
+    async_saver = MeasuredCheckpointer(DeltaCheckpointer(InMemorySaver()))
+    app = counting_graph().compile(checkpointer=async_saver)
+    config = {"configurable": {"thread_id": "t"}}
+    result = asyncio.run(app.ainvoke(HumanMessage(content="hi"), config))
+    assert [m.content for m in result] == [m.content for m in expected]
+    assert async_saver.stats()["writes"] > 0
+
+    # Read back through a cold wrapper, so the deltas are decoded from storage
+    cold = DeltaCheckpointer(async_saver.saver.saver)
+    state = asyncio.run(cold.aget_tuple(config))
+    assert [m.content for m in state.checkpoint["channel_values"]["__root__"]] == [m.content for m in expected]
+
+    async def history():
+        return [t async for t in cold.alist(config)]
+
+    assert len(asyncio.run(history())) > 1
+
+
+def test_non_string_thread_ids_share_one_cache_entry():
+    saver = DeltaCheckpointer(InMemorySaver())
+    counting_graph().compile(checkpointer=saver).invoke(HumanMessage(content="hi"), {"configurable": {"thread_id": 7}})
+    cached = set(saver._lists)
+    saver.get_tuple({"configurable": {"thread_id": 7}})
+    assert set(saver._lists) == cached
+    assert {key[0] for key in cached} == {"7"}
@@ -0,0 +1,39 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+import contextCompaction
+from contextCompaction import SUPERSEDED, count_tokens, drop_superseded_answers
+
+
+def draft(name, call_id, answer):
+    args = {"answer": answer, "search_queries": ["q"], "reflection": {"missing": "", "superfluous": ""}}
+    if name == "ReviseAnswer":
+        args["references"] = ["https://example.com"]
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": call_id}])
+
+
+def test_count_tokens_falls_back_without_downloading(monkeypatch, tmp_path):
+    import tiktoken
+
+    def no_network(name):
+        raise AssertionError("count_tokens must not fetch the encoding")
+
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))  # empty cache
+    monkeypatch.setattr(contextCompaction, "_encoding", None)
+    monkeypatch.setattr(tiktoken, "get_encoding", no_network)
+    assert count_tokens("Small businesses, meet AI.") == 6
+
+
+def test_superseded_drafts_keep_their_own_schema():
+    messages = [
+        HumanMessage(content="question"),
+        draft("AnswerQuestion", "call_1", "first draft"),
+        ToolMessage(content="{}", tool_call_id="call_1"),
+        draft("ReviseAnswer", "call_2", "second draft"),
+        ToolMessage(content="{}", tool_call_id="call_2"),
+        draft("ReviseAnswer", "call_3", "latest draft"),
+    ]
+    compacted = drop_superseded_answers(messages)
+    first, second, latest = (compacted[i].tool_calls[0]["args"] for i in (1, 3, 5))
+    assert first["answer"] == SUPERSEDED and "references" not in first
+    assert second["answer"] == SUPERSEDED and second["references"] == []
+    assert latest["answer"] == "latest draft" and latest["references"] == ["https://example.com"]
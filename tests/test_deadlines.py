@@ -0,0 +1,65 @@
+import time
+
+from langchain_core.runnables import RunnableLambda
+
+from deadlines import Deadline, NodeTimings, get_deadline, with_deadline
+from fakeModels import FakeToolCallingChatModel, tool_call_message
+from Graph import build_graph, initial_state
+
+
+def test_fresh_process_refuses_a_round_that_cannot_fit():
+    deadline = Deadline(0.5, timings=NodeTimings())
+    time.sleep(0.2)
+    # Nothing measured yet: each node is assumed to take as long as the run so far (0.2 s)
+    assert deadline.estimate("revisor") >= 0.2
+    assert not deadline.fits(["execute_tools", "revisor"])
+
+
+def test_fresh_process_allows_a_round_that_fits():
+    deadline = Deadline(10.0, timings=NodeTimings())
+    assert deadline.fits(["execute_tools", "revisor"])
+
+
+def test_unmeasured_node_is_estimated_from_the_slowest_node_of_the_run():
+    deadline = Deadline(9.0, timings=NodeTimings())
+    deadline.record("draft", 4.0)
+    deadline.record("search", 1.0)
+    assert deadline.estimate("revisor") == 4.0
+    # 2 x 4 s, padded by the safety factor, is more than the 9 s left
+    assert not deadline.fits(["execute_tools", "revisor"])
+    assert deadline.fits(["revisor"])
+
+
+def test_configured_defaults_and_measured_averages_come_first():
+    timings = NodeTimings(initial={"execute_tools": 0.5})
+    deadline = Deadline(10.0, timings=timings, defaults={"revisor": 2.0, "execute_tools": 99.0})
+    deadline.record("draft", 6.0)
+    assert deadline.estimate("execute_tools") == 0.5
+    assert deadline.estimate("revisor") == 2.0
+    assert deadline.fits(["execute_tools", "revisor"])
+
+
+def test_with_deadline_passes_defaults_through():
+    config = with_deadline(5, {"configurable": {"thread_id": "t"}}, defaults={"revisor": 1.5})
+    assert config["configurable"]["thread_id"] == "t"
+    assert get_deadline(config).estimate("revisor") == 1.5
+
+
+def test_cold_reflexion_run_stops_after_a_slow_draft():
+    answer = tool_call_message("AnswerQuestion", {
+        "answer": "Small businesses use AI for marketing.",
+        "search_queries": ["ai for small business"],
+        "reflection": {"missing": "numbers", "superfluous": ""},
+    })
+    draft_llm = FakeToolCallingChatModel(responses=[answer], latency=0.3)
+    revisor_llm = FakeToolCallingChatModel(responses=[answer])
+    as_prompt = RunnableLambda(lambda inputs: inputs["messages"])
+    app = build_graph(as_prompt | draft_llm, as_prompt | revisor_llm, search_tool=RunnableLambda(lambda q: [])).compile()
+
+    config = with_deadline(0.6, timings=NodeTimings())
+    state = app.invoke(initial_state("How can small businesses use AI?"), config)
+
+    assert state["stopped_early"] is True
+    assert state["iterations"] == 0
+    assert revisor_llm.calls == 0
+    assert get_deadline(config).stopped_early
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import threading
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from executeTools import aexecute_tools, arun_search_queries, execute_tools, plan_searches, run_search_queries
+from toolPayload import decode_tool_payload, expand_tool_payloads
+
+
+class FakeSearch:
+    """Search tool stand-in: per-query latency, errors for queries containing "down"."""
+
+    def __init__(self, delays=None, default_delay=0.0):
+        self.delays = delays or {}
+        self.default_delay = default_delay
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def _result(self, query):
+        with self._lock:
+            self.queries.append(query)
+        if "down" in query:
+            raise ConnectionError(f"search backend down: {query}")
+        slug = query.lower().replace(" ", "-")
+        return [{"title": query, "url": f"https://example.com/{slug}", "content": f"about {query}"}]
+
+    def invoke(self, query, config=None):
+        time.sleep(self.delays.get(query, self.default_delay))
+        return self._result(query)
+
+    async def ainvoke(self, query, config=None):
+        await asyncio.sleep(self.delays.get(query, self.default_delay))
+        return self._result(query)
+
+
+def answer_call(queries, call_id="call_1", name="AnswerQuestion"):
+    return AIMessage(content="", tool_calls=[{
+        "name": name,
+        "args": {"answer": "", "search_queries": queries, "reflection": {"missing": "", "superfluous": ""}},
+        "id": call_id,
+    }])
+
+
+QUERIES = ["slow query", "medium query", "fast query"]
+DELAYS = {"slow query": 0.3, "medium query": 0.15, "fast query": 0.0}
+
+
+def test_results_keep_query_order_when_searches_finish_out_of_order():
+    results = run_search_queries(QUERIES, FakeSearch(DELAYS))
+    assert [hits[0]["title"] for hits in results] == QUERIES
+
+
+def test_async_results_keep_query_order():
+    results = asyncio.run(arun_search_queries(QUERIES, FakeSearch(DELAYS)))
+    assert [hits[0]["title"] for hits in results] == QUERIES
+
+
+def test_searches_run_concurrently():
+    start = time.monotonic()
+    run_search_queries(QUERIES, FakeSearch(DELAYS))
+    assert time.monotonic() - start < sum(DELAYS.values())
+
+
+def test_slow_query_times_out_without_holding_up_the_others():
+    statuses = {}
+    start = time.monotonic()
+    results = run_search_queries(
+        ["hung query", "fast query"], FakeSearch({"hung query": 2.0}), timeout=0.2,
+        progress=lambda query, status: statuses.setdefault(query, status),
+    )
+    assert time.monotonic() - start < 1.0
+    assert "TimeoutError" in results[0] and "hung query" in results[0]
+    assert results[1][0]["title"] == "fast query"
+    assert statuses == {"hung query": "timeout", "fast query": "done"}
+
+
+def test_async_slow_query_times_out():
+    results = asyncio.run(arun_search_queries(["hung query", "fast query"], FakeSearch({"hung query": 2.0}), timeout=0.2))
+    assert "TimeoutError" in results[0]
+    assert results[1][0]["title"] == "fast query"
+
+
+def test_search_errors_are_passed_through_as_strings():
+    statuses = []
+    results = run_search_queries(
+        ["backend down", "fast query"], FakeSearch(),
+        progress=lambda query, status: statuses.append((query, status)),
+    )
+    assert results[0] == repr(ConnectionError("search backend down: backend down"))
+    assert results[1][0]["title"] == "fast query"
+    assert ("backend down", "failed") in statuses
+
+
+def test_async_search_errors_are_passed_through_as_strings():
+    results = asyncio.run(arun_search_queries(["backend down"], FakeSearch()))
+    assert results == [repr(ConnectionError("search backend down: backend down"))]
+
+
+def test_failed_search_lands_in_the_tool_message():
+    state = [HumanMessage(content="q"), answer_call(["backend down", "fast query"])]
+    [message] = execute_tools(state, tool=FakeSearch())
+    queries = decode_tool_payload(message.content)["queries"]
+    assert queries["backend down"].startswith("ConnectionError(")
+    assert isinstance(queries["fast query"], list)
+
+
+def prior_run_state():
+    # One earlier execute_tools pass that answered "AI tools for small business"
+    first = [HumanMessage(content="How can small businesses use AI?"), answer_call(["AI tools for small business"], "call_0")]
+    return first + execute_tools(first, tool=FakeSearch())
+
+
+def test_plan_reuses_earlier_results_and_shares_duplicates_within_a_batch():
+    state = prior_run_state()
+    queries = ["ai tools for small businesses", "AI in small business marketing", "AI small business marketing"]
+    to_search, plan = plan_searches(state, queries)
+    assert to_search == ["AI in small business marketing"]
+    assert plan[0][0] == "reuse"
+    assert plan[1] == ("search", 0)
+    assert plan[2] == ("shared", 0)
+
+
+def test_execute_tools_searches_each_distinct_query_once():
+    state = prior_run_state()
+    tool = FakeSearch()
+    calls = AIMessage(content="", tool_calls=[
+        answer_call(["ai tools for small businesses", "AI in small business marketing"], "call_a", "ReviseAnswer").tool_calls[0],
+        answer_call(["AI small business marketing"], "call_b", "ReviseAnswer").tool_calls[0],
+    ])
+    messages = execute_tools(state + [calls], tool=tool)
+
+    assert tool.queries == ["AI in small business marketing"]
+    assert [m.tool_call_id for m in messages] == ["call_a", "call_b"]
+    assert [m.artifact["skipped_queries"] for m in messages] == [1, 1]
+    expanded = expand_tool_payloads(state + [calls] + messages)
+    reused = expanded["ai tools for small businesses"]
+    assert reused == expanded["AI tools for small business"]
+    assert reused[0]["url"] == "https://example.com/ai-tools-for-small-business"
+    assert expanded["AI small business marketing"] == expanded["AI in small business marketing"]
+
+
+def test_async_node_matches_sync_node():
+    state = prior_run_state() + [answer_call(["ai tools for small businesses", "fast query"], "call_a")]
+    sync_messages = execute_tools(state, tool=FakeSearch())
+    async_messages = asyncio.run(aexecute_tools(state, tool=FakeSearch()))
+    assert [json.loads(m.content) for m in sync_messages] == [json.loads(m.content) for m in async_messages]
@@ -0,0 +1,166 @@
+import asyncio
+import importlib
+import operator
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.errors import InvalidUpdateError
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Command
+
+from graphOptimizer import compile_graph, is_identity, optimize_graph
+
+
+def run_both(graph, inputs, optimized=None):
+    """Final states of the plain and the optimized graph for the same inputs."""
+    optimized = optimized or optimize_graph(graph)[0]
+    return graph.compile().invoke(inputs), optimized.compile().invoke(inputs)
+
+
+# ---------------------------------------------------
+# The tutorial graphs
+# ---------------------------------------------------
+NUMBERS = [(30, 5), (-4, 9), (0, 0)]
+TUTORIALS = {
+    "MultiNodes": [{"name": name, "age": age} for name, age in [("hamza", "12"), ("ali", "30"), ("", "0")]],
+    "condtionalAgent": [{"number1": a, "number2": b, "operation": op} for a, b in NUMBERS for op in "+-"],
+    "conditionalExcercise": [{"number1": a, "number2": b, "number3": 7, "number4": 2, "operation": op, "operation2": op2}
+                             for a, b in NUMBERS for op in "+-" for op2 in "*/"],
+}
+
+
+@pytest.mark.parametrize("module", list(TUTORIALS))
+def test_tutorial_graphs_give_the_same_final_state(module):
+    graph = importlib.import_module(module).graph
+    optimized, report = optimize_graph(graph)
+    assert len(optimized.nodes) < len(graph.nodes)
+    assert report["folded"] or report["fused"]
+    for inputs in TUTORIALS[module]:
+        plain, fast = run_both(graph, inputs, optimized)
+        assert plain == fast, inputs
+
+
+def test_router_hub_is_folded_into_the_edge_before_it():
+    graph = importlib.import_module("condtionalAgent").graph
+    optimized, report = optimize_graph(graph)
+    assert report["folded"] == ["router"]
+    assert "router" not in optimized.nodes and "router" in graph.nodes
+
+
+# ---------------------------------------------------
+# Reducers, full-state returns, Command lists, async nodes
+# ---------------------------------------------------
+class State(TypedDict):
+    n: int
+    log: Annotated[list, operator.add]
+    total: Annotated[int, operator.add]
+
+
+def bump(state: State):
+    state["n"] += 1  # mutates its input and returns the whole state
+    return state
+
+
+def note(state: State):
+    return {"log": [f"b{state['n']}"], "total": state["total"] + 1}
+
+
+def commands(state: State):
+    return [Command(update={"log": ["c"]}), Command(update={"n": state["n"] * 10})]
+
+
+async def count(state: State):
+    return {"log": [len(state["log"])]}
+
+
+def loop_or_stop(state: State) -> str:
+    return "stop" if state["n"] > 50 else "again"
+
+
+def reducer_graph() -> StateGraph:
+    graph = StateGraph(State)
+    for name, fn in [("a", bump), ("b", note), ("c", commands), ("d", count), ("hub", lambda state: state)]:
+        graph.add_node(name, fn)
+    graph.add_edge(START, "a")
+    graph.add_edge("a", "b")
+    graph.add_edge("b", "c")
+    graph.add_edge("c", "d")
+    graph.add_edge("d", "hub")
+    graph.add_conditional_edges("hub", loop_or_stop, {"stop": END, "again": "a"})
+    return graph
+
+
+@pytest.mark.parametrize("inputs", [{"n": 1, "log": ["s"], "total": 2}, {"n": 9, "log": [], "total": 0}])
+def test_reducer_chain_with_async_node_gives_the_same_final_state(inputs):
+    graph = reducer_graph()
+    optimized, report = optimize_graph(graph)
+    assert report["fused"] == {"a+b+c+d+hub": ["a", "b", "c", "d", "hub"]}
+
+    plain = asyncio.run(graph.compile().ainvoke(dict(inputs)))
+    fast = asyncio.run(optimized.compile().ainvoke(dict(inputs)))
+    assert plain == fast
+
+
+def test_identity_node_is_not_folded_when_the_state_has_reducers():
+    _, report = optimize_graph(reducer_graph())
+    assert "hub" not in report["folded"]
+    assert "reducers" in report["skipped"]["hub"]
+
+
+def test_fused_chain_writes_fewer_checkpoints():
+    inputs = {"name": "hamza", "age": "12"}
+    graph = importlib.import_module("MultiNodes").graph
+    steps = []
+    for optimize in (False, True):
+        app = compile_graph(graph, optimize=optimize, checkpointer=InMemorySaver())
+        config = {"configurable": {"thread_id": "t"}}
+        app.invoke(inputs, config)
+        steps.append(len(list(app.get_state_history(config))))
+    assert steps[1] < steps[0]
+
+
+# ---------------------------------------------------
+# What the optimizer leaves alone
+# ---------------------------------------------------
+def test_interrupt_nodes_are_kept_out_of_fused_chains():
+    app = compile_graph(reducer_graph(), optimize=True, interrupt_before=["c"], checkpointer=InMemorySaver())
+    fused = app.optimization_report["fused"]
+    assert fused == {"a+b": ["a", "b"], "d+hub": ["d", "hub"]}
+    assert "c" in app.nodes
+
+
+def test_fan_out_graph_is_skipped_whole():
+    graph = StateGraph(State)
+    graph.add_node("a", note)
+    graph.add_node("b", note)
+    graph.add_edge(START, "a")
+    graph.add_edge(START, "b")
+    optimized, report = optimize_graph(graph)
+    assert optimized is graph
+    assert "fan-out" in report["skipped"]["*"]
+
+
+def test_command_goto_inside_a_fused_chain_is_an_error():
+    graph = StateGraph(State)
+    graph.add_node("e", lambda state: Command(goto="f", update={"n": 1}))
+    graph.add_node("f", lambda state: {"n": 2})
+    graph.add_edge(START, "e")
+    graph.add_edge("e", "f")
+    graph.add_edge("f", END)
+    optimized, _ = optimize_graph(graph)
+    with pytest.raises(InvalidUpdateError, match="keep=\\['e'\\]"):
+        optimized.compile().invoke({"n": 0})
+
+
+def test_the_original_graph_is_left_untouched():
+    graph = reducer_graph()
+    nodes, edges = list(graph.nodes), set(graph.edges)
+    optimize_graph(graph)
+    assert list(graph.nodes) == nodes and graph.edges == edges
+
+
+def test_identity_detection():
+    assert is_identity(StateGraph(State).add_node("x", lambda s: s).nodes["x"].runnable)
+    assert not is_identity(StateGraph(State).add_node("x", lambda s: {"n": 1}).nodes["x"].runnable)
+    assert not is_identity(StateGraph(State).add_node("x", bump).nodes["x"].runnable)
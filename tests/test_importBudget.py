@@ -0,0 +1,16 @@
+import os
+
+import pytest
+
+from importBudget import DEFAULT_BUDGET_MS, DEFAULT_REPEAT, MODULES, best_of
+
+# IMPORT_BUDGET_MS / IMPORT_BUDGET_REPEAT override the defaults (e.g. on a slow CI box)
+BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS))
+REPEAT = int(os.getenv("IMPORT_BUDGET_REPEAT", DEFAULT_REPEAT))
+
+
+@pytest.mark.parametrize("folder, module", MODULES, ids=[module for _, module in MODULES])
+def test_import_stays_within_budget(folder, module):
+    ms, leaked = best_of(folder, module, REPEAT)
+    assert not leaked, f"importing {module} pulls in {', '.join(leaked)}; build those in the factories"
+    assert ms <= BUDGET_MS, f"importing {module} takes {ms:.0f} ms, budget is {BUDGET_MS:.0f} ms"
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from fakeModels import FakeToolCallingChatModel
+from llmCache import SQLiteLLMCache
+
+
+def counting_model(cache):
+    """Fake chat model whose replies number its real (uncached) calls."""
+    model = FakeToolCallingChatModel(responses=[], cache=cache)
+    model.responses = [lambda messages: AIMessage(content=f"reply {model.calls}")]
+    return model
+
+
+PROMPT = [SystemMessage(content="You are a tweet writer."), HumanMessage(content="Write about Hania Amir")]
+
+
+def test_second_identical_call_is_served_from_the_cache(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "llm.sqlite"))
+    model = counting_model(cache)
+
+    first = model.invoke(PROMPT)
+    second = model.invoke(PROMPT)
+
+    assert model.calls == 1
+    assert first.content == second.content == "reply 1"
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_message_ids_do_not_affect_the_key(tmp_path):
+    model = counting_model(SQLiteLLMCache(str(tmp_path / "llm.sqlite")))
+    model.invoke([HumanMessage(content="hi", id="a")])
+    model.invoke([HumanMessage(content="hi", id="b")])
+    assert model.calls == 1
+
+
+def test_exact_mode_misses_on_whitespace_normalized_mode_hits(tmp_path):
+    exact = counting_model(SQLiteLLMCache(str(tmp_path / "exact.sqlite")))
+    exact.invoke([HumanMessage(content="Write about  Hania Amir")])
+    exact.invoke([HumanMessage(content="write about hania amir ")])
+    assert exact.calls == 2
+
+    normalized = counting_model(SQLiteLLMCache(str(tmp_path / "normalized.sqlite"), mode="normalized"))
+    normalized.invoke([HumanMessage(content="Write about  Hania Amir")])
+    normalized.invoke([HumanMessage(content="write about hania amir ")])
+    assert normalized.calls == 1
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "llm.sqlite"), max_entries=2)
+    model = counting_model(cache)
+    ask = lambda text: model.invoke([HumanMessage(content=text)])
+
+    ask("a")
+    time.sleep(0.01)
+    ask("b")
+    time.sleep(0.01)
+    ask("a")            # hit: a is now more recent than b
+    time.sleep(0.01)
+    ask("c")            # evicts b
+    assert model.calls == 3
+
+    ask("a")
+    ask("c")
+    assert model.calls == 3
+    ask("b")
+    assert model.calls == 4
+
+
+def test_entries_survive_a_new_cache_instance(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    counting_model(SQLiteLLMCache(path)).invoke(PROMPT)
+
+    model = counting_model(SQLiteLLMCache(path))
+    assert model.invoke(PROMPT).content == "reply 1"
+    assert model.calls == 0
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        SQLiteLLMCache(str(tmp_path / "llm.sqlite"), mode="fuzzy")
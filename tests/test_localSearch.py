@@ -0,0 +1,98 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from localSearch import LocalSearchIndex  # noqa: E402
+
+
+def doc(url, content):
+    return {"url": url, "title": url, "content": content}
+
+
+def urls(results):
+    return [r["url"] for r in results]
+
+
+def live_copies(index, url):
+    return sum(segment.find_url(url) is not None for segment in index.segments)
+
+
+def test_replaced_documents_do_not_push_idf_below_zero(tmp_path):
+    index = LocalSearchIndex(str(tmp_path / "index"))
+    index.add_documents([doc("u1", "alpha news"), doc("u2", "beta news")])
+    # Two replacements leave three alpha postings (two deleted) for two live documents
+    index.add_documents([doc("u1", "alpha news again")])
+    index.add_documents([doc("u1", "alpha news once more")])
+
+    assert index.documents == 2
+    assert urls(index.search("alpha")) == ["u1"]
+
+
+def test_same_url_twice_in_one_batch_keeps_one_live_copy(tmp_path):
+    index = LocalSearchIndex(str(tmp_path / "index"))
+    index.add_documents([doc("u1", "first draft"), doc("u1", "second draft"), doc("u2", "other")])
+    assert index.documents == 2
+    assert index.search("first") == []
+    assert urls(index.search("second")) == ["u1"]
+
+    # Replacing it later must find the live copy, not the deleted one
+    index.add_documents([doc("u1", "final version")])
+    assert index.documents == 2
+    assert index.search("second") == []
+    assert urls(index.search("final")) == ["u1"]
+    assert live_copies(index, "u1") == 1
+
+
+def test_compact_drops_deleted_documents_and_keeps_results(tmp_path):
+    index = LocalSearchIndex(str(tmp_path / "index"))
+    index.add_documents([doc(f"u{i}", f"story number{i} cricket") for i in range(5)])
+    index.add_documents([doc("u1", "story number1 updated hockey")])
+    index.add_documents([doc("u5", "story number5 hockey")])
+    before = {query: index.search(query) for query in ("cricket", "hockey", "number1")}
+
+    index.compact()
+
+    assert len(index.segments) == 1
+    assert not index.segments[0].deleted.any()
+    assert index.segments[0].size == index.documents == 6
+    for query, results in before.items():
+        assert urls(index.search(query)) == urls(results)
+    # Reopening the compacted index gives the same answers
+    reopened = LocalSearchIndex(str(tmp_path / "index"))
+    assert urls(reopened.search("hockey")) == urls(before["hockey"])
+
+
+def test_update_from_directory_tracks_added_changed_and_removed_files(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "drama.txt").write_text("Hania Amir stars in a new drama", encoding="utf-8")
+    (docs / "cricket.txt").write_text("PSL final score tonight", encoding="utf-8")
+    (docs / "news.jsonl").write_text("\n".join(json.dumps(r) for r in [
+        {"url": "https://example.com/a", "title": "A", "content": "alia bhatt movie release"},
+        {"url": "https://example.com/b", "title": "B", "content": "cloud outage today"},
+    ]), encoding="utf-8")
+    index = LocalSearchIndex.build(str(docs), str(tmp_path / "index"))
+    assert index.documents == 4
+    assert urls(index.search("outage")) == ["https://example.com/b"]
+
+    (docs / "news.jsonl").write_text(json.dumps(
+        {"url": "https://example.com/c", "title": "C", "content": "monsoon rains forecast"}), encoding="utf-8")
+    os.utime(docs / "news.jsonl", (1, 1))
+    (docs / "cricket.txt").unlink()
+    (docs / "weather.md").write_text("heatwave warning in Lahore", encoding="utf-8")
+
+    report = index.update_from_directory(str(docs))
+
+    assert report == {"added": 1, "changed": 1, "removed": 1, "unchanged": 1, "documents": 2}
+    assert index.documents == 3
+    assert index.search("outage") == [] and index.search("psl") == []
+    assert urls(index.search("monsoon")) == ["https://example.com/c"]
+    assert index.search("heatwave")[0]["url"].endswith("weather.md")
+    assert index.search("drama")[0]["url"].endswith("drama.txt")
+
+    # Nothing changed: nothing is re-read
+    again = LocalSearchIndex(str(tmp_path / "index")).update_from_directory(str(docs))
+    assert again == {"added": 0, "changed": 0, "removed": 0, "unchanged": 3, "documents": 0}
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from fakeModels import FakeToolCallingChatModel
+from langchain_core.messages import AIMessage
+from modelRegistry import ModelRegistry
+
+
+@pytest.fixture
+def stub():
+    """Local stand-in for the OpenAI chat completions API that records its traffic."""
+    pytest.importorskip("langchain_openai")
+    seen = {"in_flight": 0, "peak": 0, "requests": 0, "connections": set()}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            with lock:
+                seen["in_flight"] += 1
+                seen["requests"] += 1
+                seen["peak"] = max(seen["peak"], seen["in_flight"])
+                seen["connections"].add(self.client_address)
+            time.sleep(0.05)
+            with lock:
+                seen["in_flight"] -= 1
+            last = body.get("messages", [{}])[-1].get("content", "")
+            payload = json.dumps({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": f"echo: {last}"}}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    seen["base_url"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    yield seen
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def registry():
+    registry = ModelRegistry()
+    yield registry
+    registry.close()
+
+
+def client(registry, stub, **kwargs):
+    return registry.get("openai", "gpt-4o", base_url=stub["base_url"], api_key="stub", max_retries=0, **kwargs)
+
+
+def test_same_params_share_one_client(registry, stub):
+    llm = client(registry, stub, max_concurrency=4)
+    assert client(registry, stub) is llm
+    assert registry.get("openai", "gpt-4o", base_url=stub["base_url"], api_key="other", max_retries=0) is not llm
+
+
+def test_parallel_calls_respect_the_limit_and_reuse_connections(registry, stub):
+    llm = client(registry, stub, max_concurrency=4)
+    replies = llm.batch([f"question {i}" for i in range(16)], config={"max_concurrency": 16})
+
+    assert [reply.content for reply in replies] == [f"echo: question {i}" for i in range(16)]
+    assert stub["requests"] == 16
+    assert stub["peak"] <= 4
+    # 16 requests over at most 4 keep-alive connections
+    assert len(stub["connections"]) <= 4
+    assert registry.stats()["openai/gpt-4o"]["peak"] <= 4
+
+
+def test_async_calls_respect_the_limit_and_reuse_connections(registry, stub):
+    llm = client(registry, stub, max_concurrency=3)
+    replies = asyncio.run(llm.abatch([f"question {i}" for i in range(12)], config={"max_concurrency": 12}))
+
+    assert len(replies) == 12
+    assert stub["peak"] <= 3
+    assert len(stub["connections"]) <= 3
+
+
+def fake_provider(registry, model, params):
+    return FakeToolCallingChatModel, {"responses": [AIMessage(content=model)], "latency": 0.05, **params}
+
+
+def test_copies_of_a_client_share_its_limit(registry):
+    registry.register("fake", fake_provider)
+    llm = registry.get("fake", "tweet-writer", max_concurrency=2)
+    copy = llm.model_copy(update={"latency": 0.02})
+    bound = llm.bind(stop=["END"])
+
+    copy.batch(["a"] * 6, config={"max_concurrency": 6})
+    bound.batch(["b"] * 6, config={"max_concurrency": 6})
+    stats = registry.stats()["fake/tweet-writer"]
+    assert stats["calls"] == 12
+    assert stats["peak"] <= 2
+
+
+def test_clients_built_outside_the_registry_are_not_limited(registry):
+    registry.register("fake", fake_provider)
+    cls = type(registry.get("fake", "tweet-writer"))
+    llm = cls(responses=[AIMessage(content="hi")])
+    assert llm.invoke("q").content == "hi"
+    assert registry.stats()["fake/tweet-writer"]["calls"] == 0
+
+
+def test_gemini_client_gets_the_registry_default_limit():
+    pytest.importorskip("langchain_google_genai")
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    registry = ModelRegistry(default_concurrency=3)
+    llm = registry.get("google", "gemini-1.5-flash", google_api_key="test-key")
+
+    assert isinstance(llm, ChatGoogleGenerativeAI)
+    assert type(llm).__name__ == "ChatGoogleGenerativeAI"
+    assert registry.get("google", "gemini-1.5-flash", google_api_key="test-key") is llm
+    assert registry.stats()["google/gemini-1.5-flash"]["limit"] == 3
+    assert llm.model_copy()._concurrency_limit is llm._concurrency_limit
+    registry.close()
@@ -0,0 +1,215 @@
+import asyncio
+import importlib
+import operator
+import time
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+
+from graphOptimizer import compile_graph
+from parallelScheduler import WriteConflictError, infer_access, parallelize_graph, plan_parallel, state_access
+
+
+def plan_names(levels):
+    return [[step.router or step.nodes[0] for step in level] for level in levels]
+
+
+# ---------------------------------------------------
+# Reads / writes inferred from the source
+# ---------------------------------------------------
+def helper(state):
+    return state["a"]
+
+
+def returns_literal(state):
+    return {"b": state["a"] + 1, "log": ["n1"]}
+
+
+def passes_state_on(state):
+    return {"c": helper(state)}
+
+
+def mutates_and_returns(state):
+    state["d"] = state.get("b", 0) * 2
+    return state
+
+
+def computed_key(state):
+    key = "a"
+    return {"b": state[key]}
+
+
+def route(state) -> str:
+    return "x" if state["b"] > 2 else "y"
+
+
+def test_reads_and_writes_of_a_returned_dict():
+    assert infer_access(returns_literal) == (frozenset({"a"}), frozenset({"b", "log"}), False)
+
+
+def test_assignments_and_get_on_a_returned_state():
+    assert infer_access(mutates_and_returns) == (frozenset({"b"}), frozenset({"d"}), True)
+
+
+def test_state_handed_to_other_code_or_computed_keys_cannot_be_inferred():
+    assert infer_access(passes_state_on) is None
+    assert infer_access(computed_key) is None
+
+
+def test_a_router_only_reads():
+    assert infer_access(route, router=True) == (frozenset({"b"}), frozenset(), False)
+
+
+def test_lambda_nodes_are_inferred():
+    assert infer_access(lambda state: {"d": state["b"] * 10}) == (frozenset({"b"}), frozenset({"d"}), False)
+
+
+# ---------------------------------------------------
+# Plans and equivalence
+# ---------------------------------------------------
+class State(TypedDict):
+    a: int
+    b: int
+    d: int
+    log: Annotated[list, operator.add]
+
+
+def hub_graph() -> StateGraph:
+    """n1 reads a; w1 overwrites a; a router after an identity hub reads what n1 wrote."""
+    graph = StateGraph(State)
+    graph.add_node("n1", lambda state: {"b": state["a"] + 1, "log": ["n1"]})
+    graph.add_node("w1", lambda state: {"a": 100})
+    graph.add_node("hub", lambda state: state)
+    graph.add_node("p1", lambda state: {"d": state["b"] * 10})
+    graph.add_node("p2", lambda state: {"d": -1})
+    graph.add_edge(START, "n1")
+    graph.add_edge("n1", "w1")
+    graph.add_edge("w1", "hub")
+    graph.add_conditional_edges("hub", route, {"x": "p1", "y": "p2"})
+    graph.add_edge("p1", END)
+    graph.add_edge("p2", END)
+    return graph
+
+
+def test_an_overwrite_runs_alongside_the_read_and_a_dependent_step_waits():
+    levels = plan_parallel(hub_graph())
+    # w1 only overwrites what n1 reads; the hub re-applies n1's log write and the router reads its b
+    assert plan_names(levels) == [["n1", "w1"], ["hub", "route"]]
+
+
+@pytest.mark.parametrize("inputs", [{"a": 1, "log": []}, {"a": 5, "log": ["s"]}])
+def test_parallel_graph_gives_the_same_final_state(inputs):
+    graph = hub_graph()
+    parallel, _ = parallelize_graph(graph)
+    assert graph.compile().invoke(dict(inputs)) == parallel.compile().invoke(dict(inputs))
+    assert graph.compile().invoke(dict(inputs)) == asyncio.run(parallel.compile().ainvoke(dict(inputs)))
+
+
+TUTORIALS = {
+    "conditionalExcercise": [{"number1": a, "number2": b, "number3": c, "number4": d, "operation": op, "operation2": op2}
+                             for a, b, c, d in [(30, 5, 7, 2), (-4, 9, 1, 3)] for op in "+-" for op2 in "*/"],
+    "MultiNodes": [{"name": "hamza", "age": "12"}, {"name": "ali", "age": "30"}],
+}
+
+
+@pytest.mark.parametrize("module", list(TUTORIALS))
+def test_tutorial_graphs_give_the_same_final_state(module):
+    graph = importlib.import_module(module).graph
+    plain, parallel = graph.compile(), parallelize_graph(graph)[0].compile()
+    for inputs in TUTORIALS[module]:
+        assert plain.invoke(inputs) == parallel.invoke(inputs), inputs
+
+
+def test_independent_routers_share_a_superstep():
+    levels = plan_parallel(importlib.import_module("conditionalExcercise").graph)
+    assert plan_names(levels) == [["decide_next_node", "decide_next_node2"]]
+
+
+def test_independent_sync_nodes_run_at_the_same_time():
+    class Pair(TypedDict):
+        left: int
+        right: int
+
+    def left(state):
+        time.sleep(0.2)
+        return {"left": 1}
+
+    def right(state):
+        time.sleep(0.2)
+        return {"right": 2}
+
+    graph = StateGraph(Pair)
+    graph.add_node("left", left)
+    graph.add_node("right", right)
+    graph.add_edge(START, "left")
+    graph.add_edge("left", "right")
+    graph.add_edge("right", END)
+    app = parallelize_graph(graph)[0].compile()
+
+    start = time.perf_counter()
+    assert app.invoke({}) == {"left": 1, "right": 2}
+    assert time.perf_counter() - start < 0.35
+
+
+# ---------------------------------------------------
+# Declarations and conflicts
+# ---------------------------------------------------
+class Small(TypedDict):
+    a: int
+    c: int
+
+
+def chain(*nodes) -> StateGraph:
+    graph = StateGraph(Small)
+    previous = START
+    for name, fn in nodes:
+        graph.add_node(name, fn)
+        graph.add_edge(previous, name)
+        previous = name
+    graph.add_edge(previous, END)
+    return graph
+
+
+def test_declared_access_replaces_inference():
+    @state_access(reads=["a"], writes=["c"])
+    def declared(state):
+        return {"c": helper(state)}
+
+    graph = chain(("declared", declared), ("other", lambda state: {"a": 1}))
+    assert plan_names(plan_parallel(graph)) == [["declared", "other"]]
+    # The access argument wins over both
+    levels = plan_parallel(graph, access={"other": (["c"], ["a"])})
+    assert plan_names(levels) == [["declared"], ["other"]]
+
+
+def test_undeclared_write_raises_a_write_conflict():
+    @state_access(reads=["a"], writes=[])
+    def liar(state):
+        state["c"] = 5
+        return state
+
+    graph = chain(("liar", liar), ("other", lambda state: {"a": 1}))
+    parallel, levels = parallelize_graph(graph)
+    assert plan_names(levels) == [["liar", "other"]]
+    with pytest.raises(WriteConflictError, match="'liar' changed 'c'"):
+        parallel.compile().invoke({"a": 0, "c": 0})
+
+
+def test_unchanged_keys_in_a_returned_state_are_not_a_conflict():
+    @state_access(reads=["a"], writes=["c"])
+    def tidy(state):
+        state["c"] = state["a"] + 1
+        return state
+
+    parallel, _ = parallelize_graph(chain(("tidy", tidy)))
+    assert parallel.compile().invoke({"a": 1, "c": 0}) == {"a": 1, "c": 2}
+
+
+def test_looping_graph_is_refused():
+    graph = importlib.import_module("Looping").graph
+    with pytest.raises(ValueError, match="should_continue"):
+        parallelize_graph(graph)
+    # compile_graph falls back to the graph as written and says why
+    app = compile_graph(graph, parallel=True)
+    assert "should_continue" in app.optimization_report["parallel"]
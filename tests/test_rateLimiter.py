@@ -0,0 +1,155 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from langchain_core.runnables import RunnableGenerator
+from langchain_core.tools import tool
+
+import rateLimiter
+from rateLimiter import ProviderLimiter, RateLimited, RateLimitExceeded, tavily_search_tool
+
+
+def limiter(max_concurrency=2):
+    return ProviderLimiter("test", requests_per_second=1000.0, max_concurrency=max_concurrency)
+
+
+def words(_):
+    yield from ["one", "two", "three"]
+
+
+async def awords(_):
+    for word in ["one", "two", "three"]:
+        yield word
+
+
+def test_stream_closed_early_gives_its_slot_back():
+    wrapped = RateLimited(RunnableGenerator(words), limiter(max_concurrency=2))
+    limit = wrapped.limiter.concurrency.limit
+    for _ in range(5):
+        stream = wrapped.stream("go")
+        assert next(stream) == "one"
+        stream.close()
+    assert wrapped.limiter.concurrency.in_flight == 0
+    # No outcome was recorded for the abandoned streams
+    assert wrapped.limiter.concurrency.limit == limit
+    assert list(wrapped.stream("go")) == ["one", "two", "three"]
+
+
+def test_astream_cancelled_or_closed_early_gives_its_slot_back():
+    wrapped = RateLimited(RunnableGenerator(words, awords), limiter(max_concurrency=2))
+
+    async def first_chunk():
+        async for chunk in wrapped.astream("go"):
+            return chunk
+
+    async def cancelled():
+        async def consume():
+            async for _ in wrapped.astream("go"):
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    async def scenario():
+        for _ in range(3):
+            assert await first_chunk() == "one"
+        await cancelled()
+        # Let the abandoned generators finalize
+        await asyncio.sleep(0)
+        return [chunk async for chunk in wrapped.astream("go")]
+
+    assert asyncio.run(scenario()) == ["one", "two", "three"]
+    assert wrapped.limiter.concurrency.in_flight == 0
+
+
+def test_tool_name_passes_through():
+    @tool
+    def search(query: str) -> str:
+        """Search the web."""
+        return query
+
+    wrapped = RateLimited(search, limiter())
+    assert wrapped.name == "search"
+    assert wrapped.description == "Search the web."
+    assert wrapped.invoke("hello") == "hello"
+
+
+@pytest.fixture
+def tavily_stub(monkeypatch):
+    """Local Tavily /search endpoint answering 429 to the first `rejections` requests."""
+    tavily = pytest.importorskip("langchain_community.utilities.tavily_search")
+    seen = {"requests": 0, "rejections": 2}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            query = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))["query"]
+            with lock:
+                seen["requests"] += 1
+                rejected = seen["requests"] <= seen["rejections"]
+            if rejected:
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = json.dumps({"results": [
+                {"title": query, "url": "https://example.com/1", "content": f"about {query}", "score": 0.9}
+            ]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(tavily, "TAVILY_API_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    # No real backoff sleeps in tests
+    monkeypatch.setattr(rateLimiter, "backoff_delay", lambda attempt, error=None: 0.0)
+    yield seen
+    server.shutdown()
+    server.server_close()
+
+
+def tavily_limiter():
+    return ProviderLimiter("tavily-test", requests_per_second=1000.0, max_concurrency=8)
+
+
+def test_tavily_429s_are_retried_and_shrink_the_limit(tavily_stub):
+    wrapped = RateLimited(tavily_search_tool(max_results=1, tavily_api_key="test"), tavily_limiter())
+    initial = wrapped.limiter.concurrency.limit
+
+    hits = wrapped.invoke("ai for small business")
+
+    assert hits[0]["content"] == "about ai for small business"
+    assert tavily_stub["requests"] == 3
+    stats = wrapped.limiter.stats()
+    assert stats["retries"] == 2 and stats["rate_limited"] == 2
+    assert wrapped.limiter.concurrency.limit < initial
+
+
+def test_async_tavily_429s_are_retried(tavily_stub):
+    pytest.importorskip("aiohttp")
+    wrapped = RateLimited(tavily_search_tool(max_results=1, tavily_api_key="test"), tavily_limiter())
+    hits = asyncio.run(wrapped.ainvoke("ai for small business"))
+    assert hits[0]["title"] == "ai for small business"
+    assert wrapped.limiter.stats()["retries"] == 2
+
+
+def test_tavily_still_limited_after_all_retries_raises(tavily_stub):
+    tavily_stub["rejections"] = 100
+    limiter = ProviderLimiter("tavily-test", requests_per_second=1000.0, max_concurrency=8, max_retries=3)
+    wrapped = RateLimited(tavily_search_tool(max_results=1, tavily_api_key="test"), limiter)
+    with pytest.raises(RateLimitExceeded):
+        wrapped.invoke("ai for small business")
+    assert tavily_stub["requests"] == 4
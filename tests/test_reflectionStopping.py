@@ -0,0 +1,79 @@
+from itertools import count
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+
+import AgentWork
+from AgentWork import MAX_GENERATIONS, build_graph
+from bestOfN import build_best_of_n_graph
+from stopping import NO_CHANGES, critique_is_empty
+
+
+def scripted(replies):
+    """Chain stand-in answering with the next reply (the last one repeats)."""
+    calls = count()
+
+    def reply(_):
+        return AIMessage(content=replies[min(next(calls), len(replies) - 1)])
+
+    return RunnableLambda(reply)
+
+
+QUESTION = HumanMessage(content="How Has Hania Amir Gotten Famous?")
+CRITIQUE = "Make it punchier and add a hashtag."
+
+
+def generations(messages):
+    return sum(isinstance(m, AIMessage) for m in messages)
+
+
+def test_stops_when_the_revision_barely_changes(monkeypatch):
+    # With the cap raised, convergence is what ends the run
+    monkeypatch.setattr(AgentWork, "MAX_GENERATIONS", 4)
+    tweet = ("Hania Amir went from viral dubsmash clips to leading hit dramas like Mere Humsafar, "
+             "and her playful Instagram presence turned fans into a loyal community #HaniaAmir")
+    app = build_graph(scripted([tweet, tweet + " #Lollywood"]), scripted([CRITIQUE])).compile()
+    messages = app.invoke(QUESTION)
+    assert generations(messages) == 2 < AgentWork.MAX_GENERATIONS
+    assert isinstance(messages[-1], AIMessage)
+
+
+def test_stops_when_the_critique_is_empty():
+    app = build_graph(scripted(["first tweet"]), scripted([NO_CHANGES])).compile()
+    messages = app.invoke(QUESTION)
+    assert [type(m) for m in messages] == [HumanMessage, AIMessage]
+    assert messages[-1].content == "first tweet"
+
+
+def test_hard_cap_still_applies():
+    app = build_graph(scripted([f"draft number {i} " * 5 for i in range(10)]), scripted([CRITIQUE])).compile()
+    assert generations(app.invoke(QUESTION)) == MAX_GENERATIONS
+
+
+def test_best_of_n_stops_on_empty_critique():
+    app = build_best_of_n_graph(scripted(["a", "b"]), scripted([f"{NO_CHANGES}\nScore: 9/10"]), n=2).compile()
+    messages = app.invoke(QUESTION)
+    assert len(messages) == 2 and isinstance(messages[-1], AIMessage)
+
+
+def test_best_of_n_stops_on_convergence_before_the_cap():
+    tweet = "Hania Amir rose to fame through hit dramas and a huge Instagram following"
+    app = build_best_of_n_graph(scripted([tweet]), scripted([f"{CRITIQUE}\nScore: 6/10"]), n=2).compile()
+    assert generations(app.invoke(QUESTION)) == 2
+
+
+def test_empty_critique_detection():
+    assert critique_is_empty(NO_CHANGES)
+    assert critique_is_empty("  No changes needed!\nScore: 10/10")
+    assert critique_is_empty("")
+    assert not critique_is_empty("No changes to the hook, but shorten the second sentence.")
+    assert not critique_is_empty(f"{CRITIQUE}\nScore: 7/10")
+
+
+def test_both_loops_share_one_similarity_check():
+    import convergence
+    import stopping
+    import textSimilarity
+
+    assert stopping.has_converged is textSimilarity.texts_converged
+    assert convergence.CONVERGENCE_THRESHOLD == stopping.CONVERGENCE_THRESHOLD == textSimilarity.CONVERGENCE_THRESHOLD
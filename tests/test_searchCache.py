@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+from searchCache import CachedSearchTool, MemorySearchStore, SQLiteSearchStore
+
+
+class FakeSearch:
+    """Search tool stand-in that counts upstream calls; queries containing "down" fail like Tavily does."""
+
+    max_results = 5
+
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, query, config=None, **kwargs):
+        self.calls.append(query)
+        if "down" in query:
+            return "HTTPError('502 Server Error')"
+        return [{"title": query, "url": f"https://example.com/{len(self.calls)}", "content": query}]
+
+    async def ainvoke(self, query, config=None, **kwargs):
+        return self.invoke(query, config)
+
+
+def test_miss_then_hit_for_the_same_normalized_query():
+    upstream = FakeSearch()
+    cached = CachedSearchTool(upstream)
+
+    first = cached.invoke("AI tools for small business")
+    second = cached.invoke("  ai tools   FOR small business ")
+    third = asyncio.run(cached.ainvoke("ai tools for small business"))
+
+    assert upstream.calls == ["AI tools for small business"]
+    assert first == second == third
+    assert cached.stats() == {"hits": 2, "misses": 1, "hit_rate": 2 / 3}
+
+
+def test_errors_are_not_cached():
+    upstream = FakeSearch()
+    cached = CachedSearchTool(upstream)
+    cached.invoke("backend down")
+    cached.invoke("backend down")
+    assert upstream.calls == ["backend down", "backend down"]
+
+
+def test_entries_expire_after_the_ttl():
+    upstream = FakeSearch()
+    cached = CachedSearchTool(upstream, ttl=0.05)
+    cached.invoke("q")
+    cached.invoke("q")
+    time.sleep(0.1)
+    cached.invoke("q")
+    assert upstream.calls == ["q", "q"]
+    assert cached.stats()["misses"] == 2
+
+
+def test_memory_lru_evicts_the_least_recently_used_query():
+    upstream = FakeSearch()
+    # A store that keeps one entry, so evictions from memory really go back upstream
+    cached = CachedSearchTool(upstream, store=MemorySearchStore(max_entries=1), memory_entries=2)
+    cached.invoke("a")
+    cached.invoke("b")
+    cached.invoke("a")       # a is now the most recent
+    cached.invoke("c")       # evicts b from memory; the store only kept c
+    upstream.calls.clear()
+
+    cached.invoke("a")
+    cached.invoke("c")
+    assert upstream.calls == []
+    cached.invoke("b")
+    assert upstream.calls == ["b"]
+
+
+def test_sqlite_store_evicts_least_recently_used_rows(tmp_path):
+    store = SQLiteSearchStore(str(tmp_path / "cache.sqlite"), max_entries=2)
+    store.set("a", [1])
+    time.sleep(0.01)
+    store.set("b", [2])
+    time.sleep(0.01)
+    store.get("a")
+    time.sleep(0.01)
+    store.set("c", [3])
+    assert store.get("b") is None
+    assert store.get("a")[0] == [1]
+    assert store.get("c")[0] == [3]
+    store.close()
+
+
+def test_sqlite_results_survive_a_new_instance(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    first = CachedSearchTool(FakeSearch(), store=SQLiteSearchStore(path))
+    result = first.invoke("AI tools for small business")
+    first.store.close()
+
+    upstream = FakeSearch()
+    second = CachedSearchTool(upstream, store=SQLiteSearchStore(path))
+    assert second.invoke("ai tools for small business") == result
+    assert upstream.calls == []
+    assert second.stats()["hits"] == 1
+    second.store.close()
+
+
+def test_expired_sqlite_rows_are_dropped(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    store = SQLiteSearchStore(path)
+    CachedSearchTool(FakeSearch(), store=store).invoke("q")
+
+    upstream = FakeSearch()
+    stale = CachedSearchTool(upstream, store=store, ttl=0.0)
+    stale.invoke("q")
+    assert upstream.calls == ["q"]
+    store.close()
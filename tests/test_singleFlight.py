@@ -0,0 +1,158 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.messages import ToolMessage
+from langchain_core.tools import tool
+
+from singleFlight import SingleFlight, single_flight
+
+
+def wait_for_callers(flight: SingleFlight, n: int, timeout: float = 2.0) -> None:
+    # Hold the upstream call until all n callers have joined the flight
+    deadline = time.monotonic() + timeout
+    while flight.stats()["calls"] < n and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def counting_search(expected=1, fail=False):
+    """A fake search tool behind single_flight that waits until `expected` callers joined."""
+    calls = []
+
+    @tool
+    def search(query: str) -> str:
+        """Fake web search."""
+        calls.append(query)
+        wait_for_callers(wrapped.flight, expected)
+        if fail:
+            raise ConnectionError("search backend down")
+        return f"results for {query.lower()}"
+
+    wrapped = single_flight(search)
+    return wrapped, calls
+
+
+def run_in_threads(fn, inputs):
+    with ThreadPoolExecutor(max_workers=len(inputs)) as pool:
+        return list(pool.map(fn, inputs))
+
+
+QUERIES = ["Hania Amir new drama", "HANIA AMIR NEW DRAMA", "  hania amir  new drama", "Hania Amir new drama"] * 4
+
+
+def test_concurrent_identical_calls_hit_upstream_once():
+    wrapped, calls = counting_search(expected=len(QUERIES))
+    results = run_in_threads(wrapped.invoke, QUERIES)
+
+    assert len(calls) == 1
+    assert set(results) == {"results for hania amir new drama"}
+    stats = wrapped.stats()
+    assert stats["upstream"] == 1 and stats["coalesced"] == len(QUERIES) - 1
+
+
+def test_async_identical_calls_hit_upstream_once():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"hits": 3}
+
+    async def scenario():
+        return await asyncio.gather(*(flight.ado("same key", fetch) for _ in range(10)))
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_exception_reaches_every_waiter():
+    wrapped, calls = counting_search(expected=8, fail=True)
+
+    def call(query):
+        try:
+            wrapped.invoke(query)
+        except ConnectionError as e:
+            return e
+        return None
+
+    errors = run_in_threads(call, ["cloud outage today"] * 8)
+    assert len(calls) == 1
+    assert all(isinstance(e, ConnectionError) for e in errors)
+    assert wrapped.stats()["shared_errors"] == 7
+
+
+def test_async_exception_reaches_every_waiter():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.02)
+        raise ConnectionError("down")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.ado("k", fail) for _ in range(5)), return_exceptions=True)
+
+    errors = asyncio.run(scenario())
+    assert all(isinstance(e, ConnectionError) for e in errors)
+    assert flight.stats()["upstream"] == 1
+
+
+def test_key_is_released_after_the_call():
+    wrapped, calls = counting_search()
+    assert wrapped.invoke("PSL final score") == "results for psl final score"
+    assert wrapped.stats()["in_flight"] == 0
+
+    # Not a cache: the next call goes upstream again
+    wrapped.invoke("PSL final score")
+    assert len(calls) == 2
+
+
+def test_key_is_released_after_a_failure():
+    flight = SingleFlight()
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ConnectionError("down")
+        return "ok"
+
+    with pytest.raises(ConnectionError):
+        flight.do("k", flaky)
+    assert flight.stats()["in_flight"] == 0
+    assert flight.do("k", flaky) == "ok"
+
+
+def test_cancelled_leader_hands_the_call_to_a_waiter():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def scenario():
+        leader = asyncio.create_task(flight.ado("k", fetch))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(flight.ado("k", fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await waiter
+
+    # The waiter retried the call itself instead of failing with the leader
+    assert asyncio.run(scenario()) == 2
+
+
+def test_coalesced_tool_calls_keep_their_own_ids():
+    wrapped, calls = counting_search(expected=2)
+    tool_calls = [
+        {"name": "search", "args": {"query": "alia bhatt movie"}, "id": f"call_{i}", "type": "tool_call"} for i in range(2)
+    ]
+    messages = run_in_threads(wrapped.invoke, tool_calls)
+
+    assert len(calls) == 1
+    assert all(isinstance(m, ToolMessage) for m in messages)
+    assert sorted(m.tool_call_id for m in messages) == ["call_0", "call_1"]
@@ -0,0 +1,117 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fakeModels import FakeToolCallingChatModel, tool_call_message
+from Graph import build_graph, initial_state
+from speculativeSearch import SearchQueryScanner, SpeculativeSearcher
+from toolPayload import expand_tool_payloads
+
+
+class SlowSearch:
+    """Search tool stand-in with a fixed latency that records every query it runs."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def invoke(self, query, config=None, **kwargs):
+        with self._lock:
+            self.queries.append(query)
+        time.sleep(self.delay)
+        return [{"title": query, "url": f"https://example.com/{query.replace(' ', '-')}", "content": query}]
+
+
+def test_scanner_closes_queries_across_chunk_boundaries():
+    scanner = SearchQueryScanner()
+    text = '{"answer": "x \\"q\\"", "search_queries": ["ai for smb", "ai \\"tools\\""], "other": ["not me"]}'
+    closed = [query for i in range(0, len(text), 5) for query in scanner.feed(text[i:i + 5])]
+    assert closed == ["ai for smb", 'ai "tools"']
+
+
+def test_prefetched_query_is_a_hit():
+    tool = SlowSearch(delay=0.1)
+    with SpeculativeSearcher(tool) as searcher:
+        searcher.prefetch("AI for small business")
+        time.sleep(0.15)
+        result = searcher.invoke("ai for  small business")
+        saved = searcher.finish(["ai for small business"])
+    assert tool.queries == ["AI for small business"]
+    assert result[0]["title"] == "AI for small business"
+    # The search had already finished when execute_tools asked for it
+    assert saved >= 0.09
+
+
+def test_query_that_was_not_prefetched_is_searched_normally():
+    tool = SlowSearch()
+    with SpeculativeSearcher(tool) as searcher:
+        searcher.invoke("fresh query")
+        # Nothing was started early, so (up to timer noise) nothing was saved
+        assert searcher.finish(["fresh query"]) < 0.01
+    assert tool.queries == ["fresh query"]
+
+
+def test_close_discards_searches_nobody_asked_for():
+    tool = SlowSearch(delay=0.2)
+    searcher = SpeculativeSearcher(tool, max_concurrency=1)
+    searcher.prefetch("running")
+    searcher.prefetch("queued")
+    searcher.close()
+    time.sleep(0.3)
+    # The queued search never started; the running one finished in the background
+    assert tool.queries == ["running"]
+    assert searcher.finish(["running", "queued"]) == 0.0
+
+
+def test_stream_draft_prefetches_while_the_draft_streams():
+    tool = SlowSearch()
+    llm = FakeToolCallingChatModel(
+        responses=[tool_call_message("AnswerQuestion", {"answer": "a", "search_queries": ["q one", "q two"]})],
+        chunk_size=4,
+    )
+    with SpeculativeSearcher(tool) as searcher:
+        draft = searcher.stream_draft(llm, "question")
+        assert draft.tool_calls[0]["args"]["search_queries"] == ["q one", "q two"]
+        searcher.invoke("q one")
+        searcher.invoke("q two")
+    assert sorted(tool.queries) == ["q one", "q two"]
+
+
+def reflexion_model(topic):
+    def draft(n):
+        return tool_call_message("AnswerQuestion" if n == 0 else "ReviseAnswer", {
+            "answer": f"{topic} answer {n} " * 5,
+            "search_queries": [f"{topic} query {n}"],
+            "reflection": {"missing": "more", "superfluous": "less"},
+            "references": [],
+        }, call_id=f"call_{n}")
+
+    return FakeToolCallingChatModel(responses=[draft(n) for n in range(4)], chunk_size=8, chunk_delay=0.001)
+
+
+def test_concurrent_runs_keep_their_own_searches():
+    tool = SlowSearch(delay=0.05)
+    # One model per topic, picked by the question, so both runs share one compiled graph
+    models = {"cats": reflexion_model("cats"), "dogs": reflexion_model("dogs")}
+
+    class PerTopic:
+        # Chain stand-in routed to the topic's model by the question
+        def stream(self, inputs, config=None):
+            return models[inputs["messages"][0].content].stream(inputs["messages"], config)
+
+        def invoke(self, inputs, config=None):
+            return models[inputs["messages"][0].content].invoke(inputs["messages"], config)
+
+    app = build_graph(PerTopic(), PerTopic(), search_tool=tool, speculative=True).compile()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        states = list(pool.map(lambda topic: app.invoke(initial_state(topic)), ["cats", "dogs"]))
+
+    for topic, state in zip(["cats", "dogs"], states):
+        searched = expand_tool_payloads(state["messages"])
+        assert f"{topic} query 0" in searched
+        assert all(query.startswith(topic) for query in searched)
+        assert state["search_time_saved"] >= 0.0
+    assert sorted(set(tool.queries)) == sorted(
+        {q for state in states for q in expand_tool_payloads(state["messages"])}
+    )
@@ -0,0 +1,96 @@
+import asyncio
+
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import tool
+
+from fakeModels import FakeToolCallingChatModel, tool_call_message
+from Graph import build_graph, initial_state
+from streaming import stream_reflexion
+
+
+def scripted(name, n):
+    return tool_call_message(name, {
+        "answer": f"Revision {n}: small businesses can use AI for marketing, support and bookkeeping. " * 3,
+        "search_queries": [f"ai for small business {n}"],
+        "reflection": {"missing": "numbers", "superfluous": "repetition"},
+        "references": [],
+    }, call_id=f"call_{n}")
+
+
+@tool
+def fake_search(query: str) -> list:
+    """Offline search."""
+    return [{"title": query, "url": f"https://example.com/{query.replace(' ', '-')}", "content": query}]
+
+
+def run_offline(rounds=3):
+    llm = FakeToolCallingChatModel(
+        responses=[scripted("AnswerQuestion", 0)] + [scripted("ReviseAnswer", n) for n in range(1, rounds + 1)],
+    )
+    as_prompt = RunnableLambda(lambda inputs: inputs["messages"])
+    app = build_graph(as_prompt | llm, as_prompt | llm, search_tool=fake_search).compile()
+    return list(stream_reflexion(app, initial_state("How can small businesses use AI?")))
+
+
+def test_streams_node_lifecycle_in_order():
+    events = run_offline()
+    lifecycle = [(e["type"], e["node"]) for e in events if e["type"] in ("node_start", "node_end")]
+    assert lifecycle[:6] == [
+        ("node_start", "draft"), ("node_end", "draft"),
+        ("node_start", "execute_tools"), ("node_end", "execute_tools"),
+        ("node_start", "revisor"), ("node_end", "revisor"),
+    ]
+    # Every node that starts also finishes, without errors
+    starts = [node for kind, node in lifecycle if kind == "node_start"]
+    ends = [node for kind, node in lifecycle if kind == "node_end"]
+    assert starts == ends
+    assert not any(e.get("error") for e in events if e["type"] == "node_end")
+
+
+def test_answer_text_streams_before_the_node_finishes():
+    events = run_offline()
+    draft_end = events.index({"type": "node_end", "node": "draft", "error": None})
+    draft_deltas = [e["delta"] for e in events[:draft_end] if e["type"] == "answer"]
+    # Several partial deltas, which add up to the full drafted answer
+    assert len(draft_deltas) > 1
+    assert "".join(draft_deltas) == scripted("AnswerQuestion", 0).tool_calls[0]["args"]["answer"]
+
+
+def test_search_progress_and_final_state():
+    events = run_offline()
+    searches = [(e["query"], e["status"]) for e in events if e["type"] == "search"]
+    assert ("ai for small business 0", "done") in searches
+
+    assert events[-1]["type"] == "final"
+    state = events[-1]["state"]
+    assert state["iterations"] >= 1
+    assert state["messages"][-1].tool_calls[0]["name"] == "ReviseAnswer"
+
+
+class SearchCalls:
+    """Search tool that records whether the graph called it through invoke or ainvoke."""
+
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, query, config=None):
+        self.calls.append(("invoke", query))
+        return fake_search.invoke(query)
+
+    async def ainvoke(self, query, config=None):
+        self.calls.append(("ainvoke", query))
+        return fake_search.invoke(query)
+
+
+def test_async_run_searches_on_the_event_loop():
+    llm = FakeToolCallingChatModel(
+        responses=[scripted("AnswerQuestion", 0)] + [scripted("ReviseAnswer", n) for n in range(1, 4)],
+    )
+    as_prompt = RunnableLambda(lambda inputs: inputs["messages"])
+    search = SearchCalls()
+    app = build_graph(as_prompt | llm, as_prompt | llm, search_tool=search).compile()
+
+    state = asyncio.run(app.ainvoke(initial_state("How can small businesses use AI?")))
+    assert search.calls[0] == ("ainvoke", "ai for small business 0")
+    assert all(kind == "ainvoke" for kind, _ in search.calls)
+    assert state["iterations"] >= 1
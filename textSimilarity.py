@@ -0,0 +1,20 @@
+from difflib import SequenceMatcher
+
+# ---------------------------------------------------
+# Convergence check shared by the Reflection loop (ReflectionAgent/stopping.py)
+# and the Reflexion loop (ReflextionAgent/convergence.py)
+#
+# Two consecutive drafts count as converged once they are at least
+# CONVERGENCE_THRESHOLD similar, word by word.
+# ---------------------------------------------------
+
+# Word-level similarity (0..1) between consecutive drafts at which we call it converged
+CONVERGENCE_THRESHOLD = 0.95
+
+
+def text_similarity(previous: str, current: str) -> float:
+    return SequenceMatcher(None, previous.split(), current.split(), autojunk=False).ratio()
+
+
+def texts_converged(previous: str, current: str, threshold: float = CONVERGENCE_THRESHOLD) -> bool:
+    return text_similarity(previous, current) >= threshold